@@ -4,7 +4,7 @@ import logging
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from ..services.analytics_service import AnalyticsService
-from ..utils.database import get_db
+from ..utils.database import get_async_db, get_db, get_pool_status
 from ..utils.cache import RedisCache
 from ..utils.security import get_current_user
 from ..models.user import User
@@ -21,14 +21,20 @@ def get_analytics_service(
     # For now, we'll pass None as cache since Redis isn't set up yet
     return AnalyticsService(session=session, cache=None, background_tasks=background_tasks)
 
+async def run_analytics(async_db, method: str, *args):
+    """Run an ``AnalyticsService`` read through the async session, off the event loop."""
+    def read(session: Session):
+        return getattr(AnalyticsService(session=session, cache=None), method)(*args)
+    return await async_db.run_sync(read)
+
 @router.get("/user/{user_id}")
 async def get_user_analytics(
     user_id: str,
-    analytics_service: AnalyticsService = Depends(get_analytics_service)
+    async_db=Depends(get_async_db)
 ) -> Dict:
     """Get analytics data for a specific user"""
     try:
-        analytics = analytics_service.get_user_analytics(user_id)
+        analytics = await run_analytics(async_db, "get_user_analytics", user_id)
         if analytics:
             return analytics
             
@@ -65,11 +71,11 @@ async def get_user_analytics(
 
 @router.get("/system")
 async def get_system_analytics(
-    analytics_service: AnalyticsService = Depends(get_analytics_service)
+    async_db=Depends(get_async_db)
 ) -> Dict:
     """Get system-wide analytics data"""
     try:
-        analytics = analytics_service.get_system_analytics()
+        analytics = await run_analytics(async_db, "get_system_analytics")
         if not analytics:
             # Return empty system stats structure if no data
             return {
@@ -107,10 +113,10 @@ async def get_system_analytics(
 
 @router.get("/system/status")
 async def get_system_status(
-    analytics_service: AnalyticsService = Depends(get_analytics_service)
+    async_db=Depends(get_async_db)
 ) -> Dict:
     """Compatibility alias: system/status"""
-    return await get_system_analytics(analytics_service)
+    return await get_system_analytics(async_db)
 
 @router.post("/track/{user_id}")
 async def track_analysis(
@@ -172,7 +178,7 @@ async def track_api_usage(
 async def get_usage_stats(
     timeframe: str = Query("7d", regex="^(24h|7d|30d|all)$"),
     current_user: User = Depends(get_current_user),
-    analytics_service: AnalyticsService = Depends(get_analytics_service)
+    async_db=Depends(get_async_db)
 ) -> Dict:
     """Get detailed usage statistics for the current user"""
     try:
@@ -188,7 +194,7 @@ async def get_usage_stats(
             start_date = None
 
             # Get user's analysis stats and API usage
-            stats = analytics_service.get_user_analytics(current_user.id)
+            stats = await run_analytics(async_db, "get_user_analytics", current_user.id)
 
             if stats:
                 analysis_stats = stats.get("analysis", {})
@@ -213,7 +219,7 @@ async def get_usage_stats(
                         }
                         for usage in api_stats
                     ],
-                    "timeline": analytics_service.get_analytics_trend(timeframe)
+                    "timeline": await run_analytics(async_db, "get_analytics_trend", timeframe)
                 }
             else:
                 return {"error": "No statistics available"}
@@ -231,14 +237,14 @@ async def get_usage_stats(
 @router.get("/system-health")
 async def get_system_health(
     current_user: User = Depends(get_current_user),
-    analytics_service: AnalyticsService = Depends(get_analytics_service)
+    async_db=Depends(get_async_db)
 ) -> Dict:
     """Get system health metrics (admin only)"""
     if not getattr(current_user, "is_admin", False):
         raise HTTPException(status_code=403, detail="Admin access required")
 
     try:
-        system_stats = analytics_service.get_system_analytics()
+        system_stats = await run_analytics(async_db, "get_system_analytics")
         
         return {
             "status": "operational",
@@ -261,7 +267,8 @@ async def get_system_health(
                 "dailyAverage": system_stats["analysis"]["daily_average"],
                 "successRate": system_stats["api"]["success_rate"]
             },
-            "recentErrors": analytics_service.get_recent_errors()
+            "databasePool": get_pool_status(),
+            "recentErrors": await run_analytics(async_db, "get_recent_errors")
         }
     except Exception as e:
         logger.error(f"Error fetching system health: {str(e)}", exc_info=True)
@@ -2,27 +2,55 @@
 
 This module exposes:
  - GET /analyze/model-status
+ - GET /analyze/startup-metrics
+ - GET /analyze/ready  (503 until the model is loaded and warmed up)
  - POST /analyze        (text)
  - POST /analyze/file   (file upload)
+ - POST /analyze/batch  (many files/texts as one job; NDJSON/SSE streaming)
+ - GET  /analyze/batch/{job_id}[/events]
+ - GET  /analyze/jobs/{job_id}  (queued file/batch jobs)
 
 It uses existing project services: AIContentAnalyzer, DocumentProcessor,
-InputValidator and ShobeisService. Errors are raised as the project's
+InputValidator and ShobeisService. Inference goes through an
+InferenceBatcher so concurrent requests share forward passes, and runs on a
+dedicated InferenceExecutor so it never blocks the event loop; when its queue
+is full the endpoints answer 503 with Retry-After. With
+INFERENCE_PROCESS_WORKERS set, batches are scored by a ModelWorkerPool of
+processes that share one copy of the model weights. With
+DOCUMENT_EXTRACTION_WORKERS set, uploaded files are parsed in an
+ExtractionPool of processes with a per-document timeout. With
+ANALYZE_JOB_QUEUE set, file and (non-streaming) batch requests are stored in
+a durable job queue and answered with a job ID at once; a separate
+``app.services.job_worker`` process runs them. Errors are raised as the project's
 custom exceptions so callers (and tests) can handle them consistently.
 """
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Request, Depends
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from typing import Optional, Dict, Any
 import asyncio
+import functools
 import json
 import logging
+import os
 import time
 
 from app.models.analyzer import AIContentAnalyzer
-from app.utils.document_processor import DocumentProcessor
-from app.utils.exceptions import ValidationError, DocumentError, LanguageError, SystemError
+from app.models.user import User, UserType
+from app.utils.document_processor import DocumentProcessor, FileTypeError
+from app.utils.extraction_pool import ExtractionTimeoutError, get_extraction_pool
+from app.utils.job_queue import JOB_QUEUE_ENABLED, create_job_queue
+from app.utils.uploads import as_buffer, inspect_upload
+from app.utils.exceptions import ValidationError, DocumentError, LanguageError, SystemError, InferenceQueueFullError
 from app.utils.validation import InputValidator
-from app.utils.database import SessionLocal
+from app.utils.inference_batcher import InferenceBatcher
+from app.utils.inference_executor import InferenceExecutor
+from app.utils.model_worker_pool import ModelWorkerPool, PROCESS_QUANTIZE, PROCESS_WORKERS
+from app.utils.monitoring import MetricsCollector, PerformanceMonitor
+from app.utils.database import async_session
 from app.services.shobeis_service import ShobeisService, InsufficientShobeisError
+from app.services.batch_analysis_service import (
+    BatchItem, BatchJob, BatchJobManager, BATCH_MAX_ITEMS, extract_item_text, format_event
+)
 from app.api.auth import get_current_user
 
 router = APIRouter()
@@ -30,20 +58,79 @@ logger = logging.getLogger(__name__)
 validator = InputValidator()
 
 # Create a single analyzer instance; model loading is performed lazily inside
-# the analyzer implementation to avoid heavy work at import time.
-analyzer = AIContentAnalyzer()
+# the analyzer implementation to avoid heavy work at import time. Workers
+# share fp32 weights but each need their own INT8 copy (see model_worker_pool)
+analyzer = AIContentAnalyzer(quantize=PROCESS_QUANTIZE if PROCESS_WORKERS > 0 else True)
+# In process-pool mode each executor thread waits on one worker process
+worker_pool = ModelWorkerPool(analyzer) if PROCESS_WORKERS > 0 else None
+inference_executor = InferenceExecutor(max_workers=PROCESS_WORKERS) if worker_pool else InferenceExecutor()
+batcher = InferenceBatcher(
+    analyzer,
+    executor=inference_executor,
+    performance_monitor=PerformanceMonitor(MetricsCollector()),
+    worker_pool=worker_pool
+)
+# PDF/DOCX parsing is CPU-bound pure Python; None parses on the default thread pool
+extraction_pool = get_extraction_pool()
+batch_jobs = BatchJobManager()
+# Large analyses go to the worker process instead of running in the request
+job_queue = create_job_queue() if JOB_QUEUE_ENABLED else None
 _model_lock = asyncio.Lock()
 
+# Load and warm up the model in the background at startup instead of on the first request
+PRELOAD_MODEL = os.environ.get("ANALYZER_PRELOAD", "false").lower() in ("1", "true", "yes")
+_preload = {"state": "cold", "error": None, "task": None}
+
+
+def _busy_error(error: InferenceQueueFullError) -> HTTPException:
+    """503 response asking the client to retry once the inference queue drains."""
+    return HTTPException(
+        status_code=503,
+        detail="Inference queue is full, please retry later",
+        headers={"Retry-After": str(error.retry_after)}
+    )
+
+
+def _model_ready() -> bool:
+    """Whether the model (and the worker pool, if enabled) is loaded and warmed up."""
+    if not getattr(analyzer, 'model_loaded', False):
+        return False
+    if worker_pool is not None:
+        # Workers run their own warm-up before reporting ready
+        return worker_pool.started
+    return getattr(analyzer, 'warmed_up', False)
+
 
 async def _ensure_model_ready(model_name: Optional[str] = None):
     """Ensure the model is loaded without blocking the event loop."""
-    if getattr(analyzer, 'model_loaded', False):
+    if _model_ready():
         return
     async with _model_lock:
-        if getattr(analyzer, 'model_loaded', False):
+        if _model_ready():
             return
-        loop = asyncio.get_running_loop()
-        await loop.run_in_executor(None, analyzer._load_model, model_name)
+        if not getattr(analyzer, 'model_loaded', False):
+            await inference_executor.run(analyzer._load_model, model_name)
+        if worker_pool is not None:
+            await inference_executor.run(worker_pool.start)
+        else:
+            await inference_executor.run(analyzer.warm_up)
+
+
+async def preload_model():
+    """Load and warm up the model, recording progress for the readiness probe."""
+    _preload.update(state="warming", error=None)
+    try:
+        await _ensure_model_ready()
+        _preload["state"] = "ready"
+    except Exception as e:
+        logger.exception("Model preload failed")
+        _preload.update(state="failed", error=str(e))
+
+
+def start_preload() -> None:
+    """Schedule ``preload_model`` on the running event loop (idempotent)."""
+    if _preload["task"] is None or _preload["task"].done():
+        _preload["task"] = asyncio.get_event_loop().create_task(preload_model())
 
 
 @router.get("/analyze/model-status")
@@ -51,14 +138,44 @@ async def model_status():
     try:
         return {
             "model_loaded": getattr(analyzer, 'model_loaded', False),
+            "ready": _model_ready(),
             "model_name": getattr(analyzer, 'model_name', None),
             "device": str(getattr(analyzer, 'device', None)),
+            "backend": getattr(analyzer, 'backend', None),
+            "runtime_active": getattr(analyzer, 'runtime', None) is not None,
+            "batching": batcher.stats(),
+            "executor": inference_executor.stats(),
+            "worker_pool": worker_pool.stats() if worker_pool is not None else None,
+            "result_cache": analyzer.result_cache.stats() if analyzer.result_cache is not None else None,
         }
     except Exception as e:
         logger.exception("Failed to get model status")
         return JSONResponse(status_code=500, content={"error": str(e)})
 
 
+@router.get("/analyze/ready")
+async def readiness():
+    """Readiness probe: 200 once the model is warm, 503 before that."""
+    if _model_ready():
+        return {"ready": True, "state": "ready", "model_name": getattr(analyzer, 'model_name', None)}
+    # A finished preload whose model has since been unloaded is cold again
+    state = "cold" if _preload["state"] == "ready" else _preload["state"]
+    return JSONResponse(
+        status_code=503,
+        content={"ready": False, "state": state, "error": _preload["error"]},
+        headers={"Retry-After": "5"}
+    )
+
+
+@router.get("/analyze/startup-metrics")
+async def startup_metrics():
+    """Per-phase timings of the last model load (tokenizer, weights, device move, warm-up)."""
+    metrics = getattr(analyzer, 'startup_metrics', None)
+    if metrics is None:
+        return JSONResponse(status_code=404, content={"error": "Model has not been loaded yet"})
+    return metrics
+
+
 @router.post("/analyze")
 async def analyze_text(request: Request, current_user=Depends(get_current_user)):
     """Analyze plain text. Expects JSON {"content": "...", "is_test": false}
@@ -85,29 +202,30 @@ async def analyze_text(request: Request, current_user=Depends(get_current_user))
         logger.exception("Model load failure")
         raise SystemError("Model not ready", {"cause": str(e)})
 
-    db = SessionLocal()
+    # Hold a place in the queue before charging, so a paid request cannot be turned away
     try:
-        sh = ShobeisService(db)
+        slot = batcher.reserve()
+    except InferenceQueueFullError as e:
+        raise _busy_error(e)
+
+    with slot:
         if not is_test:
             try:
-                sh.process_charge(user=current_user, action_type='word_analysis', quantity=len(text.split()))
+                await _charge_words(current_user, len(text.split()))
             except InsufficientShobeisError as err:
                 logger.warning("Insufficient balance for user %s: %s", getattr(current_user, 'id', None), err)
                 return JSONResponse(status_code=402, content={"success": False, "error": "Insufficient balance (monthly, bonus, and main)"})
 
         start = time.time()
-        result = analyzer.analyze_text(text)
+        result = await batcher.submit(text, slot=slot)
         duration = time.time() - start
 
-        if not isinstance(result, dict):
-            logger.error("Analyzer returned unexpected value: %r", result)
-            raise SystemError("Invalid analysis result")
+    if not isinstance(result, dict):
+        logger.error("Analyzer returned unexpected value: %r", result)
+        raise SystemError("Invalid analysis result")
 
-        # Return analysis result plus lightweight metrics
-        return {"success": True, "data": result, "metrics": {"inference_ms": round(duration * 1000, 2)}}
-
-    finally:
-        db.close()
+    # Return analysis result plus lightweight metrics
+    return {"success": True, "data": result, "metrics": {"inference_ms": round(duration * 1000, 2)}}
 
 
 @router.post("/analyze/file")
@@ -125,8 +243,14 @@ async def analyze_file(
     if not DocumentProcessor.is_supported_format(file.content_type):
         raise DocumentError("Unsupported file type", {"mime": file.content_type})
 
-    content = await file.read()
-    validator.validate_file_size(len(content))
+    # The upload is already spooled (to disk past UPLOAD_SPOOL_MAX_BYTES); only its
+    # size and first few KB are looked at here, the extractors read it in place
+    size, head = inspect_upload(file)
+    validator.validate_file_size(size)
+    try:
+        content_type = DocumentProcessor.detect_content_type(head, file.content_type)
+    except FileTypeError as e:
+        raise DocumentError(str(e), {"mime": file.content_type})
 
     opts = {}
     if options:
@@ -135,40 +259,257 @@ async def analyze_file(
         except Exception:
             raise ValidationError("Invalid options JSON", "options", None)
 
+    if job_queue is not None:
+        # The word count is only known once the worker has extracted the text; until
+        # then the user must at least be able to pay the minimum charge
+        try:
+            await _check_balance(current_user, 1)
+        except InsufficientShobeisError:
+            raise HTTPException(status_code=402, detail="Insufficient balance")
+        job_options = validator.validate_options(opts) if opts else {}
+        # The queue stores its own copy of the upload; the mapping is closed once it is written
+        with as_buffer(file.file) as data:
+            job = await asyncio.get_running_loop().run_in_executor(None, functools.partial(
+                job_queue.enqueue, 'file',
+                {"filename": filename, "content_type": content_type, "options": job_options},
+                user_id=getattr(current_user, 'id', None), data=data
+            ))
+        return _queued_response(job)
+
     try:
         await _ensure_model_ready()
     except Exception as e:
         logger.exception("Model load failure for file analysis")
         raise SystemError("Model not ready", {"cause": str(e)})
 
-    # Extract text
-    doc = DocumentProcessor().process_document_bytes(content, file.content_type)
+    # Extract text off the event loop, in the extraction worker processes when enabled;
+    # page details are not returned, so PDFs are streamed without them
+    try:
+        doc = await asyncio.get_running_loop().run_in_executor(None, functools.partial(
+            DocumentProcessor().process_document_bytes, file.file, content_type,
+            include_pages=False, pool=extraction_pool
+        ))
+    except ExtractionTimeoutError as e:
+        raise DocumentError("Document took too long to process", {"file": filename, "cause": str(e)})
     text = doc.get('text') or ''
     if not text.strip():
         raise DocumentError("No text extracted from document", {"file": filename})
 
     text = validator.validate_text(text)
 
-    db = SessionLocal()
+    # Documents are scored in full with overlapping windows unless the caller opts out
+    analysis_options = {"sliding_window": True}
+    if opts:
+        analysis_options.update(validator.validate_options(opts))
+
+    # Hold a place in the queue before charging, so a paid request cannot be turned away
     try:
-        sh = ShobeisService(db)
+        slot = batcher.reserve()
+    except InferenceQueueFullError as e:
+        raise _busy_error(e)
+
+    with slot:
         try:
-            sh.process_charge(user=current_user, action_type='word_analysis', quantity=len(text.split()))
+            await _charge_words(current_user, len(text.split()))
         except InsufficientShobeisError:
             raise HTTPException(status_code=402, detail="Insufficient balance")
 
         start = time.time()
-        analysis = analyzer.analyze_text(text, **validator.validate_options(opts) if opts else {})
+        analysis = await batcher.submit(text, slot=slot, **analysis_options)
         duration = time.time() - start
 
-        if not isinstance(analysis, dict):
-            logger.error("Analyzer returned unexpected value for file: %r", analysis)
-            raise SystemError("Invalid analysis result")
+    if not isinstance(analysis, dict):
+        logger.error("Analyzer returned unexpected value for file: %r", analysis)
+        raise SystemError("Invalid analysis result")
+
+    analysis["metrics"] = {"inference_ms": round(duration * 1000, 2)}
+    analysis["documentInfo"] = {"fileName": filename, "fileType": content_type, "metadata": doc.get('metadata', {})}
+
+    return {"success": True, "data": analysis}
+
+
+async def _charge_words(user, words: int) -> None:
+    """Charge ``user`` for ``words`` of analysis without blocking the event loop."""
+    async with async_session() as session:
+        await session.run_sync(lambda db: ShobeisService(db).process_charge(
+            user=user, action_type='word_analysis', quantity=words))
 
-        analysis["metrics"] = {"inference_ms": round(duration * 1000, 2)}
-        analysis["documentInfo"] = {"fileName": filename, "fileType": file.content_type, "metadata": doc.get('metadata', {})}
 
-        return {"success": True, "data": analysis}
+async def _check_balance(user, words: int) -> None:
+    """Raise InsufficientShobeisError unless ``user`` can pay for ``words`` of analysis."""
+    async with async_session() as session:
+        await session.run_sync(lambda db: ShobeisService(db).check_balance(
+            user=user, action_type='word_analysis', quantity=words))
 
-    finally:
-        db.close()
+
+def _queued_response(job) -> JSONResponse:
+    """202 response for a job handed to the job queue."""
+    return JSONResponse(status_code=202, content={
+        "success": True,
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/api/analyze/jobs/{job.id}"
+    })
+
+
+def _batch_size_limit(user) -> float:
+    """The batch_size of ``user``'s plan.
+
+    ``get_usage_limits`` looks the plan up by UserType member, while the
+    column stores its value (e.g. "PRO"), so the value is resolved here.
+    """
+    user_type = getattr(user, 'user_type', None)
+    if isinstance(user_type, str) and user_type in UserType._value2member_map_:
+        user = User(user_type=UserType(user_type))
+    return user.get_usage_limits().get('batch_size', 1)
+
+
+def _check_stream_format(stream_format: str) -> None:
+    """Reject anything but the two supported event stream formats."""
+    if stream_format not in ("ndjson", "sse"):
+        raise ValidationError("stream must be 'ndjson' or 'sse'", "stream", stream_format)
+
+
+def _stream_job(job: BatchJob, stream_format: str) -> StreamingResponse:
+    """Stream a job's events as NDJSON or server-sent events until it finishes."""
+    _check_stream_format(stream_format)
+
+    async def body():
+        async for event in job.follow():
+            yield format_event(event, stream_format)
+
+    media_type = "text/event-stream" if stream_format == "sse" else "application/x-ndjson"
+    return StreamingResponse(body(), media_type=media_type, headers={"X-Job-ID": job.id})
+
+
+@router.post("/analyze/batch")
+async def analyze_batch(request: Request, stream: Optional[str] = None, current_user=Depends(get_current_user)):
+    """Start a batch analysis job over many files and/or texts.
+
+    Accepts JSON {"texts": [...]} or multipart form data with ``files`` and an
+    optional ``texts`` field holding a JSON array. The job is charged once, for
+    the words of every item whose text was extracted, before any result is
+    released; an item whose scoring then fails is still billed and reported
+    as an error. Returns 202 with the job ID to poll, or with
+    ``?stream=ndjson`` / ``?stream=sse`` streams per-item results as they finish.
+
+    Without the job queue the job lives in this process's memory, so polls must
+    reach the same server process: run a single worker or route by sticky
+    sessions, or enable ANALYZE_JOB_QUEUE.
+    """
+    # Before any work is queued, started or charged
+    if stream:
+        _check_stream_format(stream)
+    uploads = []
+    if request.headers.get("content-type", "").startswith("multipart/form-data"):
+        form = await request.form()
+        uploads = [f for f in form.getlist("files") if hasattr(f, "read")]
+        raw_texts = form.get("texts")
+        try:
+            texts = json.loads(raw_texts) if raw_texts else []
+        except Exception:
+            raise ValidationError("Invalid texts JSON", "texts", None)
+    else:
+        try:
+            texts = (await request.json()).get("texts") or []
+        except Exception:
+            raise ValidationError("Invalid JSON payload", "body", None)
+    if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+        raise ValidationError("texts must be a list of strings", "texts", None)
+
+    count = len(uploads) + len(texts)
+    if not count:
+        raise ValidationError("At least one file or text is required", "files", None)
+    limit = min(_batch_size_limit(current_user), BATCH_MAX_ITEMS)
+    if count > limit:
+        raise HTTPException(status_code=403, detail=f"Batch of {count} items exceeds the limit of {int(limit)} for your plan")
+
+    # Before any file is read or anything is scored. Files are counted once they
+    # are extracted; the texts can be priced now
+    try:
+        await _check_balance(current_user, sum(len(text.split()) for text in texts))
+    except InsufficientShobeisError:
+        raise HTTPException(status_code=402, detail="Insufficient balance")
+
+    items = [BatchItem(index=i, name=f"text-{i}", text=text) for i, text in enumerate(texts)]
+    for upload in uploads:
+        filename = validator.sanitize_filename(upload.filename)
+        if not DocumentProcessor.is_supported_format(upload.content_type):
+            raise DocumentError("Unsupported file type", {"mime": upload.content_type, "file": filename})
+        content = await upload.read()
+        validator.validate_file_size(len(content))
+        items.append(BatchItem(index=len(items), name=filename, content=content, content_type=upload.content_type))
+
+    if job_queue is not None and not stream:
+        files = [item for item in items if item.content is not None]
+        job = await asyncio.get_running_loop().run_in_executor(None, functools.partial(
+            job_queue.enqueue, 'batch',
+            {"texts": texts,
+             "files": [{"name": f.name, "content_type": f.content_type, "size": len(f.content)} for f in files]},
+            user_id=getattr(current_user, 'id', None), data=b"".join(f.content for f in files)
+        ))
+        return _queued_response(job)
+
+    try:
+        await _ensure_model_ready()
+    except Exception as e:
+        logger.exception("Model load failure for batch analysis")
+        raise SystemError("Model not ready", {"cause": str(e)})
+
+    loop = asyncio.get_running_loop()
+
+    async def extract(item: BatchItem) -> str:
+        return await loop.run_in_executor(None, extract_item_text, item, validator, extraction_pool)
+
+    async def score(batch_texts):
+        # Wait for room on the inference executor rather than failing paid-for items
+        while True:
+            try:
+                return await inference_executor.run(analyzer.analyze_batch, batch_texts)
+            except InferenceQueueFullError as e:
+                await asyncio.sleep(e.retry_after)
+
+    async def charge(words: int) -> None:
+        await _charge_words(current_user, words)
+
+    job = batch_jobs.create(getattr(current_user, 'id', None), items)
+    batch_jobs.start(job, extract=extract, score=score, charge=charge)
+    if stream:
+        return _stream_job(job, stream)
+    return JSONResponse(status_code=202, content={
+        "success": True,
+        "job_id": job.id,
+        "status": job.status.value,
+        "items": len(items)
+    })
+
+
+@router.get("/analyze/batch/{job_id}")
+async def batch_job_status(job_id: str, current_user=Depends(get_current_user)):
+    """Poll a batch job: status, item counts and the results published so far."""
+    job = batch_jobs.get(job_id, getattr(current_user, 'id', None))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Batch job not found")
+    return job.to_dict()
+
+
+@router.get("/analyze/batch/{job_id}/events")
+async def batch_job_events(job_id: str, format: str = "ndjson", current_user=Depends(get_current_user)):
+    """Stream a batch job's events (from the start) as NDJSON or server-sent events."""
+    job = batch_jobs.get(job_id, getattr(current_user, 'id', None))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Batch job not found")
+    return _stream_job(job, format)
+
+
+@router.get("/analyze/jobs/{job_id}")
+async def queued_job_status(job_id: str, current_user=Depends(get_current_user)):
+    """Status and, once finished, the stored result of a queued file or batch job."""
+    job = None
+    if job_queue is not None:
+        job = await asyncio.get_running_loop().run_in_executor(
+            None, job_queue.get, job_id, getattr(current_user, 'id', None)
+        )
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
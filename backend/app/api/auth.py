@@ -6,10 +6,14 @@ from pydantic import BaseModel, EmailStr
 from datetime import datetime, timedelta, UTC
 import uuid
 import logging
+import time
 
 from ..models.user import User, UserRole, UserType, SubscriptionStatus
 from ..models.blacklisted_token import BlacklistedToken
-from ..utils.database import get_db
+from ..utils.database import get_async_db, get_db
+from ..utils.monitoring import MetricsCollector
+from ..utils.token_blacklist import token_blacklist
+from ..utils.user_cache import user_cache
 from ..utils.security import (
     verify_password,
     get_password_hash,
@@ -232,7 +236,13 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session =
             detail="An error occurred during login. Please try again."
         )
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+def _load_user_snapshot(session: Session, user_id: str) -> Optional[dict]:
+    """Column snapshot of a user, so it can be handed from the async session to the request's."""
+    user = session.query(User).filter(User.id == user_id).first()
+    return user_cache.snapshot(user) if user is not None else None
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db),
+                           async_db=Depends(get_async_db)) -> User:
     """Get current authenticated user."""
     try:
         payload = decode_token(token)
@@ -250,7 +260,18 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = db.query(User).filter(User.id == user_id).first()
+    # Served from a short-lived snapshot when possible; balance changes re-read the row
+    start = time.perf_counter()
+    user = user_cache.get(user_id, db)
+    source = "cache"
+    if user is None:
+        source = "db"
+        # Loaded off the event loop, then attached to ``db`` for the endpoint to use
+        snapshot = await async_db.run_sync(_load_user_snapshot, user_id)
+        if snapshot is not None:
+            user = user_cache.attach(snapshot, db)
+            user_cache.put(user)
+    MetricsCollector().add_metric('auth_user_load_ms', (time.perf_counter() - start) * 1000, {"source": source})
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -343,4 +364,5 @@ async def logout(
     )
     db.add(blacklist_token)
     db.commit()
+    token_blacklist.add(payload["jti"], payload["exp"])
     return {"message": "Successfully logged out"}
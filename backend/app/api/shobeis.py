@@ -4,7 +4,7 @@ from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from app.api.auth import get_current_user
-from app.utils.database import get_db
+from app.utils.database import get_async_db, get_db
 from app.services.shobeis_service import ShobeisService, InsufficientShobeisError
 from app.models.user import User, UserType
 
@@ -28,15 +28,21 @@ class PurchaseRequest(BaseModel):
     currency: str = "USD"
 
 
+def _read_balances(db: Session, user_id: str):
+    """Current balances from the row, rather than the cached user."""
+    return db.query(User.shobeis_balance, User.bonus_balance).filter(User.id == user_id).one()
+
+
 @router.get("/shobeis/balance")
 @router.get("/balance")
-async def get_balance(current_user: User = Depends(get_current_user)):
+async def get_balance(current_user: User = Depends(get_current_user), async_db=Depends(get_async_db)):
     # Set monthly_refresh_amount based on user_type
     monthly_refresh = 1000 if current_user.user_type == UserType.PRO.value else 0
-    
+    balance, bonus = await async_db.run_sync(_read_balances, current_user.id)
+
     return {
-        "balance": getattr(current_user, 'shobeis_balance', 0),
-        "bonus": getattr(current_user, 'bonus_balance', 0),
+        "balance": balance or 0,
+        "bonus": bonus or 0,
         "user_type": getattr(current_user, 'user_type', None),
         "monthly_refresh_amount": monthly_refresh
     }
@@ -52,22 +58,28 @@ async def estimate_cost(req: EstimateRequest, current_user: User = Depends(get_c
 
 @router.post("/shobeis/charge")
 @router.post("/charge")
-async def charge(req: ChargeRequest, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    svc = ShobeisService(db)
+async def charge(req: ChargeRequest, current_user: User = Depends(get_current_user), async_db=Depends(get_async_db)):
+    def process(db: Session):
+        return ShobeisService(db).process_charge(user=current_user, action_type=req.action_type, quantity=req.quantity, idempotency_key=req.idempotency_key)
+
     try:
-        balance_before = current_user.shobeis_balance
-        tx = svc.process_charge(user=current_user, action_type=req.action_type, quantity=req.quantity, idempotency_key=req.idempotency_key)
-        # refresh current_user from the session to reflect changes
-        db.refresh(current_user)
-        balance_after = current_user.shobeis_balance
+        ledger = await async_db.run_sync(process)
     except InsufficientShobeisError:
         raise HTTPException(status_code=402, detail="Insufficient balance")
+    # One ledger row per balance drawn from (monthly, bonus, main). amount is the
+    # whole charge; balance and balance_before/after are the main balance, as
+    # recorded by the charge itself (also when an idempotency key replays it)
+    balance_before, balance_after = ledger[0]["balance_before"], ledger[-1]["balance_after"]
     return {
-        "transaction_id": tx.id,
+        "transaction_id": ledger[0]["id"],
         "balance": balance_after,
-        "amount": getattr(tx, 'amount', None),
+        "amount": sum(row["amount"] for row in ledger),
         "balance_before": balance_before,
-        "balance_after": balance_after
+        "balance_after": balance_after,
+        "breakdown": [
+            {"transaction_id": row["id"], "transaction_type": row["transaction_type"], "amount": row["amount"]}
+            for row in ledger
+        ]
     }
 
 
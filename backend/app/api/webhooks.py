@@ -4,6 +4,7 @@ from app.utils.database import get_db
 from app.models.user import User
 from app.models.shobeis_transaction import ShobeisTransaction, TransactionType
 from app.utils.config import settings
+from app.utils.user_cache import user_cache
 from typing import Dict, Any
 import hmac
 import hashlib
@@ -61,6 +62,7 @@ async def process_payment_succeeded(event_data: Dict[str, Any], db: Session):
         )
         
         db.commit()
+        user_cache.invalidate(user_id)
         return transaction.to_dict()
         
     except Exception as e:
@@ -119,6 +121,7 @@ async def process_subscription_change(event_data: Dict[str, Any], db: Session):
         )
         
         db.commit()
+        user_cache.invalidate(user_id)
         return transaction.to_dict()
         
     except Exception as e:
@@ -140,6 +143,7 @@ async def process_refund(event_data: Dict[str, Any], db: Session):
                 f"Payment refunded: {event_data.reason or 'No reason provided'}"
             )
             db.commit()
+            user_cache.invalidate(transaction.user_id)
             return refund_tx.to_dict()
             
         return {"status": "ignored", "reason": "Transaction not found or already refunded"}
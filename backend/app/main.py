@@ -25,6 +25,20 @@ app.add_middleware(
     max_age=3600,
 )
 
+# Reject oversized uploads while they stream in, and spool large files to disk
+from app.utils.uploads import (
+    BATCH_MAX_BODY_BYTES, UPLOAD_MULTIPART_OVERHEAD, UploadLimitMiddleware, set_spool_threshold
+)
+from app.utils.validation import InputValidator
+set_spool_threshold()
+app.add_middleware(
+    UploadLimitMiddleware,
+    limits={
+        "/api/analyze/file": InputValidator.MAX_FILE_SIZE + UPLOAD_MULTIPART_OVERHEAD,
+        "/api/analyze/batch": BATCH_MAX_BODY_BYTES,
+    },
+)
+
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["authentication"])
 app.include_router(analytics.router, prefix="/api/analytics", tags=["analytics"])
@@ -60,6 +74,26 @@ except Exception as e:
     print(f"[WARN] Scheduler not started: {e}")
 
 
+@app.on_event("startup")
+async def preload_model():
+    """Warm the model up in the background when ANALYZER_PRELOAD is set."""
+    if analyze.PRELOAD_MODEL:
+        analyze.start_preload()
+
+
+@app.on_event("shutdown")
+async def stop_inference_batcher():
+    """Stop the inference batcher's worker before the event loop goes away."""
+    await analyze.batcher.close()
+
+
+@app.on_event("shutdown")
+async def close_database():
+    """Close the async engine's connections."""
+    from app.utils.database import dispose_async_engine
+    await dispose_async_engine()
+
+
 @app.get("/")
 async def root():
     return {"message": "AI Content Detector API - Auth Test", "status": "operational"}
\ No newline at end of file
@@ -9,7 +9,7 @@ class BlacklistedToken(Base):
     token = Column(String, primary_key=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
     expires_at = Column(DateTime, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)  # synced incrementally by token_blacklist
 
     # Relationship with User model
     user = relationship("User", back_populates="blacklisted_tokens")
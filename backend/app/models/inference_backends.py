@@ -0,0 +1,174 @@
+"""Exported inference backends for the detector model.
+
+``AIContentAnalyzer`` serves the Hugging Face eager model by default. The
+backends here export the loaded model once, cache the artifact next to the
+model cache and serve inference through ONNX Runtime (CPU, all graph
+optimizations) or a frozen TorchScript module. Both are called like the eager
+model and return an object with ``logits``, so ``_predict`` is unchanged.
+"""
+from typing import Optional
+from dataclasses import dataclass
+from pathlib import Path
+import hashlib
+import logging
+import os
+import tempfile
+import torch
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("pytorch", "onnx", "torchscript")
+
+
+@dataclass
+class BackendOutput:
+    """Model output compatible with the fields ``_predict`` reads."""
+    logits: torch.Tensor
+    attentions: Optional[tuple] = None
+
+
+def model_fingerprint(model) -> str:
+    """Hash of the model config and weights, used to name cached artifacts."""
+    digest = hashlib.sha256()
+    digest.update(model.config.to_json_string().encode("utf-8"))
+    digest.update(torch.__version__.encode("utf-8"))
+    with torch.no_grad():
+        for name, tensor in model.state_dict().items():
+            digest.update(f"{name}:{tuple(tensor.shape)}:{float(tensor.float().sum()):.6e}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _example_inputs(model):
+    """Small padded batch used to trace the model."""
+    pad_id = model.config.pad_token_id if model.config.pad_token_id is not None else 0
+    token_id = 5 if pad_id != 5 else 6
+    input_ids = torch.full((2, 8), token_id, dtype=torch.long)
+    attention_mask = torch.ones((2, 8), dtype=torch.long)
+    # Second row is padded so the trace covers masked positions
+    input_ids[1, 5:] = pad_id
+    attention_mask[1, 5:] = 0
+    return input_ids, attention_mask
+
+
+def _write_atomically(path: Path, write) -> None:
+    """Call ``write(tmp_path)`` and move the result into place."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class OnnxRuntimeModel:
+    """Detector served by an ONNX Runtime CPU session."""
+
+    def __init__(self, path: Path, num_threads: int = 0):
+        """Open an inference session.
+
+        Args:
+            path: Exported ``.onnx`` file.
+            num_threads: Intra-op threads; 0 lets ONNX Runtime decide.
+        """
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.path = Path(path)
+        self.session = ort.InferenceSession(str(path), options, providers=["CPUExecutionProvider"])
+
+    @staticmethod
+    def export(model, path: Path) -> None:
+        """Export an eager sequence classification model to ONNX."""
+        input_ids, attention_mask = _example_inputs(model)
+
+        def write(tmp_path):
+            torch.onnx.export(
+                model,
+                (input_ids, attention_mask),
+                tmp_path,
+                input_names=["input_ids", "attention_mask"],
+                output_names=["logits"],
+                dynamic_axes={
+                    "input_ids": {0: "batch", 1: "sequence"},
+                    "attention_mask": {0: "batch", 1: "sequence"},
+                    "logits": {0: "batch"}
+                },
+                opset_version=17,
+                dynamo=False
+            )
+
+        with torch.no_grad():
+            _write_atomically(Path(path), write)
+
+    def __call__(self, input_ids: torch.Tensor, attention_mask: torch.Tensor, **kwargs) -> BackendOutput:
+        logits = self.session.run(
+            ["logits"],
+            {"input_ids": input_ids.cpu().numpy(), "attention_mask": attention_mask.cpu().numpy()}
+        )[0]
+        return BackendOutput(logits=torch.from_numpy(logits))
+
+
+class TorchScriptModel:
+    """Detector served by a frozen TorchScript module."""
+
+    def __init__(self, path: Path):
+        """Load a saved TorchScript module.
+
+        Args:
+            path: Exported ``.pt`` file.
+        """
+        self.path = Path(path)
+        self.module = torch.jit.load(str(path), map_location="cpu")
+        self.module.eval()
+
+    @staticmethod
+    def export(model, path: Path) -> None:
+        """Trace, freeze and save an eager sequence classification model."""
+        input_ids, attention_mask = _example_inputs(model)
+        with torch.no_grad():
+            traced = torch.jit.trace(model, (input_ids, attention_mask), strict=False)
+            frozen = torch.jit.freeze(traced.eval())
+        _write_atomically(Path(path), lambda tmp_path: torch.jit.save(frozen, tmp_path))
+
+    def __call__(self, input_ids: torch.Tensor, attention_mask: torch.Tensor, **kwargs) -> BackendOutput:
+        with torch.no_grad():
+            outputs = self.module(input_ids, attention_mask)
+        logits = outputs["logits"] if isinstance(outputs, dict) else outputs[0]
+        return BackendOutput(logits=logits)
+
+
+def load_backend(backend: str, model, artifact_dir: Path, num_threads: int = 0):
+    """Export ``model`` for ``backend`` if not cached yet and load it.
+
+    Args:
+        backend: "onnx" or "torchscript".
+        model: Loaded eager model on CPU, in eval mode.
+        artifact_dir: Directory holding exported artifacts for this model.
+        num_threads: Intra-op threads for ONNX Runtime; 0 uses its default.
+
+    Returns:
+        Callable model returning ``BackendOutput``.
+    """
+    fingerprint = model_fingerprint(model)
+    if backend == "onnx":
+        path = Path(artifact_dir) / "onnx" / f"model-{fingerprint}.onnx"
+        if not path.exists():
+            logger.info(f"Exporting model to ONNX at {path}")
+            OnnxRuntimeModel.export(model, path)
+        return OnnxRuntimeModel(path, num_threads)
+    if backend == "torchscript":
+        path = Path(artifact_dir) / "torchscript" / f"model-{fingerprint}.pt"
+        if not path.exists():
+            logger.info(f"Exporting model to TorchScript at {path}")
+            TorchScriptModel.export(model, path)
+        return TorchScriptModel(path)
+    raise ValueError(f"Unknown inference backend: {backend}")
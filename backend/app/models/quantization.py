@@ -0,0 +1,84 @@
+"""Dynamic INT8 quantization of the detector for CPU inference.
+
+``torch.ao.quantization.quantize_dynamic`` replaces every ``nn.Linear`` with
+an INT8 dynamic-quantized equivalent. The result is saved as a state dict
+keyed by a fingerprint of the fp32 weights, so later loads only swap in
+empty quantized layers and restore the packed weights instead of
+re-quantizing.
+"""
+from pathlib import Path
+import logging
+import os
+import tempfile
+import torch
+from torch import nn
+
+logger = logging.getLogger(__name__)
+
+
+def _swap_linear_layers(module: nn.Module) -> None:
+    """Replace every ``nn.Linear`` with an empty INT8 dynamic-quantized Linear."""
+    from torch.ao.nn.quantized.dynamic import Linear as DynamicQuantizedLinear
+
+    for name, child in module.named_children():
+        if type(child) is nn.Linear:
+            setattr(module, name, DynamicQuantizedLinear(
+                child.in_features, child.out_features, bias_=child.bias is not None, dtype=torch.qint8
+            ))
+        else:
+            _swap_linear_layers(child)
+
+
+def int8_supported() -> bool:
+    """Whether this torch build has a quantized CPU engine."""
+    return any(engine != "none" for engine in torch.backends.quantized.supported_engines)
+
+
+def quantize_dynamic_int8(model: nn.Module, cache_dir: Path) -> nn.Module:
+    """Quantize a CPU model's Linear layers to INT8, reusing a cached state dict.
+
+    Args:
+        model: Loaded fp32 model in eval mode.
+        cache_dir: Directory holding cached quantized state dicts for this model.
+
+    Returns:
+        The quantized model.
+    """
+    from .inference_backends import model_fingerprint
+
+    cache_path = Path(cache_dir) / "int8" / f"model-{model_fingerprint(model)}.pt"
+    if cache_path.exists():
+        try:
+            state_dict = torch.load(cache_path, map_location="cpu", weights_only=True)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable quantized state dict {cache_path}: {str(e)}")
+        else:
+            _swap_linear_layers(model)
+            try:
+                model.load_state_dict(state_dict)
+            except Exception:
+                # The fp32 layers are already gone; drop the bad file so the next load re-quantizes
+                cache_path.unlink(missing_ok=True)
+                raise
+            logger.info(f"Loaded INT8 model from {cache_path}")
+            return model.eval()
+
+    from torch.ao.quantization import quantize_dynamic
+
+    logger.info("Applying dynamic INT8 quantization to Linear layers")
+    # In place, so the fp32 and INT8 copies of large layers never coexist in full
+    quantized = quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8, inplace=True).eval()
+
+    tmp_path = None
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, suffix=".tmp")
+        os.close(fd)
+        torch.save(quantized.state_dict(), tmp_path)
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        logger.warning(f"Could not cache quantized state dict: {str(e)}")
+        if tmp_path and os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+    return quantized
@@ -9,6 +9,7 @@ from typing import Optional, Dict, Any
 from datetime import datetime, timedelta, UTC
 from app.models.shobeis_transaction import TransactionType, ShobeisTransaction
 from app.models.user_analytics import UserAnalytics
+from app.utils.user_cache import user_cache
 
 
 class UserType(enum.Enum):
@@ -159,7 +160,9 @@ class User(Base):
                 description='Main balance usage'
             )
             db.add(tx)
-            
+
+        # The caller commits; cached snapshots of this user are stale from here on
+        user_cache.invalidate(self.id)
         return True
 
     def get_usage_limits(self) -> Dict[str, Any]:
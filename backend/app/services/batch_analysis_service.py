@@ -0,0 +1,292 @@
+"""Batch analysis jobs: extract many documents, score them and stream the results.
+
+Every item of a job goes through two overlapping stages. Items are extracted
+concurrently and each text is queued for scoring as soon as it is available;
+a scorer drains that queue in batches (``AIContentAnalyzer.analyze_batch``),
+so inference starts while slower files are still being parsed. The job is
+charged once, for the words of all extracted items, as soon as every text is
+known; results scored before the charge succeeds are held back and released
+with it. Items that fail to extract are not billed; items that fail to score
+are, since the charge is taken before scoring ends. Each state change is
+appended to the job's event log, which pollers read as a snapshot and
+streaming clients follow as NDJSON or server-sent events.
+"""
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+from dataclasses import dataclass
+from enum import Enum
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Batch job configuration
+BATCH_MAX_ITEMS = int(os.environ.get("ANALYZE_BATCH_MAX_ITEMS", 100))  # Hard cap on top of the plan's batch_size
+BATCH_SCORE_SIZE = int(os.environ.get("ANALYZE_BATCH_SCORE_SIZE", 16))  # Texts per analyze_batch call
+BATCH_EXTRACT_CONCURRENCY = int(os.environ.get("ANALYZE_BATCH_EXTRACT_CONCURRENCY", 4))  # Files extracted at once
+BATCH_JOB_TTL = float(os.environ.get("ANALYZE_BATCH_JOB_TTL", 3600))  # Seconds a finished job stays pollable
+
+
+class JobStatus(Enum):
+    """Status of a batch analysis job."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+@dataclass
+class BatchItem:
+    """One file or text of a batch job."""
+    index: int
+    name: str
+    text: Optional[str] = None
+    content: Optional[bytes] = None
+    content_type: Optional[str] = None
+    status: str = "queued"
+    words: int = 0
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "index": self.index,
+            "name": self.name,
+            "status": self.status,
+            "words": self.words,
+            "result": self.result,
+            "error": self.error
+        }
+
+
+class BatchJob:
+    """State and event log of one batch analysis job."""
+
+    def __init__(self, user_id: Optional[str], items: List[BatchItem]):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.items = items
+        self.status = JobStatus.QUEUED
+        self.error: Optional[str] = None
+        self.words = 0
+        self.charged = False
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.events: List[Dict[str, Any]] = []
+        self.task: Optional[asyncio.Task] = None
+        self._updated = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JobStatus.COMPLETED, JobStatus.FAILED)
+
+    def emit(self, event: str, **data) -> None:
+        """Append an event to the log and wake up the clients following it."""
+        self.events.append({"event": event, "job_id": self.id, **data})
+        # Waiters hold the old Event; a fresh one is armed for the next change
+        updated, self._updated = self._updated, asyncio.Event()
+        updated.set()
+
+    async def follow(self) -> AsyncIterator[Dict[str, Any]]:
+        """Yield every event of the job, past and future, until it finishes."""
+        position = 0
+        while True:
+            updated = self._updated
+            while position < len(self.events):
+                yield self.events[position]
+                position += 1
+            if self.finished:
+                return
+            await updated.wait()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Pollable snapshot of the job."""
+        counts = {"queued": 0, "extracted": 0, "completed": 0, "failed": 0}
+        for item in self.items:
+            counts[item.status] += 1
+        return {
+            "job_id": self.id,
+            "status": self.status.value,
+            "error": self.error,
+            "words": self.words,
+            "charged": self.charged,
+            "counts": counts,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "items": [item.to_dict() for item in self.items]
+        }
+
+
+def extract_item_text(item: BatchItem, validator, pool=None) -> str:
+    """Extract and validate the text of a batch item (blocking).
+
+    Args:
+        item: File or text item; file content is parsed with DocumentProcessor.
+        validator: InputValidator used for the text.
+        pool: Optional ExtractionPool to parse files in.
+
+    Returns:
+        Validated text.
+    """
+    from ..utils.document_processor import DocumentProcessor
+    from ..utils.exceptions import DocumentError
+
+    if item.content is not None:
+        doc = DocumentProcessor().process_document_bytes(
+            item.content, item.content_type, include_pages=False, pool=pool
+        )
+        item.text = doc.get('text') or ''
+    if not (item.text or '').strip():
+        raise DocumentError("No text extracted", {"file": item.name})
+    return validator.validate_text(item.text)
+
+
+def format_event(event: Dict[str, Any], stream_format: str) -> str:
+    """Encode an event as an NDJSON line or a server-sent event."""
+    if stream_format == "sse":
+        return f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+    return json.dumps(event) + "\n"
+
+
+async def run_job(
+    job: BatchJob,
+    extract: Callable[[BatchItem], Awaitable[str]],
+    score: Callable[[List[str]], Awaitable[List[Dict[str, Any]]]],
+    charge: Callable[[int], Awaitable[None]],
+    score_size: int = BATCH_SCORE_SIZE,
+    extract_concurrency: int = BATCH_EXTRACT_CONCURRENCY
+) -> None:
+    """Run a batch job to completion, recording its progress as events.
+
+    Args:
+        job: Job to run.
+        extract: Returns the validated text of an item (raises if there is none).
+        score: Scores a list of texts, one result dict per text.
+        charge: Charges the user for a number of words (raises if it cannot).
+        score_size: Texts per ``score`` call.
+        extract_concurrency: Items extracted at the same time.
+    """
+    job.status = JobStatus.RUNNING
+    job.emit("job", status=job.status.value, items=len(job.items))
+    ready: asyncio.Queue = asyncio.Queue()
+    held: List[tuple] = []
+
+    def publish(item: BatchItem, result: Dict[str, Any]) -> None:
+        if "error" in result:
+            item.status, item.error = "failed", result["error"]
+            job.emit("error", index=item.index, name=item.name, error=item.error)
+        else:
+            item.status, item.result = "completed", result
+            job.emit("result", index=item.index, name=item.name, result=result)
+
+    async def extract_item(item: BatchItem, slots: asyncio.Semaphore) -> None:
+        async with slots:
+            try:
+                item.text = await extract(item)
+            except Exception as e:
+                item.status, item.error = "failed", str(e)
+                job.emit("error", index=item.index, name=item.name, error=item.error)
+                return
+            finally:
+                # The raw file is not needed once its text is out
+                item.content = None
+        item.status, item.words = "extracted", len(item.text.split())
+        job.emit("extracted", index=item.index, name=item.name, words=item.words)
+        ready.put_nowait(item)
+
+    async def extract_all() -> None:
+        slots = asyncio.Semaphore(extract_concurrency)
+        await asyncio.gather(*(extract_item(item, slots) for item in job.items))
+        ready.put_nowait(None)
+
+    async def score_all() -> None:
+        done = False
+        while not done:
+            # Score whatever is ready, up to score_size texts, as one batch
+            batch = [await ready.get()]
+            while len(batch) < score_size and not ready.empty():
+                batch.append(ready.get_nowait())
+            if batch[-1] is None:
+                batch.pop()
+                done = True
+            if not batch:
+                continue
+            try:
+                results = await score([item.text for item in batch])
+            except Exception as e:
+                logger.error(f"Batch job {job.id} failed to score {len(batch)} items: {e}")
+                results = [{"error": f"Analysis failed: {e}"}] * len(batch)
+            for item, result in zip(batch, results):
+                if job.charged:
+                    publish(item, result)
+                else:
+                    held.append((item, result))
+
+    scorer = asyncio.ensure_future(score_all())
+    try:
+        await extract_all()
+        job.words = sum(item.words for item in job.items)
+        if job.words:
+            await charge(job.words)
+        job.charged = True
+        job.emit("charged", words=job.words)
+        for item, result in held:
+            publish(item, result)
+        held.clear()
+        await scorer
+        job.status = JobStatus.COMPLETED
+    except Exception as e:
+        logger.error(f"Batch job {job.id} failed: {e}")
+        job.status, job.error = JobStatus.FAILED, str(e)
+    finally:
+        if not scorer.done():
+            scorer.cancel()
+            await asyncio.gather(scorer, return_exceptions=True)
+        if not job.finished:
+            # Cancelled from outside
+            job.status, job.error = JobStatus.FAILED, "Cancelled"
+        job.finished_at = time.time()
+        counts = job.to_dict()["counts"]
+        job.emit("done", status=job.status.value, error=job.error,
+                 completed=counts["completed"], failed=counts["failed"])
+
+
+class BatchJobManager:
+    """In-memory registry of batch jobs; finished jobs expire after a TTL.
+
+    Jobs are only known to the process that created them, so with several
+    server workers a poll must be routed back to that process.
+    """
+
+    def __init__(self, ttl: float = BATCH_JOB_TTL):
+        self.ttl = ttl
+        self._jobs: Dict[str, BatchJob] = {}
+
+    def create(self, user_id: Optional[str], items: List[BatchItem]) -> BatchJob:
+        """Register a new job for ``items``."""
+        self._prune()
+        job = BatchJob(user_id, items)
+        self._jobs[job.id] = job
+        return job
+
+    def start(self, job: BatchJob, **callables) -> asyncio.Task:
+        """Run ``job`` in the background; see ``run_job`` for the callables."""
+        job.task = asyncio.ensure_future(run_job(job, **callables))
+        return job.task
+
+    def get(self, job_id: str, user_id: Optional[str] = None) -> Optional[BatchJob]:
+        """Job by ID, or None if it does not exist, has expired or belongs to another user."""
+        self._prune()
+        job = self._jobs.get(job_id)
+        if job is None or (user_id is not None and job.user_id != user_id):
+            return None
+        return job
+
+    def _prune(self) -> None:
+        """Forget finished jobs older than the TTL."""
+        cutoff = time.time() - self.ttl
+        for job_id in [j.id for j in self._jobs.values() if j.finished and j.finished_at < cutoff]:
+            del self._jobs[job_id]
@@ -0,0 +1,273 @@
+"""Worker process that drains the analysis job queue.
+
+Run next to the API with ``python -m app.services.job_worker``. The worker
+loads and warms up its own copy of the model, then ``--concurrency`` threads
+claim jobs from the queue configured by JOB_QUEUE_BACKEND, run them and store
+their results (or errors) on the job. File jobs are charged once the analysis
+has succeeded; batch jobs are charged once for all their words, as in the
+inline batch API. The lease on a job is renewed while it runs, and charges
+carry the job ID as idempotency key, so a job that is run again after its
+worker died is not billed twice.
+"""
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import threading
+import time
+
+from .batch_analysis_service import BatchItem, BatchJob, JobStatus, extract_item_text, run_job
+from ..utils.document_processor import DocumentProcessor
+from ..utils.exceptions import DocumentError
+from ..utils.extraction_pool import get_extraction_pool
+from ..utils.job_queue import QueuedJob, create_job_queue
+from ..utils.validation import InputValidator
+
+logger = logging.getLogger(__name__)
+
+# Worker configuration
+JOB_WORKER_CONCURRENCY = int(os.environ.get("JOB_WORKER_CONCURRENCY", 2))  # Jobs run at the same time
+JOB_WORKER_POLL_INTERVAL = float(os.environ.get("JOB_WORKER_POLL_INTERVAL", 1.0))  # seconds between empty polls
+
+
+def charge_user(user_id: Optional[str], words: int, idempotency_key: Optional[str] = None) -> None:
+    """Charge a user for analyzed words through ShobeisService.
+
+    Args:
+        user_id: User to charge.
+        words: Analyzed words.
+        idempotency_key: Charges with the same key are only made once.
+
+    Raises:
+        ValueError: If the user does not exist.
+        InsufficientShobeisError: If the user cannot pay.
+    """
+    from ..models.user import User
+    from ..utils.database import SessionLocal
+    from .shobeis_service import ShobeisService
+
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.id == user_id).first()
+        if user is None:
+            raise ValueError(f"User {user_id} not found")
+        ShobeisService(db).process_charge(user=user, action_type='word_analysis', quantity=words,
+                                          idempotency_key=idempotency_key)
+    finally:
+        db.close()
+
+
+def _charge_key(job: QueuedJob) -> str:
+    """Idempotency key of the charge for ``job``, the same for every attempt."""
+    return f"job:{job.id}"
+
+
+class JobWorker:
+    """Claims jobs from a queue and runs them with one analyzer."""
+
+    def __init__(self, queue, analyzer, concurrency: int = JOB_WORKER_CONCURRENCY,
+                 poll_interval: float = JOB_WORKER_POLL_INTERVAL,
+                 charge: Callable[[Optional[str], int, Optional[str]], None] = charge_user,
+                 extraction_pool=None):
+        """Initialize the worker.
+
+        Args:
+            queue: SQLiteJobQueue or RedisJobQueue.
+            analyzer: AIContentAnalyzer used for scoring.
+            concurrency: Jobs run at the same time.
+            poll_interval: Seconds to wait after finding the queue empty.
+            charge: Called with (user_id, words, idempotency_key) to bill a job.
+            extraction_pool: Optional ExtractionPool for PDF/DOCX parsing.
+        """
+        self.queue = queue
+        self.analyzer = analyzer
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self.charge = charge
+        self.extraction_pool = extraction_pool
+        self.validator = InputValidator()
+        self._handlers = {"file": self._run_file, "batch": self._run_batch}
+        self._last_purge = 0.0
+
+    def process(self, job: QueuedJob) -> Dict[str, Any]:
+        """Run a claimed job and return its result.
+
+        Raises:
+            ValueError: If the job kind is unknown; handler errors propagate.
+        """
+        handler = self._handlers.get(job.kind)
+        if handler is None:
+            raise ValueError(f"Unknown job kind: {job.kind}")
+        return handler(job)
+
+    def _run_file(self, job: QueuedJob) -> Dict[str, Any]:
+        """Extract, score and charge one uploaded file, like POST /analyze/file."""
+        payload = job.payload
+        doc = DocumentProcessor().process_document_bytes(
+            job.data, payload["content_type"], include_pages=False, pool=self.extraction_pool
+        )
+        text = doc.get('text') or ''
+        if not text.strip():
+            raise DocumentError("No text extracted from document", {"file": payload["filename"]})
+        text = self.validator.validate_text(text)
+
+        start = time.time()
+        options = {"sliding_window": True, **payload.get("options", {})}
+        analysis = self.analyzer.analyze_text(text, **options)
+        duration = time.time() - start
+
+        # Charged only once the result exists; the key keeps a re-run of the job from billing again
+        self.charge(job.user_id, len(text.split()), _charge_key(job))
+        analysis["metrics"] = {"inference_ms": round(duration * 1000, 2)}
+        analysis["documentInfo"] = {
+            "fileName": payload["filename"],
+            "fileType": payload["content_type"],
+            "metadata": doc.get('metadata', {})
+        }
+        return {"success": True, "data": analysis}
+
+    def _run_batch(self, job: QueuedJob) -> Dict[str, Any]:
+        """Run a batch job; the files arrive concatenated in ``job.data``."""
+        payload = job.payload
+        items: List[BatchItem] = [
+            BatchItem(index=i, name=f"text-{i}", text=text) for i, text in enumerate(payload.get("texts", []))
+        ]
+        offset = 0
+        for meta in payload.get("files", []):
+            items.append(BatchItem(
+                index=len(items), name=meta["name"], content_type=meta["content_type"],
+                content=job.data[offset:offset + meta["size"]]
+            ))
+            offset += meta["size"]
+        batch = BatchJob(job.user_id, items)
+
+        async def run() -> None:
+            loop = asyncio.get_running_loop()
+
+            async def extract(item: BatchItem) -> str:
+                return await loop.run_in_executor(None, extract_item_text, item, self.validator, self.extraction_pool)
+
+            async def score(texts: List[str]) -> List[Dict[str, Any]]:
+                return await loop.run_in_executor(None, self.analyzer.analyze_batch, texts)
+
+            async def charge(words: int) -> None:
+                await loop.run_in_executor(None, self.charge, job.user_id, words, _charge_key(job))
+
+            await run_job(batch, extract=extract, score=score, charge=charge)
+
+        asyncio.run(run())
+        if batch.status == JobStatus.FAILED:
+            raise ValueError(batch.error)
+        return batch.to_dict()
+
+    def run_once(self) -> bool:
+        """Claim and run one job; returns False when the queue is empty."""
+        job = self.queue.claim()
+        if job is None:
+            return False
+        logger.info(f"Running {job.kind} job {job.id} (attempt {job.attempts})")
+        with self._keep_lease(job):
+            try:
+                result = self.process(job)
+            except Exception as e:
+                logger.error(f"Job {job.id} failed: {e}")
+                finished = self.queue.fail(job.id, str(e), attempt=job.attempts)
+            else:
+                finished = self.queue.complete(job.id, result, attempt=job.attempts)
+        if not finished:
+            logger.warning(f"Job {job.id} attempt {job.attempts} lost its lease; outcome discarded")
+        return True
+
+    @contextmanager
+    def _keep_lease(self, job: QueuedJob) -> Iterator[None]:
+        """Renew the lease on ``job`` every third of the lease period until the block exits."""
+        stop = threading.Event()
+        interval = self.queue.lease_seconds / 3
+
+        def heartbeat() -> None:
+            while not stop.wait(interval):
+                try:
+                    if not self.queue.renew(job.id, job.attempts):
+                        logger.warning(f"Job {job.id} attempt {job.attempts} no longer holds its lease")
+                        return
+                except Exception as e:
+                    # Queue briefly unavailable; the lease still has time left
+                    logger.error(f"Could not renew the lease on job {job.id}: {e}")
+
+        thread = threading.Thread(target=heartbeat, name=f"job-lease-{job.id}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def drain(self) -> int:
+        """Run jobs until the queue is empty; returns how many were run."""
+        count = 0
+        while self.run_once():
+            count += 1
+        return count
+
+    def _purge_expired(self) -> None:
+        """Delete expired finished jobs, at most once an hour."""
+        now = time.time()
+        if now - self._last_purge >= 3600:
+            self._last_purge = now
+            removed = self.queue.purge()
+            if removed:
+                logger.info(f"Purged {removed} expired jobs")
+
+    def run(self, stop: threading.Event) -> None:
+        """Run ``concurrency`` job loops until ``stop`` is set."""
+        def loop() -> None:
+            while not stop.is_set():
+                try:
+                    if not self.run_once():
+                        self._purge_expired()
+                        stop.wait(self.poll_interval)
+                except Exception as e:
+                    # Queue unavailable; keep polling
+                    logger.error(f"Job queue error: {e}")
+                    stop.wait(self.poll_interval)
+
+        threads = [threading.Thread(target=loop, name=f"job-worker-{i}", daemon=True)
+                   for i in range(self.concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Drain the analysis job queue.")
+    parser.add_argument("--concurrency", type=int, default=JOB_WORKER_CONCURRENCY, help="Jobs run at the same time")
+    parser.add_argument("--drain", action="store_true", help="Exit once the queue is empty")
+    args = parser.parse_args(argv)
+
+    from ..models.analyzer import AIContentAnalyzer
+
+    logging.basicConfig(level=logging.INFO)
+    analyzer = AIContentAnalyzer()
+    analyzer._load_model()
+    analyzer.warm_up()
+    worker = JobWorker(create_job_queue(), analyzer, concurrency=args.concurrency,
+                       extraction_pool=get_extraction_pool())
+
+    if args.drain:
+        logger.info(f"Ran {worker.drain()} jobs")
+        return 0
+
+    stop = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop.set())
+    logger.info(f"Job worker started with concurrency {worker.concurrency}")
+    worker.run(stop)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
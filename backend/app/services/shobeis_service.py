@@ -2,11 +2,26 @@ from typing import Optional, Dict, Any, Tuple, List, Union
 from sqlalchemy import Column
 from datetime import datetime, UTC
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy import inspect, insert, select, text, update
+from sqlalchemy.exc import IntegrityError, OperationalError
 from app.models.user import User, UserType
 from app.models.shobeis_transaction import ShobeisTransaction, TransactionType, TransactionStatus
 from app.models.user_analytics import UserAnalytics
+from app.utils.user_cache import user_cache
 import math
+import os
+import time
+import uuid
+
+# Pricing rarely changes; cache it per process instead of reading pricing_table on every charge
+PRICING_CACHE_TTL_SECONDS = float(os.environ.get('PRICING_CACHE_TTL_SECONDS', 60))  # 0 disables the cache
+
+_pricing_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+
+def clear_pricing_cache() -> None:
+    """Drop cached pricing, e.g. after pricing_table was changed."""
+    _pricing_cache.clear()
 
 
 class InsufficientShobeisError(Exception):
@@ -22,7 +37,11 @@ class ShobeisService:
         self.db = db
 
     def get_pricing(self, action_type: str) -> Optional[Dict[str, Any]]:
-        """Get pricing configuration for an action type"""
+        """Get pricing configuration for an action type (cached for PRICING_CACHE_TTL_SECONDS)"""
+        entry = _pricing_cache.get(action_type)
+        if entry is not None and entry[0] > time.monotonic():
+            return dict(entry[1])
+
         row = self.db.execute(
             text("SELECT action_type, unit, base_shobeis, min_charge FROM pricing_table WHERE action_type = :a"), 
             {'a': action_type}
@@ -31,12 +50,15 @@ class ShobeisService:
         if not row:
             return None
             
-        return {
+        pricing = {
             'action_type': row[0], 
             'unit': row[1], 
             'base_shobeis': row[2], 
             'min_charge': row[3]
         }
+        if PRICING_CACHE_TTL_SECONDS > 0:
+            _pricing_cache[action_type] = (time.monotonic() + PRICING_CACHE_TTL_SECONDS, pricing)
+        return dict(pricing)
 
     def calculate_cost(self, action_type: str, quantity: int, user: User) -> int:
         """Calculate the cost of an action based on user type and quantity"""
@@ -65,6 +87,33 @@ class ShobeisService:
         # Ensure minimum cost is 1 Shobei
         return max(final_cost, 1)
 
+    def check_balance(self, user: User, action_type: str, quantity: int = 1) -> int:
+        """Check that the user's balances together cover an action, without charging.
+
+        Args:
+            user: User about to be charged.
+            action_type: Priced action, e.g. ``word_analysis``.
+            quantity: Units of the action.
+
+        Returns:
+            The cost of the action.
+
+        Raises:
+            InsufficientShobeisError: If the three balances together cannot cover the cost.
+            ValueError: If the action has no pricing or the user does not exist.
+        """
+        cost = self.calculate_cost(action_type, quantity, user)
+        balances = self._loaded_balances(user)
+        if balances is None:
+            row = self.db.execute(select(User.monthly_balance, User.bonus_balance, User.shobeis_balance)
+                                  .where(User.id == str(user.id))).first()
+            if row is None:
+                raise ValueError("User not found")
+            balances = tuple(int(value or 0) for value in row)
+        if sum(balances) < cost:
+            raise InsufficientShobeisError("Insufficient balance (monthly, bonus, and main)")
+        return cost
+
     def check_limits(self, user: User, action_type: str, quantity: int = 1) -> Tuple[bool, str]:
 
         """Check if the action is within user's limits"""
@@ -192,7 +241,7 @@ class ShobeisService:
                 return existing
 
         # Re-fetch the user within this DB session to ensure we operate on the same managed instance
-        db_user = self.db.query(User).filter_by(id=str(user.id)).with_for_update().first()
+        db_user = self.db.query(User).filter_by(id=str(user.id)).with_for_update().populate_existing().first()
         if not db_user:
             raise ValueError("User not found")
 
@@ -258,21 +307,172 @@ class ShobeisService:
         self.db.add(analytics)
         # Persist both user balance update (done in ShobeisTransaction.create) and transaction/analytics
         self.db.commit()
+        user_cache.invalidate(db_user.id)
         self.db.refresh(tx)
         return tx
 
-    def process_charge(self, user: User, action_type: str, quantity: int = 1, idempotency_key: Optional[str] = None, meta: Optional[Dict[str, Any]] = None) -> bool:
-        """High-level convenience for charging a user for an action using new balance logic."""
+    def process_charge(self, user: User, action_type: str, quantity: int = 1, idempotency_key: Optional[str] = None, meta: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Charge a user for an action, drawing on monthly, then bonus, then main balance.
+
+        The balances move in one UPDATE guarded by the values ``user`` was
+        loaded with (it may be a cached snapshot or belong to another
+        session). If another charge got there first, the row is locked,
+        re-read and charged under the lock. The ledger rows are written with
+        one bulk INSERT in the same transaction. A charge made again with the
+        same ``idempotency_key`` charges nothing and returns the rows of the
+        first one.
+
+        Args:
+            user: User to charge.
+            action_type: Priced action, e.g. ``word_analysis``.
+            quantity: Units of the action.
+            idempotency_key: Identifies the charge, e.g. ``job:<id>`` for a queued job.
+            meta: Stored on every ledger row.
+
+        Returns:
+            The ledger rows written, one per balance drawn from.
+
+        Raises:
+            InsufficientShobeisError: If the three balances together cannot cover the cost.
+            ValueError: If the action has no pricing or the user does not exist.
+        """
         cost = self.calculate_cost(action_type, quantity, user)
+        user_id = str(user.id)
+        if idempotency_key is not None:
+            charged = self._charged_rows(user_id, idempotency_key)
+            if charged:
+                return charged
+
         try:
-            print(f"[DEBUG] process_charge: user_id={getattr(user,'id',None)} user_balance={getattr(user,'shobeis_balance',None)} monthly={getattr(user,'monthly_balance',None)} bonus={getattr(user,'bonus_balance',None)} cost={cost}")
-        except Exception:
-            pass
-        if not user.deduct_balance(cost, self.db):
-            raise InsufficientShobeisError("Insufficient balance (monthly, bonus, and main)")
-        # Optionally, add a transaction record for the charge (already handled in deduct_balance)
-        self.db.commit()
-        return True
+            rows = None
+            balances = self._loaded_balances(user)
+            if balances is not None:
+                try:
+                    rows = self._apply_charge(user_id, balances, cost, meta, idempotency_key)
+                except OperationalError:
+                    # SQLite cannot upgrade a read snapshot that a concurrent commit has made stale
+                    self.db.rollback()
+            if rows is None:
+                rows = self._apply_charge(user_id, self._lock_balances(user_id), cost, meta, idempotency_key)
+                if rows is None:
+                    self.db.rollback()
+                    raise InsufficientShobeisError("Insufficient balance (monthly, bonus, and main)")
+            self.db.commit()
+        except IntegrityError:
+            # A concurrent charge with the same idempotency key committed first
+            self.db.rollback()
+            charged = self._charged_rows(user_id, idempotency_key) if idempotency_key is not None else None
+            if not charged:
+                raise
+            return charged
+
+        user_cache.invalidate(user_id)
+        return rows
+
+    def _charged_rows(self, user_id: str, idempotency_key: str) -> List[Dict[str, Any]]:
+        """Ledger rows of an earlier charge made with ``idempotency_key``, in the order they were written."""
+        # The first row carries the key itself, the others ``<key>:1`` and ``<key>:2``
+        keys = [idempotency_key, f"{idempotency_key}:1", f"{idempotency_key}:2"]
+        transactions = (self.db.query(ShobeisTransaction)
+                        .filter(ShobeisTransaction.user_id == user_id,
+                                ShobeisTransaction.idempotency_key.in_(keys))
+                        .order_by(ShobeisTransaction.idempotency_key)
+                        .all())
+        return [
+            {
+                "id": tx.id,
+                "user_id": tx.user_id,
+                "amount": tx.amount,
+                "transaction_type": tx.transaction_type,
+                "description": tx.description,
+                "balance_before": tx.balance_before,
+                "balance_after": tx.balance_after,
+                "status": tx.status,
+                "meta": tx.meta,
+                "idempotency_key": tx.idempotency_key,
+            }
+            for tx in transactions
+        ]
+
+    @staticmethod
+    def _loaded_balances(user: User) -> Optional[Tuple[int, int, int]]:
+        """Monthly, bonus and main balance ``user`` holds, without loading anything."""
+        loaded = inspect(user).dict
+        keys = ('monthly_balance', 'bonus_balance', 'shobeis_balance')
+        if not all(key in loaded for key in keys):
+            return None
+        return tuple(int(loaded[key] or 0) for key in keys)
+
+    def _lock_balances(self, user_id: str) -> Tuple[int, int, int]:
+        """Lock the user's row and read its monthly, bonus and main balance."""
+        if self.db.get_bind().dialect.name == 'sqlite':
+            # SQLite has no row locks: a no-op write takes the database write lock
+            stmt = (update(User).where(User.id == user_id)
+                    .values(monthly_balance=User.monthly_balance)
+                    .returning(User.monthly_balance, User.bonus_balance, User.shobeis_balance)
+                    .execution_options(synchronize_session=False))
+        else:
+            stmt = (select(User.monthly_balance, User.bonus_balance, User.shobeis_balance)
+                    .where(User.id == user_id).with_for_update())
+        row = self.db.execute(stmt).first()
+        if row is None:
+            self.db.rollback()
+            raise ValueError("User not found")
+        return tuple(int(value or 0) for value in row)
+
+    def _apply_charge(self, user_id: str, balances: Tuple[int, int, int], cost: int,
+                      meta: Optional[Dict[str, Any]],
+                      idempotency_key: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+        """Move ``cost`` out of ``balances`` and add the ledger rows, uncommitted.
+
+        Returns:
+            The ledger rows, or None if the balances cannot cover the cost or
+            the row no longer holds ``balances``.
+        """
+        monthly, bonus, main = balances
+        if monthly + bonus + main < cost:
+            return None
+        from_monthly = min(max(monthly, 0), cost)
+        from_bonus = min(max(bonus, 0), cost - from_monthly)
+        from_main = cost - from_monthly - from_bonus
+
+        updated = self.db.execute(
+            update(User)
+            .where(User.id == user_id, User.monthly_balance == monthly,
+                   User.bonus_balance == bonus, User.shobeis_balance == main)
+            .values(monthly_balance=monthly - from_monthly, bonus_balance=bonus - from_bonus,
+                    shobeis_balance=main - from_main)
+            .returning(User.id)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if updated is None:
+            return None
+
+        # balance_before/after track the main balance, as in ShobeisTransaction.create
+        rows = [
+            {
+                "id": str(uuid.uuid4()),
+                "user_id": user_id,
+                "amount": -amount,
+                "transaction_type": transaction_type,
+                "description": description,
+                "balance_before": main,
+                "balance_after": main - from_main if transaction_type == TransactionType.USAGE else main,
+                "status": TransactionStatus.COMPLETED,
+                "meta": meta,
+            }
+            for amount, transaction_type, description in (
+                (from_monthly, TransactionType.MONTHLY_USAGE, 'Monthly balance usage'),
+                (from_bonus, TransactionType.BONUS_USAGE, 'Bonus balance usage'),
+                (from_main, TransactionType.USAGE, 'Main balance usage'),
+            )
+            if amount > 0
+        ]
+        if idempotency_key is not None:
+            for n, row in enumerate(rows):
+                row["idempotency_key"] = f"{idempotency_key}:{n}" if n else idempotency_key
+        self.db.execute(insert(ShobeisTransaction), rows)
+        return rows
 
     def process_refund(self, transaction_id: str, reason: str, meta: Optional[Dict[str, Any]] = None) -> ShobeisTransaction:
         orig = self.db.query(ShobeisTransaction).filter_by(id=transaction_id).first()
@@ -3,14 +3,15 @@ from typing import Dict, List, Optional, Union, Any
 from pathlib import Path
 import asyncio
 import aiofiles
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import retry, retry_if_exception_type, retry_if_not_exception_type, stop_after_attempt, wait_exponential
 from tqdm import tqdm
 import logging
-from collections import deque
+from collections import Counter, deque
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
 from .document_processor import DocumentProcessor, DocumentValidationError
+from .extraction_pool import ExtractionPool, ExtractionTimeoutError, get_extraction_pool
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +22,7 @@ class ProcessingStatus(Enum):
     COMPLETED = "completed"
     FAILED = "failed"
     SKIPPED = "skipped"
+    CANCELLED = "cancelled"
 
 @dataclass
 class ProcessingResult:
@@ -36,14 +38,19 @@ class ProcessingResult:
 class BatchDocumentProcessor:
     """Handles batch processing of multiple documents with async support."""
     
-    def __init__(self, max_concurrent: int = 5, max_retries: int = 3):
+    def __init__(self, max_concurrent: int = 5, max_retries: int = 3,
+                 extraction_pool: Optional[ExtractionPool] = None):
         """Initialize the batch processor.
         
         Args:
             max_concurrent: Maximum number of documents to process concurrently.
             max_retries: Maximum number of retry attempts for failed documents.
+            extraction_pool: Worker processes for PDF/DOCX parsing; defaults to the
+                shared pool when DOCUMENT_EXTRACTION_WORKERS is set, otherwise
+                documents are parsed on the default thread pool.
         """
         self.document_processor = DocumentProcessor()
+        self.extraction_pool = extraction_pool or get_extraction_pool()
         self.max_concurrent = max_concurrent
         self.max_retries = max_retries
         self.processing_queue = deque()
@@ -52,6 +59,12 @@ class BatchDocumentProcessor:
         self._is_processing = False
         self._progress_callbacks = []
         self._start_time = None
+        self._workers: List[asyncio.Task] = []
+        self._cancelled = False
+        # Running totals behind get_batch_status
+        self._status_counts = Counter()
+        self._processing_time_total = 0.0
+        self._processing_time_count = 0
         
     def add_progress_callback(self, callback):
         """Add a callback function for progress updates.
@@ -75,6 +88,24 @@ class BatchDocumentProcessor:
             except Exception as e:
                 logger.error(f"Error in progress callback: {str(e)}")
         
+    def _set_status(self, result: ProcessingResult, status: ProcessingStatus) -> None:
+        """Move a document to a new status, update the running totals and notify callbacks.
+        
+        Args:
+            result: The document's ProcessingResult.
+            status: Its new status.
+        """
+        self._status_counts[result.status] -= 1
+        self._status_counts[status] += 1
+        result.status = status
+        if status == ProcessingStatus.PROCESSING:
+            result.start_time = datetime.now()
+        elif result.start_time is not None:
+            result.end_time = datetime.now()
+            self._processing_time_total += (result.end_time - result.start_time).total_seconds()
+            self._processing_time_count += 1
+        self._notify_progress(result)
+        
     def add_document(self, file_path: Union[str, Path]) -> None:
         """Add a document to the processing queue.
         
@@ -88,6 +119,7 @@ class BatchDocumentProcessor:
                 file_path=file_path,
                 status=ProcessingStatus.QUEUED
             )
+            self._status_counts[ProcessingStatus.QUEUED] += 1
             logger.debug(f"Added document to queue: {file_path}")
             
     def _get_retry_strategy(self):
@@ -98,10 +130,13 @@ class BatchDocumentProcessor:
         return {
             'stop': stop_after_attempt(self.max_retries),
             'wait': wait_exponential(multiplier=1, min=4, max=10),
+            # A document that timed out would only time out again, and cancellation is not a failure
+            'retry': retry_if_exception_type(Exception) & retry_if_not_exception_type(ExtractionTimeoutError),
             'reraise': True
         }
         
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10),
+           retry=retry_if_exception_type(Exception) & retry_if_not_exception_type(ExtractionTimeoutError))
     async def _process_single_document(self, file_path: Path) -> Dict[str, Any]:
         """Process a single document with retry logic.
         
@@ -121,6 +156,10 @@ class BatchDocumentProcessor:
         # Get MIME type and format validation before processing
         mime_type, format_id = self.document_processor.validate_file(file_path)
         
+        # Parse in worker processes when available; the GIL serializes parsing on threads
+        if self.extraction_pool is not None and format_id in ('docx', 'pdf'):
+            return await self.extraction_pool.extract_async(format_id, content)
+        
         # Create a task for CPU-intensive processing to avoid blocking
         loop = asyncio.get_running_loop()
         
@@ -166,8 +205,7 @@ class BatchDocumentProcessor:
             file_path: Path to the document file.
         """
         result = self.results[str(file_path)]
-        result.start_time = datetime.now()
-        result.status = ProcessingStatus.PROCESSING
+        self._set_status(result, ProcessingStatus.PROCESSING)
         retry_count = 0
         
         try:
@@ -177,25 +215,27 @@ class BatchDocumentProcessor:
             try:
                 processed_result = await retry_process(file_path)
                 result.result = processed_result
-                result.status = ProcessingStatus.COMPLETED
             except Exception as retry_error:
                 retry_count = getattr(retry_process, 'retry.statistics', {}).get('attempt_number', 0)
                 raise retry_error
                 
             result.retries = retry_count
+            self._set_status(result, ProcessingStatus.COMPLETED)
+            
+        except asyncio.CancelledError:
+            result.error = "Cancelled"
+            self._set_status(result, ProcessingStatus.CANCELLED)
+            raise
             
         except DocumentValidationError as e:
             logger.error(f"Validation error processing {file_path}: {str(e)}")
             result.error = str(e)
-            result.status = ProcessingStatus.FAILED
+            self._set_status(result, ProcessingStatus.FAILED)
             
         except Exception as e:
             logger.error(f"Error processing {file_path}: {str(e)}")
             result.error = str(e)
-            result.status = ProcessingStatus.FAILED
-            
-        finally:
-            result.end_time = datetime.now()
+            self._set_status(result, ProcessingStatus.FAILED)
             
     def _create_progress_callback(self, pbar):
         """Create a callback function to update progress information.
@@ -234,9 +274,29 @@ class BatchDocumentProcessor:
             
         return update_progress
         
+    async def _worker(self, progress_callback) -> None:
+        """Take documents off the queue one at a time until it is empty or the batch is cancelled.
+        
+        Args:
+            progress_callback: Progress bar callback from _create_progress_callback.
+        """
+        while self.processing_queue and not self._cancelled:
+            file_path = self.processing_queue.popleft()
+            progress_callback(ProcessingStatus.PROCESSING, file_path)
+            await self._process_queue_item(file_path)
+            result = self.results[str(file_path)]
+            progress_callback(result.status, file_path, result.error)
+            
     async def process_batch(self) -> Dict[str, ProcessingResult]:
         """Process all documents in the queue concurrently.
         
+        ``max_concurrent`` workers each take the next queued document as soon
+        as their current one finishes, so a slow document only ever holds one
+        slot. Callbacks registered with ``add_progress_callback`` receive each
+        result as its status changes. After ``cancel()`` (or if this coroutine
+        is cancelled) documents still in progress or queued are marked
+        cancelled.
+        
         Returns:
             Dict mapping file paths to their processing results.
         """
@@ -246,6 +306,7 @@ class BatchDocumentProcessor:
                 return self.results
                 
             self._is_processing = True
+            self._cancelled = False
         
         try:
             total_files = len(self.processing_queue)
@@ -257,39 +318,44 @@ class BatchDocumentProcessor:
                 miniters=1
             ) as pbar:
                 progress_callback = self._create_progress_callback(pbar)
-                
-                while self.processing_queue:
-                    # Process documents in chunks based on max_concurrent
-                    current_batch = []
-                    for _ in range(min(self.max_concurrent, len(self.processing_queue))):
-                        if self.processing_queue:
-                            file_path = self.processing_queue.popleft()
-                            current_batch.append(file_path)
-                            progress_callback(ProcessingStatus.PROCESSING, file_path)
-                    
-                    # Process current batch concurrently
-                    tasks = [self._process_queue_item(file_path) for file_path in current_batch]
-                    
-                    try:
-                        await asyncio.gather(*tasks)
-                    except Exception as e:
-                        # Log batch processing error but continue with remaining files
-                        logger.error(f"Error processing batch: {str(e)}")
-                        progress_callback(ProcessingStatus.FAILED, error=str(e))
-                        
-                    # Update progress for completed items
-                    for file_path in current_batch:
-                        result = self.results[str(file_path)]
-                        if result.status == ProcessingStatus.COMPLETED:
-                            progress_callback(ProcessingStatus.COMPLETED, file_path)
-                        elif result.status == ProcessingStatus.FAILED:
-                            progress_callback(ProcessingStatus.FAILED, file_path, result.error)
+                self._workers = [
+                    asyncio.create_task(self._worker(progress_callback))
+                    for _ in range(min(self.max_concurrent, total_files))
+                ]
+                try:
+                    for outcome in await asyncio.gather(*self._workers, return_exceptions=True):
+                        if isinstance(outcome, Exception):
+                            # Log the error but let the other workers finish the queue
+                            logger.error(f"Error processing batch: {str(outcome)}")
+                            progress_callback(ProcessingStatus.FAILED, error=str(outcome))
+                finally:
+                    for worker in self._workers:
+                        worker.cancel()
+                    await asyncio.gather(*self._workers, return_exceptions=True)
+                    self._workers = []
+                    # Documents no worker got to before a cancellation
+                    while self.processing_queue:
+                        result = self.results[str(self.processing_queue.popleft())]
+                        result.error = "Cancelled"
+                        self._set_status(result, ProcessingStatus.CANCELLED)
                     
         finally:
             self._is_processing = False
         
         return self.results
         
+    def cancel(self) -> None:
+        """Stop the running batch.
+        
+        Documents in progress are abandoned and, like the ones still queued,
+        marked cancelled; ``process_batch`` then returns the results so far.
+        Extraction already running on a thread cannot be interrupted, so its
+        result is discarded when it arrives.
+        """
+        self._cancelled = True
+        for worker in self._workers:
+            worker.cancel()
+        
     def get_status(self, file_path: Union[str, Path]) -> Optional[ProcessingResult]:
         """Get the processing status and result for a specific document.
         
@@ -304,22 +370,19 @@ class BatchDocumentProcessor:
     def get_batch_status(self) -> Dict[str, Dict[str, int]]:
         """Get overall status of the batch processing.
         
+        Counts and times are kept up to date as documents change status, so
+        this does not scan the results.
+        
         Returns:
             Dict containing counts of documents in each status.
         """
-        status_counts = {status: 0 for status in ProcessingStatus}
-        processing_times = []
-        
-        for result in self.results.values():
-            status_counts[result.status] += 1
-            if result.start_time and result.end_time:
-                processing_times.append((result.end_time - result.start_time).total_seconds())
-                
-        avg_processing_time = sum(processing_times) / len(processing_times) if processing_times else 0
+        total = len(self.results)
+        completed = self._status_counts[ProcessingStatus.COMPLETED]
         
         return {
-            "status_counts": {status.value: count for status, count in status_counts.items()},
-            "total_documents": len(self.results),
-            "average_processing_time": avg_processing_time,
-            "completed_percentage": (status_counts[ProcessingStatus.COMPLETED] / len(self.results) * 100) if self.results else 0
+            "status_counts": {status.value: self._status_counts[status] for status in ProcessingStatus},
+            "total_documents": total,
+            "average_processing_time": (self._processing_time_total / self._processing_time_count
+                                        if self._processing_time_count else 0),
+            "completed_percentage": (completed / total * 100) if total else 0
         }
\ No newline at end of file
@@ -1,9 +1,19 @@
 from sqlalchemy import text
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from contextlib import asynccontextmanager
+from fastapi import Depends
+from typing import Any, Callable, Dict, Optional
+import asyncio
+import functools
 import logging
 import importlib
+import importlib.util
+import threading
+import time
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -15,15 +25,242 @@ def get_db_url():
     """Get database URL from environment with a safe default"""
     return os.environ.get('DATABASE_URL', 'sqlite:///./backend.db')
 
+# Connection pool configuration (server databases; size it against the number of uvicorn workers)
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))  # connections kept open per process
+DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))  # extra connections under load
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 30))  # seconds to wait for a free connection
+DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))  # seconds before a connection is replaced
+DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))  # wait for a write lock
+DB_ASYNC_ENABLED = os.environ.get('DB_ASYNC_ENABLED', 'true').lower() in ('1', 'true', 'yes')  # when the driver is installed
+
+# Async driver for each backend; SQLAlchemy's asyncio extension also needs greenlet
+ASYNC_DRIVERS = {'postgresql': 'asyncpg', 'sqlite': 'aiosqlite'}
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_metrics.record_wait(self, time.perf_counter() - start)
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool counterpart of ``InstrumentedQueuePool`` for the async engine."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_metrics.record_wait(self, time.perf_counter() - start)
+
+
+class PoolMetrics:
+    """Checkout wait, in-use and overflow counts of the engine's pool, exported to MetricsCollector."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.slow_checkouts = 0  # waited for another request to return a connection
+
+    def record_wait(self, pool, wait: float) -> None:
+        from .monitoring import MetricsCollector
+
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+            if wait >= 0.01:
+                self.slow_checkouts += 1
+        collector = MetricsCollector()
+        collector.add_metric('db_pool_checkout_wait_ms', wait * 1000)
+        collector.add_metric('db_pool_in_use', pool.checkedout())
+        collector.add_metric('db_pool_overflow', max(0, pool.overflow()))
+
+    def snapshot(self, pool) -> Dict[str, Any]:
+        with self._lock:
+            stats = {
+                "checkouts": self.checkouts,
+                "wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+                "slow_checkouts": self.slow_checkouts
+            }
+        stats["pool"] = type(pool).__name__
+        if isinstance(pool, QueuePool):
+            stats.update(size=pool.size(), in_use=pool.checkedout(), idle=pool.checkedin(),
+                         overflow=max(0, pool.overflow()), max_overflow=pool._max_overflow)
+        return stats
+
+
+pool_metrics = PoolMetrics()
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """WAL lets readers run alongside the writer; NORMAL sync is safe with WAL."""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    finally:
+        cursor.close()
+
+
+def _is_memory_sqlite(url) -> bool:
+    database = url.database or ':memory:'
+    return database == ':memory:' or database.startswith('file::memory:')
+
+
+def _is_memory_database(url) -> bool:
+    return url.get_backend_name() == 'sqlite' and _is_memory_sqlite(url)
+
+
+def engine_options(url: str) -> Dict[str, Any]:
+    """Keyword arguments for ``create_engine`` suited to the backend in ``url``.
+
+    SQLite connections may be shared across threads; an in-memory database
+    lives in its connection, so it keeps SQLAlchemy's per-thread pool. Every
+    other database gets a QueuePool of DB_POOL_SIZE connections (plus
+    DB_MAX_OVERFLOW under load); connections to server databases are pinged
+    before use and replaced after DB_POOL_RECYCLE seconds.
+    """
+    sa_url = make_url(url)
+    if sa_url.get_backend_name() == 'sqlite' and _is_memory_sqlite(sa_url):
+        return {"connect_args": {"check_same_thread": False}}
+
+    options = {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+    }
+    if sa_url.get_backend_name() == 'sqlite':
+        options["connect_args"] = {"check_same_thread": False}
+    else:
+        options.update(pool_recycle=DB_POOL_RECYCLE, pool_pre_ping=DB_POOL_PRE_PING)
+    return options
+
+
+def create_db_engine(url: str) -> Engine:
+    """Create an engine for ``url``; SQLite file databases are switched to WAL mode.
+
+    Args:
+        url: SQLAlchemy database URL.
+
+    Returns:
+        Engine whose pool checkouts are recorded in ``pool_metrics``.
+    """
+    db_engine = create_engine(url, **engine_options(url))
+    sa_url = make_url(url)
+    if sa_url.get_backend_name() == 'sqlite' and not _is_memory_sqlite(sa_url):
+        event.listen(db_engine, "connect", _set_sqlite_pragmas)
+    return db_engine
+
+
+def async_database_url(url: str) -> Optional[str]:
+    """URL of the async driver for the backend in ``url``.
+
+    Args:
+        url: SQLAlchemy database URL of the sync engine.
+
+    Returns:
+        The URL with its driver switched to asyncpg or aiosqlite, or None if
+        the backend has no async driver or the database is in-memory SQLite,
+        which an async engine could not share with the sync one.
+    """
+    sa_url = make_url(url)
+    driver = ASYNC_DRIVERS.get(sa_url.get_backend_name())
+    if driver is None or _is_memory_database(sa_url):
+        return None
+    return sa_url.set(drivername=f"{sa_url.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+
+def async_driver_installed(url: str) -> bool:
+    """Whether greenlet and the async driver for the backend in ``url`` can be imported."""
+    driver = ASYNC_DRIVERS.get(make_url(url).get_backend_name())
+    return driver is not None and all(importlib.util.find_spec(module) is not None for module in ('greenlet', driver))
+
+
+def create_async_db_engine(url: str):
+    """Create an ``AsyncEngine`` for ``url`` with the same pool settings as ``create_db_engine``.
+
+    Args:
+        url: SQLAlchemy database URL of the sync engine.
+
+    Returns:
+        AsyncEngine on the backend's async driver.
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    async_url = async_database_url(url)
+    if async_url is None:
+        raise ValueError("Only PostgreSQL and file-based SQLite databases have an async driver")
+    options = engine_options(url)
+    # aiosqlite runs each connection on a thread of its own
+    options.pop("connect_args", None)
+    options["poolclass"] = InstrumentedAsyncQueuePool
+    db_engine = create_async_engine(async_url, **options)
+    if make_url(url).get_backend_name() == 'sqlite':
+        event.listen(db_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    return db_engine
+
+
+class ThreadedSession:
+    """Stand-in for ``AsyncSession`` when no async driver is installed.
+
+    Provides ``run_sync``, the only ``AsyncSession`` method the async
+    endpoints use. Each call runs the function on a session of its own in the
+    default executor, so the event loop keeps serving other requests and the
+    connection goes back to the pool as soon as the function returns. An
+    in-memory SQLite database lives in its thread's connection, so there the
+    function runs inline.
+    """
+
+    def __init__(self, bind: Engine):
+        self.bind = bind
+
+    def _call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        session = Session(bind=self.bind, autoflush=False)
+        try:
+            return fn(session, *args, **kwargs)
+        finally:
+            session.close()
+
+    async def run_sync(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        if _is_memory_database(self.bind.url):
+            return self._call(fn, *args, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(self._call, fn, *args, **kwargs))
+
+
+def get_pool_status() -> Dict[str, Any]:
+    """Connection pool statistics of the application engine."""
+    return pool_metrics.snapshot(engine.pool)
+
+
 DATABASE_URL = get_db_url()
 Base = declarative_base()
 
-# Create SQLite engine
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+# Create the engine for the configured backend
+engine = create_db_engine(DATABASE_URL)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for the hot endpoints, created by get_async_sessionmaker() on first use
+ASYNC_DATABASE_URL = (async_database_url(DATABASE_URL)
+                      if DB_ASYNC_ENABLED and async_driver_installed(DATABASE_URL) else None)
+async_engine = None
+AsyncSessionLocal = None
+_async_engine_lock = threading.Lock()
+
 def init_db():
     """Initialize database tables"""
     try:
@@ -73,7 +310,61 @@ def get_session():
     """Compatibility helper for older code/tests expecting get_session."""
     return SessionLocal()
 
+
+def get_async_sessionmaker():
+    """Session factory of the async engine, or None if the async path is unavailable.
+
+    The engine is created on first use, in the process that serves requests.
+    """
+    global async_engine, AsyncSessionLocal
+    if AsyncSessionLocal is None and ASYNC_DATABASE_URL is not None:
+        with _async_engine_lock:
+            if AsyncSessionLocal is None:
+                from sqlalchemy.ext.asyncio import async_sessionmaker
+
+                async_engine = create_async_db_engine(DATABASE_URL)
+                AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    return AsyncSessionLocal
+
+
+@asynccontextmanager
+async def async_session():
+    """Async session for code outside request dependencies (``ThreadedSession`` without a driver)."""
+    sessions = get_async_sessionmaker()
+    if sessions is None:
+        yield ThreadedSession(engine)
+        return
+    async with sessions() as session:
+        yield session
+
+
+async def get_async_db(db: Session = Depends(get_db)):
+    """Get async database session.
+
+    Yields an ``AsyncSession`` on asyncpg/aiosqlite when installed, otherwise
+    a ``ThreadedSession`` on the database of the request's regular session.
+    Callers only use ``await session.run_sync(fn)``, which works the same on
+    both; ORM objects loaded there belong to that session, so hand values
+    (or snapshots) back rather than instances.
+    """
+    sessions = get_async_sessionmaker()
+    if sessions is None:
+        yield ThreadedSession(db.get_bind())
+        return
+    async with sessions() as session:
+        yield session
+
+
+async def dispose_async_engine() -> None:
+    """Close the async engine's connections, e.g. at shutdown."""
+    if async_engine is not None:
+        await async_engine.dispose()
+
 # Expose engine and SessionLocal for external scripts/tests
-__all__ = ["DATABASE_URL", "Base", "engine", "SessionLocal", "init_db", "get_db", "get_session"]
+__all__ = ["DATABASE_URL", "Base", "engine", "SessionLocal", "init_db", "get_db", "get_session",
+           "create_db_engine", "engine_options", "get_pool_status", "async_database_url",
+           "async_driver_installed",
+           "create_async_db_engine", "ThreadedSession", "get_async_sessionmaker", "async_session",
+           "get_async_db", "dispose_async_engine"]
 
 # Note: Do not auto-initialize the DB here to avoid circular imports. Call init_db() from application startup.
\ No newline at end of file
@@ -1,5 +1,5 @@
 """Document processing utilities for handling various file formats."""
-from typing import Dict, List, Optional, BinaryIO, Union, Tuple
+from typing import Dict, Iterator, List, Optional, BinaryIO, Union, Tuple
 import docx
 import pdfplumber
 import io
@@ -7,6 +7,8 @@ import logging
 import magic
 import os
 from pathlib import Path
+from .extraction_pool import ExtractionPool, extract_document
+from .uploads import as_buffer
 
 logger = logging.getLogger(__name__)
 
@@ -138,7 +140,7 @@ class DocumentProcessor:
             Dict containing extracted text and metadata.
         """
         try:
-            if isinstance(file_content, bytes):
+            if isinstance(file_content, (bytes, bytearray, memoryview)):
                 file_content = io.BytesIO(file_content)
                 
             doc = docx.Document(file_content)
@@ -215,40 +217,53 @@ class DocumentProcessor:
             raise ValueError(f"Failed to process DOCX file: {str(e)}")
 
     @staticmethod
-    def extract_text_from_pdf(file_content: Union[BinaryIO, bytes], chunk_size: int = 5) -> Dict[str, Union[str, List[Dict]]]:
-        """Extract text and metadata from PDF file with memory-efficient processing.
-        
+    def iter_pdf_pages(file_content: Union[BinaryIO, bytes], include_tables: bool = False,
+                       include_images: bool = False, document_info: Optional[Dict] = None) -> Iterator[Dict]:
+        """Yield the text and statistics of each PDF page as it is extracted.
+
+        Only one page's parsed objects are held at a time: each page's
+        pdfplumber cache is released once it has been yielded. Table and
+        image detection are the expensive parts of a page and only run when
+        requested; otherwise the page's ``tables`` and ``images`` are None.
+
         Args:
             file_content: File-like object or bytes containing the PDF file.
-            chunk_size: Number of pages to process at once for memory efficiency.
-            
-        Returns:
-            Dict containing extracted text and metadata.
+            include_tables: Whether to count tables on each page.
+            include_images: Whether to count images on each page.
+            document_info: Optional dict filled with the document-level
+                metadata (page count, info dictionary, first page size) when
+                the PDF is opened.
+
+        Yields:
+            Dict per page with page_number, text, width, height, tables,
+            images, words, characters and fonts.
         """
-        try:
-            if isinstance(file_content, bytes):
-                file_content = io.BytesIO(file_content)
+        if isinstance(file_content, (bytes, bytearray, memoryview)):
+            file_content = io.BytesIO(file_content)
 
-            with pdfplumber.open(file_content) as pdf:
-                pages = []
-                full_text = []
-                total_words = 0
-                total_chars = 0
-                total_tables = 0
-                total_images = 0
-                total_fonts = set()
-
-                for page_num, page in enumerate(pdf.pages, start=1):
-                    # Extract text
-                    page_text = ""
-                    try:
-                        extracted = page.extract_text()
-                        if extracted:
-                            page_text = str(extracted)
-                    except Exception as e:
-                        logger.warning(f"Error extracting text from page {page_num}: {e}")
+        with pdfplumber.open(file_content) as pdf:
+            if document_info is not None:
+                first_page = pdf.pages[0] if pdf.pages else None
+                document_info.update({
+                    "pages": len(pdf.pages),
+                    "info": dict(pdf.metadata) if pdf.metadata else {},
+                    "width": getattr(first_page, 'width', None),
+                    "height": getattr(first_page, 'height', None)
+                })
 
-                    # Extract tables
+            for page_num, page in enumerate(pdf.pages, start=1):
+                # Extract text
+                page_text = ""
+                try:
+                    extracted = page.extract_text()
+                    if extracted:
+                        page_text = str(extracted)
+                except Exception as e:
+                    logger.warning(f"Error extracting text from page {page_num}: {e}")
+
+                # Extract tables
+                page_tables = None
+                if include_tables:
                     page_tables = 0
                     try:
                         tables = page.extract_tables()
@@ -257,7 +272,9 @@ class DocumentProcessor:
                     except Exception as e:
                         logger.warning(f"Error extracting tables from page {page_num}: {e}")
 
-                    # Extract images
+                # Extract images
+                page_images = None
+                if include_images:
                     page_images = 0
                     try:
                         images = getattr(page, 'images', None)
@@ -265,67 +282,112 @@ class DocumentProcessor:
                     except Exception as e:
                         logger.warning(f"Error extracting images from page {page_num}: {e}")
 
-                    # Fonts (best-effort)
-                    try:
-                        if hasattr(page, '_page_fonts') and page._page_fonts:
-                            total_fonts.update(f.get('name') for f in page._page_fonts if isinstance(f, dict) and 'name' in f)
-                    except Exception:
-                        pass
-
-                    # Metrics
-                    total_tables += page_tables
-                    total_images += page_images
-                    total_chars += len(page_text)
-                    words = len(page_text.split()) if page_text else 0
-                    total_words += words
-
-                    page_info = {
-                        "page_number": page_num,
-                        "text": page_text,
-                        "width": getattr(page, 'width', None),
-                        "height": getattr(page, 'height', None),
-                        "tables": page_tables,
-                        "images": page_images,
-                        "words": words,
-                        "characters": len(page_text)
-                    }
+                # Fonts (best-effort)
+                fonts = set()
+                try:
+                    if hasattr(page, '_page_fonts') and page._page_fonts:
+                        fonts.update(f.get('name') for f in page._page_fonts if isinstance(f, dict) and 'name' in f)
+                except Exception:
+                    pass
+
+                page_info = {
+                    "page_number": page_num,
+                    "text": page_text,
+                    "width": getattr(page, 'width', None),
+                    "height": getattr(page, 'height', None),
+                    "tables": page_tables,
+                    "images": page_images,
+                    "words": len(page_text.split()) if page_text else 0,
+                    "characters": len(page_text),
+                    "fonts": fonts
+                }
+                # Drop the parsed layout objects before moving to the next page
+                page.close()
+                yield page_info
+
+    @staticmethod
+    def extract_text_from_pdf(file_content: Union[BinaryIO, bytes], chunk_size: int = 5,
+                              include_tables: bool = False, include_images: bool = False,
+                              include_pages: bool = True) -> Dict[str, Union[str, List[Dict]]]:
+        """Extract text and metadata from PDF file with memory-efficient processing.
+        
+        Pages are consumed one at a time from ``iter_pdf_pages`` and the
+        statistics are accumulated as they arrive.
+        
+        Args:
+            file_content: File-like object or bytes containing the PDF file.
+            chunk_size: Unused; pages are streamed one at a time. Kept for compatibility.
+            include_tables: Whether to count tables (None in the statistics otherwise).
+            include_images: Whether to count images (None in the statistics otherwise).
+            include_pages: Whether to return per-page details under ``pages``.
+            
+        Returns:
+            Dict containing extracted text and metadata.
+        """
+        try:
+            document_info = {}
+            pages = []
+            full_text = []
+            total_words = 0
+            total_chars = 0
+            total_tables = 0 if include_tables else None
+            total_images = 0 if include_images else None
+            total_fonts = set()
 
+            for page_info in DocumentProcessor.iter_pdf_pages(
+                file_content, include_tables=include_tables, include_images=include_images,
+                document_info=document_info
+            ):
+                total_fonts.update(page_info.pop("fonts"))
+                if include_tables:
+                    total_tables += page_info["tables"]
+                if include_images:
+                    total_images += page_info["images"]
+                total_chars += page_info["characters"]
+                total_words += page_info["words"]
+
+                if page_info["text"]:
+                    full_text.append(page_info["text"])
+                if include_pages:
                     pages.append(page_info)
-                    full_text.append(page_text)
-
-                metadata = {
-                    "document_info": {
-                        "producer": getattr(pdf.metadata, 'get', lambda k, d: d)('Producer', 'Unknown') if pdf.metadata else 'Unknown',
-                        "creator": getattr(pdf.metadata, 'get', lambda k, d: d)('Creator', 'Unknown') if pdf.metadata else 'Unknown',
-                        "creation_date": getattr(pdf.metadata, 'get', lambda k, d: d)('CreationDate', 'Unknown') if pdf.metadata else 'Unknown',
-                        "modification_date": getattr(pdf.metadata, 'get', lambda k, d: d)('ModDate', 'Unknown') if pdf.metadata else 'Unknown',
-                        "author": getattr(pdf.metadata, 'get', lambda k, d: d)('Author', 'Unknown') if pdf.metadata else 'Unknown',
-                        "title": getattr(pdf.metadata, 'get', lambda k, d: d)('Title', 'Unknown') if pdf.metadata else 'Unknown',
-                        "subject": getattr(pdf.metadata, 'get', lambda k, d: d)('Subject', 'Unknown') if pdf.metadata else 'Unknown',
-                        "keywords": getattr(pdf.metadata, 'get', lambda k, d: d)('Keywords', 'Unknown') if pdf.metadata else 'Unknown',
-                    },
-                    "statistics": {
-                        "pages": len(pdf.pages),
-                        "words": total_words,
-                        "characters": total_chars,
-                        "tables": total_tables,
-                        "images": total_images,
-                        "fonts": list(total_fonts),
-                        "average_words_per_page": (total_words / len(pdf.pages)) if pdf.pages else 0
-                    },
-                    "formatting": {
-                        "page_size": {
-                            "width": getattr(pdf.pages[0], 'width', None) if pdf.pages else None,
-                            "height": getattr(pdf.pages[0], 'height', None) if pdf.pages else None
-                        }
+
+            info = document_info.get("info", {})
+            page_count = document_info.get("pages", 0)
+            metadata = {
+                "document_info": {
+                    "producer": info.get('Producer', 'Unknown'),
+                    "creator": info.get('Creator', 'Unknown'),
+                    "creation_date": info.get('CreationDate', 'Unknown'),
+                    "modification_date": info.get('ModDate', 'Unknown'),
+                    "author": info.get('Author', 'Unknown'),
+                    "title": info.get('Title', 'Unknown'),
+                    "subject": info.get('Subject', 'Unknown'),
+                    "keywords": info.get('Keywords', 'Unknown'),
+                },
+                "statistics": {
+                    "pages": page_count,
+                    "words": total_words,
+                    "characters": total_chars,
+                    "tables": total_tables,
+                    "images": total_images,
+                    "fonts": list(total_fonts),
+                    "average_words_per_page": (total_words / page_count) if page_count else 0
+                },
+                "formatting": {
+                    "page_size": {
+                        "width": document_info.get("width"),
+                        "height": document_info.get("height")
                     }
                 }
+            }
 
-                return {
-                    "text": "\n\n".join([p for p in full_text if p]),
-                    "metadata": metadata,
-                    "pages": pages
-                }
+            result = {
+                "text": "\n\n".join(full_text),
+                "metadata": metadata
+            }
+            if include_pages:
+                result["pages"] = pages
+            return result
 
         except Exception as e:
             logger.error(f"Error processing PDF file: {e}")
@@ -371,10 +433,18 @@ class DocumentProcessor:
         
         raise ValueError(f"Unsupported format: {format_id}")
 
-    def process_document_bytes(self, content: bytes, content_type: str) -> Dict[str, Union[str, Dict]]:
+    def process_document_bytes(self, content: Union[bytes, memoryview, BinaryIO], content_type: str,
+                               include_pages: bool = True,
+                               pool: Optional[ExtractionPool] = None) -> Dict[str, Union[str, Dict]]:
         """Process document given as bytes and a declared content type.
 
         This is intended for in-memory uploads where a file path is not available.
+        ``content`` may also be a buffer or an open (e.g. spooled upload) file,
+        which the extractors read in place. With ``include_pages=False`` PDF
+        page details are not collected, so only the text and document-level
+        metadata are held in memory. When a ``pool`` is given the document is
+        parsed in one of its worker processes, under the pool's per-document
+        timeout.
         """
         # Validate declared MIME type
         mime_type = content_type
@@ -382,15 +452,37 @@ class DocumentProcessor:
             raise FileTypeError(f"Unsupported file type: {mime_type}")
 
         format_id = self.get_format_from_mime(mime_type)
-        if format_id == 'docx':
-            return DocumentProcessor.extract_text_from_docx(content)
-        elif format_id == 'pdf':
-            return DocumentProcessor.extract_text_from_pdf(content)
-        elif format_id == 'txt':
-            text = content.decode('utf-8')
-            return {
-                "text": text,
-                "metadata": {"format": "txt", "words": len(text.split())}
-            }
+        options = {"include_pages": include_pages} if format_id == 'pdf' else {}
+        if pool is not None:
+            with as_buffer(content) as buffer:
+                return pool.extract(format_id, buffer, **options)
+        return extract_document(format_id, content, **options)
+
+    @staticmethod
+    def detect_content_type(head: bytes, declared: str) -> str:
+        """Content type of an upload from its first bytes, checked against the declared one.
 
-        raise ValueError(f"Unsupported format: {format_id}")
\ No newline at end of file
+        Args:
+            head: First few KB of the file.
+            declared: Content type sent by the client.
+
+        Returns:
+            The sniffed type when it is supported, otherwise the declared type
+            when the content is compatible with it (a ZIP container for DOCX,
+            any text for plain text).
+
+        Raises:
+            FileTypeError: If the content does not match any supported format.
+        """
+        try:
+            sniffed = magic.from_buffer(head, mime=True)
+        except Exception as e:
+            raise FileTypeError(f"Could not detect file type: {e}")
+        if DocumentProcessor.is_supported_format(sniffed):
+            return sniffed
+        declared_format = DocumentProcessor.get_format_from_mime(declared)
+        if declared_format == 'docx' and sniffed in ('application/zip', 'application/octet-stream'):
+            return declared
+        if declared_format == 'txt' and sniffed.startswith('text/'):
+            return declared
+        raise FileTypeError(f"File content ({sniffed}) does not match its type ({declared})")
@@ -111,4 +111,11 @@ class ResourceExhaustedError(SystemError):
         super().__init__(
             f"System resource exhausted: {resource}",
             {"resource": resource, "limit": limit}
-        )
\ No newline at end of file
+        )
+
+class InferenceQueueFullError(ResourceExhaustedError):
+    """Inference queue is at capacity."""
+    def __init__(self, limit: int, retry_after: int):
+        super().__init__("inference_queue", limit)
+        self.retry_after = retry_after
+        self.details["retry_after"] = retry_after
@@ -0,0 +1,303 @@
+"""Process pool for CPU-bound document text extraction.
+
+pdfplumber and python-docx are pure Python, so parsing several documents on
+threads is serialized by the GIL. Each worker of this pool is a spawned
+process with its own duplex pipe: a caller checks out an idle worker, sends
+the task header and then the raw document with ``send_bytes``, which writes
+straight from the caller's buffer instead of pickling a copy, and waits for
+the extracted text. A parse that runs past the per-document timeout is
+stopped by terminating its worker, and every worker is replaced after a fixed
+number of documents so memory held by the parsers cannot grow without bound.
+"""
+from typing import Any, Dict, List, Optional
+from multiprocessing.connection import Connection
+import asyncio
+import atexit
+import functools
+import io
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Pool configuration
+EXTRACTION_WORKERS = int(os.environ.get("DOCUMENT_EXTRACTION_WORKERS", 0))  # 0 extracts in the calling thread
+EXTRACTION_TIMEOUT = float(os.environ.get("DOCUMENT_EXTRACTION_TIMEOUT", 60))  # seconds per document
+EXTRACTION_MAX_TASKS = int(os.environ.get("DOCUMENT_EXTRACTION_MAX_TASKS", 50))  # documents before a worker is replaced
+
+
+class ExtractionTimeoutError(ValueError):
+    """Raised when a document is not extracted within the pool's timeout."""
+    pass
+
+
+def extract_document(format_id: str, content: bytes, **options) -> Dict[str, Any]:
+    """Extract text from a document of a supported format.
+
+    Args:
+        format_id: 'pdf', 'docx' or 'txt'.
+        content: Raw document bytes, a buffer or an open binary file.
+        **options: Extra arguments for the PDF extractor (e.g. ``include_pages``).
+
+    Returns:
+        Dict containing extracted text and metadata.
+    """
+    from .document_processor import DocumentProcessor
+
+    if format_id == 'docx':
+        return DocumentProcessor.extract_text_from_docx(content)
+    elif format_id == 'pdf':
+        return DocumentProcessor.extract_text_from_pdf(content, **options)
+    elif format_id == 'txt':
+        if isinstance(content, (bytes, bytearray, memoryview)):
+            text = str(content, 'utf-8')
+        else:
+            reader = io.TextIOWrapper(content, encoding='utf-8')
+            text = reader.read()
+            # Leave the caller's file open
+            reader.detach()
+        return {
+            "text": text,
+            "metadata": {"format": "txt", "words": len(text.split())}
+        }
+    raise ValueError(f"Unsupported format: {format_id}")
+
+
+def _worker_main(conn: Connection) -> None:
+    """Entry point of an extraction worker process."""
+    # Import the parsers before the first document arrives
+    from . import document_processor  # noqa: F401
+
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            break
+        if task is None:
+            break
+        format_id, options = task
+        content = conn.recv_bytes()
+        try:
+            conn.send((True, extract_document(format_id, content, **options)))
+        except Exception as e:
+            # Exceptions from the parsers are not always picklable
+            conn.send((False, f"{type(e).__name__}: {e}"))
+
+
+class _Worker:
+    """One extraction process and the parent's end of its pipe."""
+
+    def __init__(self, ctx, worker_id: int):
+        self.conn, child_conn = ctx.Pipe(duplex=True)
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(child_conn,),
+            name=f"extraction-worker-{worker_id}",
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.tasks = 0
+
+    def stop(self, timeout: float = 1.0) -> None:
+        """Ask the process to exit and terminate it if it does not."""
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout)
+        self.conn.close()
+
+    def kill(self) -> None:
+        """Terminate the process immediately, abandoning its current document."""
+        self.process.terminate()
+        self.process.join(1.0)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class ExtractionPool:
+    """Document extraction worker processes with per-document timeouts."""
+
+    def __init__(self, num_workers: int = EXTRACTION_WORKERS,
+                 timeout: float = EXTRACTION_TIMEOUT,
+                 max_tasks_per_worker: int = EXTRACTION_MAX_TASKS):
+        """Initialize the pool. Workers are started on first use.
+
+        Args:
+            num_workers: Number of worker processes.
+            timeout: Seconds a single document may take before its worker is killed.
+            max_tasks_per_worker: Documents a worker extracts before it is replaced; 0 never recycles.
+        """
+        if num_workers < 1:
+            raise ValueError("num_workers must be at least 1")
+        self.num_workers = num_workers
+        self.timeout = timeout
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.started = False
+        # Spawn: forking a process that already runs threads is unsafe
+        self._ctx = multiprocessing.get_context("spawn")
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._workers: List[_Worker] = []
+        self._worker_ids = itertools.count()
+        self._lock = threading.Lock()
+        self._stopping = False
+        self._tasks_completed = 0
+        self._timeouts = 0
+        self._recycled = 0
+        self._restarts = 0
+        self._atexit_registered = False
+
+    def start(self) -> None:
+        """Start the worker processes."""
+        with self._lock:
+            if self.started:
+                return
+            self._stopping = False
+            for _ in range(self.num_workers):
+                self._idle.put(self._spawn())
+            self.started = True
+        if not self._atexit_registered:
+            atexit.register(self.shutdown)
+            self._atexit_registered = True
+        logger.info(f"Started {self.num_workers} document extraction worker processes")
+
+    def _spawn(self) -> _Worker:
+        """Start a worker process; the caller holds ``self._lock``."""
+        worker = _Worker(self._ctx, next(self._worker_ids))
+        self._workers.append(worker)
+        return worker
+
+    def _replace(self, worker: _Worker, kill: bool) -> None:
+        """Stop ``worker`` and put a fresh process in its place."""
+        if kill:
+            worker.kill()
+        else:
+            worker.stop()
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+            if self._stopping:
+                return
+            replacement = self._spawn()
+        self._idle.put(replacement)
+
+    def extract(self, format_id: str, content: bytes, timeout: Optional[float] = None,
+                **options) -> Dict[str, Any]:
+        """Extract a document on an idle worker and wait for the result.
+
+        Args:
+            format_id: 'pdf', 'docx' or 'txt'.
+            content: Raw document bytes (any buffer; it is written to the pipe without copying).
+            timeout: Seconds to wait for the result; defaults to the pool timeout.
+            **options: Extra arguments for the PDF extractor.
+
+        Returns:
+            Dict containing extracted text and metadata.
+
+        Raises:
+            ExtractionTimeoutError: If the document takes longer than the timeout.
+            ValueError: If extraction fails or the worker crashes.
+        """
+        if not self.started:
+            self.start()
+        timeout = self.timeout if timeout is None else timeout
+        worker = self._idle.get()
+        kill = False
+        try:
+            try:
+                worker.conn.send((format_id, options))
+                worker.conn.send_bytes(memoryview(content))
+                if not worker.conn.poll(timeout):
+                    kill = True
+                    with self._lock:
+                        self._timeouts += 1
+                    raise ExtractionTimeoutError(f"Document extraction did not finish within {timeout}s")
+                ok, value = worker.conn.recv()
+            except (EOFError, OSError) as e:
+                kill = True
+                with self._lock:
+                    self._restarts += 1
+                logger.error(f"Extraction worker {worker.process.pid} exited with code {worker.process.exitcode}")
+                raise ValueError(f"Document extraction worker crashed: {e}")
+            worker.tasks += 1
+            with self._lock:
+                self._tasks_completed += 1
+            if not ok:
+                raise ValueError(value)
+            return value
+        finally:
+            if self._stopping:
+                worker.stop()
+            elif kill:
+                self._replace(worker, kill=True)
+            elif self.max_tasks_per_worker and worker.tasks >= self.max_tasks_per_worker:
+                with self._lock:
+                    self._recycled += 1
+                self._replace(worker, kill=False)
+            else:
+                self._idle.put(worker)
+
+    async def extract_async(self, format_id: str, content: bytes, timeout: Optional[float] = None,
+                            **options) -> Dict[str, Any]:
+        """``extract`` from a coroutine; the waiting is done on an executor thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, functools.partial(self.extract, format_id, content, timeout, **options)
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Get pool statistics."""
+        with self._lock:
+            return {
+                "workers": self.num_workers,
+                "started": self.started,
+                "alive": sum(1 for w in self._workers if w.process.is_alive()),
+                "pids": [w.process.pid for w in self._workers],
+                "idle": self._idle.qsize(),
+                "timeout": self.timeout,
+                "max_tasks_per_worker": self.max_tasks_per_worker,
+                "tasks_completed": self._tasks_completed,
+                "timeouts": self._timeouts,
+                "recycled": self._recycled,
+                "restarts": self._restarts
+            }
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        with self._lock:
+            self._stopping = True
+            workers = list(self._workers)
+            self._workers.clear()
+            self.started = False
+        while True:
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
+        for worker in workers:
+            worker.stop()
+
+
+_pool: Optional[ExtractionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_extraction_pool() -> Optional[ExtractionPool]:
+    """Shared extraction pool, or None when DOCUMENT_EXTRACTION_WORKERS is 0."""
+    global _pool
+    if EXTRACTION_WORKERS < 1:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ExtractionPool()
+        return _pool
@@ -0,0 +1,351 @@
+"""Dynamic micro-batching scheduler for model inference.
+
+Concurrent analyze requests are held for a short wait window (or until the
+batch is full) and then scored by ``AIContentAnalyzer`` in a single padded
+forward pass. Each caller awaits its own result.
+
+Batches run on an ``InferenceExecutor`` so the event loop stays free, with at
+most one batch in flight per executor worker. Requests beyond the bounded
+queue are rejected with ``InferenceQueueFullError``; a caller that has to
+charge first reserves its place with ``reserve``. Once a request is queued
+it is scored: a batch the shared executor has no room for waits for it.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+from dataclasses import dataclass
+import asyncio
+import logging
+import os
+import time
+
+from .exceptions import InferenceQueueFullError
+from .inference_executor import InferenceExecutor
+from .monitoring import MetricsCollector, PerformanceMonitor
+
+logger = logging.getLogger(__name__)
+
+# Batching configuration
+MAX_BATCH_SIZE = int(os.environ.get("INFERENCE_BATCH_MAX_SIZE", 8))
+MAX_WAIT_MS = float(os.environ.get("INFERENCE_BATCH_WAIT_MS", 5))
+MAX_QUEUE_SIZE = int(os.environ.get("INFERENCE_BATCH_QUEUE_SIZE", 64))  # requests waiting to be batched
+
+# Seconds between attempts to hand a batch to a full executor
+EXECUTOR_RETRY_INTERVAL = 0.05
+
+
+@dataclass
+class PendingRequest:
+    """A request waiting in the batching queue."""
+    text: str
+    options: Dict[str, Any]
+    future: asyncio.Future
+    enqueued_at: float
+
+
+class QueueSlot:
+    """A place in the batching queue held for one request; see ``InferenceBatcher.reserve``."""
+
+    def __init__(self, batcher: "InferenceBatcher"):
+        self._batcher = batcher
+        self._queue = batcher._queue
+        self.held = True
+
+    def release(self) -> None:
+        """Give the place back, unless ``submit`` already used it."""
+        if self.held:
+            self.held = False
+            # A queue replaced for a new event loop starts without reservations
+            if self._batcher._queue is self._queue:
+                self._batcher._reserved -= 1
+
+    def __enter__(self) -> "QueueSlot":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
+
+
+def analyze_requests(analyzer, requests: List[Tuple[str, Dict[str, Any]]]) -> Tuple[List[Tuple[bool, Any]], Dict[str, float]]:
+    """Score (text, options) requests together in one forward pass.
+
+    Args:
+        analyzer: AIContentAnalyzer with its model loaded.
+        requests: Texts and their ``analyze_text`` options.
+
+    Returns:
+        One (ok, result_or_exception) tuple per request, in order, and the
+        duration in seconds of each stage that ran.
+    """
+    outcomes: List[Tuple[bool, Any]] = [(False, None)] * len(requests)
+    timings: Dict[str, float] = {}
+    prepared = []
+    prepared_indices = []
+    started = time.perf_counter()
+
+    # Per-request failures (e.g. empty text) must not fail the whole batch
+    for index, (text, options) in enumerate(requests):
+        try:
+            prepared.append(analyzer._prepare_analysis(text, **options))
+            prepared_indices.append(index)
+        except Exception as e:
+            outcomes[index] = (False, e)
+    preprocessed = time.perf_counter()
+    timings["preprocess"] = preprocessed - started
+
+    if prepared:
+        results = analyzer._analyze_prepared(prepared)
+        for index, result in zip(prepared_indices, results):
+            outcomes[index] = (True, result)
+        timings["inference"] = time.perf_counter() - preprocessed
+
+    return outcomes, timings
+
+
+class InferenceBatcher:
+    """Collects pending analyze requests and scores them together."""
+
+    def __init__(self, analyzer, max_batch_size: int = MAX_BATCH_SIZE,
+                 max_wait_ms: float = MAX_WAIT_MS,
+                 metrics_collector: Optional[MetricsCollector] = None,
+                 executor: Optional[InferenceExecutor] = None,
+                 max_queue_size: int = MAX_QUEUE_SIZE,
+                 performance_monitor: Optional[PerformanceMonitor] = None,
+                 worker_pool=None):
+        """Initialize the batcher.
+
+        Args:
+            analyzer: AIContentAnalyzer instance used for scoring.
+            max_batch_size: Maximum number of requests scored in one pass.
+            max_wait_ms: How long the first request of a batch waits for company.
+            metrics_collector: Collector receiving queue depth and batch size metrics.
+            executor: Inference executor running the batches.
+            max_queue_size: Requests allowed to wait for a batch before rejecting.
+            performance_monitor: Monitor receiving per-stage inference timings.
+            worker_pool: Optional ModelWorkerPool; batches are then scored in its
+                worker processes instead of on the executor thread.
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.analyzer = analyzer
+        self.max_batch_size = max_batch_size
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.max_queue_size = max(1, max_queue_size)
+        self.metrics_collector = metrics_collector or MetricsCollector()
+        self.executor = executor or InferenceExecutor()
+        self.performance_monitor = performance_monitor or PerformanceMonitor(self.metrics_collector)
+        self.worker_pool = worker_pool
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._worker_task: Optional[asyncio.Task] = None
+        self._batch_tasks: set = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reserved = 0
+        self._batches_processed = 0
+        self._requests_processed = 0
+        self._last_batch_size = 0
+
+    async def submit(self, text: str, slot: Optional[QueueSlot] = None, **options) -> Dict:
+        """Queue a text for analysis and wait for its result.
+
+        Args:
+            text: Text to analyze.
+            slot: Place reserved with ``reserve``; the request then cannot be rejected.
+            **options: Options accepted by ``AIContentAnalyzer.analyze_text``.
+
+        Returns:
+            The analysis result for ``text``.
+
+        Raises:
+            InferenceQueueFullError: If the queue is full.
+        """
+        self._ensure_worker()
+        if slot is not None and slot.held:
+            slot.release()
+        else:
+            self.check_capacity()
+        loop = asyncio.get_running_loop()
+        request = PendingRequest(
+            text=text,
+            options=options,
+            future=loop.create_future(),
+            enqueued_at=time.perf_counter()
+        )
+        try:
+            self._queue.put_nowait(request)
+        except asyncio.QueueFull:
+            raise self._queue_full_error()
+        self.metrics_collector.add_metric('inference_queue_depth', float(self._queue.qsize()))
+        return await request.future
+
+    def reserve(self) -> QueueSlot:
+        """Hold a place in the queue for a request that has to be charged first.
+
+        Use it as a context manager around the charge and the ``submit`` that
+        passes it; the place is given back if the block exits without one.
+
+        Raises:
+            InferenceQueueFullError: If the queue is full.
+        """
+        self.check_capacity()
+        self._reserved += 1
+        return QueueSlot(self)
+
+    def check_capacity(self) -> None:
+        """Raise if a new request would be rejected.
+
+        Raises:
+            InferenceQueueFullError: If the queue is full, counting reserved places.
+        """
+        if self._queue is not None and self._queue.qsize() + self._reserved >= self.max_queue_size:
+            raise self._queue_full_error()
+
+    def _queue_full_error(self) -> InferenceQueueFullError:
+        """Build the rejection error with a retry estimate for the current backlog."""
+        queued_batches = -(-self._queue.qsize() // self.max_batch_size)
+        return InferenceQueueFullError(self.max_queue_size, self.executor.retry_after(queued_batches))
+
+    def stats(self) -> Dict[str, Any]:
+        """Get current batching statistics."""
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "max_queue_size": self.max_queue_size,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "reserved": self._reserved,
+            "batches_processed": self._batches_processed,
+            "requests_processed": self._requests_processed,
+            "last_batch_size": self._last_batch_size,
+            "average_batch_size": (self._requests_processed / self._batches_processed) if self._batches_processed else 0
+        }
+
+    async def close(self) -> None:
+        """Stop the background worker."""
+        if self._worker_task is not None:
+            self._worker_task.cancel()
+            try:
+                await self._worker_task
+            except asyncio.CancelledError:
+                pass
+            self._worker_task = None
+
+    def shutdown(self) -> None:
+        """Stop the background worker from outside its event loop.
+
+        For callers that are not running on a loop, such as a test teardown
+        after the client that served the requests has finished; inside a
+        coroutine, await ``close`` instead.
+        """
+        if self._worker_task is not None and self._loop is not None and not self._loop.is_closed():
+            self._loop.run_until_complete(self.close())
+
+    def _ensure_worker(self) -> None:
+        """Start the worker on the running loop if it is not already running."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker_task is None or self._worker_task.done():
+            # A new event loop (e.g. a fresh test client) needs its own queue and worker
+            if self._loop is not loop:
+                self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+                self._reserved = 0
+                # One batch in flight per executor worker; the rest keep batching
+                self._slots = asyncio.Semaphore(self.executor.max_workers)
+            self._loop = loop
+            self._worker_task = loop.create_task(self._worker())
+
+    async def _worker(self) -> None:
+        """Form batches from the queue and dispatch them until cancelled."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._slots.acquire()
+            try:
+                batch = [await self._queue.get()]
+            except BaseException:
+                self._slots.release()
+                raise
+            deadline = loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                # Take whatever is already waiting before sleeping on the queue
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            self._record_batch(batch)
+            task = loop.create_task(self._score_batch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _score_batch(self, batch: List[PendingRequest]) -> None:
+        """Run one batch on the executor and resolve its callers."""
+        try:
+            while True:
+                try:
+                    outcomes = await self.executor.run(self._run_batch, batch, time.perf_counter())
+                    break
+                except InferenceQueueFullError:
+                    # The executor is shared (batch scoring, model warm-up); queued
+                    # requests may already be paid for, so wait for room instead of failing them
+                    await asyncio.sleep(EXECUTOR_RETRY_INTERVAL)
+        except Exception as e:
+            logger.error(f"Batch inference failed: {str(e)}")
+            outcomes = [(False, e)] * len(batch)
+        finally:
+            self._slots.release()
+
+        for request, (ok, value) in zip(batch, outcomes):
+            if request.future.done():
+                # Caller went away (e.g. client disconnected)
+                continue
+            if ok:
+                request.future.set_result(value)
+            else:
+                request.future.set_exception(value)
+
+    def _record_batch(self, batch: List[PendingRequest]) -> None:
+        """Record metrics for a batch that is about to be scored."""
+        now = time.perf_counter()
+        self._batches_processed += 1
+        self._requests_processed += len(batch)
+        self._last_batch_size = len(batch)
+        self.metrics_collector.add_metric('inference_batch_size', float(len(batch)))
+        self.metrics_collector.add_metric('inference_queue_depth', float(self._queue.qsize()))
+        for request in batch:
+            self.metrics_collector.add_metric('inference_queue_wait_time', (now - request.enqueued_at) * 1000)
+
+    def _run_batch(self, batch: List[PendingRequest], dispatched_at: float) -> List[Tuple[bool, Any]]:
+        """Score a batch in one forward pass. Runs on an inference worker.
+
+        Args:
+            batch: Requests to score.
+            dispatched_at: ``time.perf_counter()`` when the batch was handed to the executor.
+
+        Returns:
+            One (ok, result_or_exception) tuple per request, in batch order.
+        """
+        self._record_stage("executor_wait", time.perf_counter() - dispatched_at, batch)
+        requests = [(request.text, request.options) for request in batch]
+        if self.worker_pool is not None:
+            outcomes, timings = self.worker_pool.run_batch(requests)
+        else:
+            outcomes, timings = analyze_requests(self.analyzer, requests)
+        for stage, duration in timings.items():
+            self._record_stage(stage, duration, batch)
+        return outcomes
+
+    def _record_stage(self, stage: str, duration: float, batch: List[PendingRequest]) -> None:
+        """Record the duration of one pipeline stage for a batch."""
+        try:
+            self.performance_monitor.record_inference(
+                duration,
+                getattr(self.analyzer, 'model_name', 'unknown'),
+                batch_size=len(batch),
+                text_length=sum(len(request.text) for request in batch),
+                stage=stage
+            )
+        except Exception as e:
+            logger.warning(f"Failed to record {stage} timing: {str(e)}")
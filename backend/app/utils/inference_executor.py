@@ -0,0 +1,141 @@
+"""Dedicated thread pool for model inference.
+
+Forward passes hold the GIL only briefly but take long enough to stall the
+event loop, so they run on a small pool of named worker threads instead of
+asyncio's default executor. The pool has a bounded backlog: once every worker
+is busy and the backlog is full, new work is rejected with
+``InferenceQueueFullError`` so the API can answer 503 instead of queueing
+without limit.
+"""
+from typing import Any, Callable, Dict
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+import asyncio
+import logging
+import math
+import os
+import threading
+import time
+
+from .exceptions import InferenceQueueFullError
+
+logger = logging.getLogger(__name__)
+
+# Executor configuration
+INFERENCE_WORKERS = int(os.environ.get("INFERENCE_WORKERS", 1))
+INFERENCE_QUEUE_SIZE = int(os.environ.get("INFERENCE_QUEUE_SIZE", 4))  # tasks waiting for a worker
+INFERENCE_TORCH_THREADS = int(os.environ.get("INFERENCE_TORCH_THREADS", 0))  # 0 splits the CPU cores across workers
+
+
+class InferenceExecutor:
+    """Bounded thread pool that runs model inference off the event loop."""
+
+    def __init__(self, max_workers: int = INFERENCE_WORKERS, max_queue_size: int = INFERENCE_QUEUE_SIZE,
+                 torch_threads: int = INFERENCE_TORCH_THREADS):
+        """Initialize the executor.
+
+        Args:
+            max_workers: Number of inference threads.
+            max_queue_size: Tasks allowed to wait for a free worker before rejecting.
+            torch_threads: Intra-op threads for torch; 0 divides the CPU cores by ``max_workers``.
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.max_workers = max_workers
+        self.max_queue_size = max(0, max_queue_size)
+        self.torch_threads = torch_threads or max(1, (os.cpu_count() or 1) // max_workers)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="inference",
+            initializer=self._init_worker
+        )
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._durations = deque(maxlen=50)
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of tasks running or waiting at once."""
+        return self.max_workers + self.max_queue_size
+
+    def _init_worker(self) -> None:
+        """Size torch's intra-op pool so workers do not oversubscribe the CPU."""
+        try:
+            import torch
+            torch.set_num_threads(self.torch_threads)
+        except Exception as e:
+            logger.warning(f"Could not set torch threads for inference worker: {str(e)}")
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Schedule ``fn`` on an inference worker.
+
+        Raises:
+            InferenceQueueFullError: If every worker is busy and the backlog is full.
+        """
+        with self._lock:
+            if self._pending >= self.capacity:
+                self._rejected += 1
+                raise InferenceQueueFullError(self.capacity, self._estimate_retry_after(0))
+            self._pending += 1
+        try:
+            return self._executor.submit(self._run, fn, args, kwargs)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run ``fn`` on an inference worker and await its result."""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def _run(self, fn: Callable, args: tuple, kwargs: dict) -> Any:
+        """Execute a task on the worker thread and track its duration."""
+        with self._lock:
+            self._running += 1
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            duration = time.perf_counter() - start
+            with self._lock:
+                self._running -= 1
+                self._pending -= 1
+                self._completed += 1
+                self._durations.append(duration)
+
+    def retry_after(self, extra_tasks: int = 0) -> int:
+        """Estimate in seconds when a rejected caller should retry.
+
+        Args:
+            extra_tasks: Tasks queued elsewhere (e.g. in a batcher) ahead of the caller.
+        """
+        with self._lock:
+            return self._estimate_retry_after(extra_tasks)
+
+    def _estimate_retry_after(self, extra_tasks: int) -> int:
+        """Retry estimate from recent task durations. Caller holds the lock."""
+        average = (sum(self._durations) / len(self._durations)) if self._durations else 1.0
+        # Work ahead of the caller drains max_workers tasks at a time
+        waves = (self._pending + extra_tasks) / self.max_workers
+        return max(1, math.ceil(average * waves))
+
+    def stats(self) -> Dict[str, Any]:
+        """Get executor statistics."""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue_size": self.max_queue_size,
+                "torch_threads": self.torch_threads,
+                "running": self._running,
+                "queued": self._pending - self._running,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "average_task_ms": (sum(self._durations) / len(self._durations) * 1000) if self._durations else None
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker threads."""
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,428 @@
+"""Durable queue for analysis jobs that run outside the HTTP request.
+
+The API enqueues a job (its options as JSON plus the raw upload as a blob)
+and answers with the job ID at once; a separate worker process
+(``app.services.job_worker``) claims jobs, runs them and stores the result on
+the job for later retrieval. A claim is a lease: if the worker dies, the job
+returns to the queue once the lease expires, up to a maximum number of
+attempts. A worker renews the lease while the job runs, and a result is only
+stored by the attempt that still holds it. SQLite is the default backend
+and needs no extra service; a Redis backend is available for deployments
+with workers on several hosts.
+"""
+from typing import Any, Dict, Iterator, Optional
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Queue configuration
+JOB_QUEUE_ENABLED = os.environ.get("ANALYZE_JOB_QUEUE", "false").lower() in ("1", "true", "yes")
+JOB_QUEUE_BACKEND = os.environ.get("JOB_QUEUE_BACKEND", "sqlite")  # "sqlite" or "redis"
+JOB_QUEUE_PATH = os.environ.get(
+    "JOB_QUEUE_PATH", str(Path(tempfile.gettempdir()) / "ai_detector_cache" / "jobs.sqlite3")
+)
+JOB_QUEUE_REDIS_URL = os.environ.get("JOB_QUEUE_REDIS_URL", os.environ.get("REDIS_URL", "redis://localhost:6379/0"))
+JOB_QUEUE_LEASE = float(os.environ.get("JOB_QUEUE_LEASE_SECONDS", 900))  # seconds before a claimed job is retried
+JOB_QUEUE_MAX_ATTEMPTS = int(os.environ.get("JOB_QUEUE_MAX_ATTEMPTS", 3))
+JOB_QUEUE_RESULT_TTL = float(os.environ.get("JOB_QUEUE_RESULT_TTL", 7 * 24 * 3600))  # seconds a finished job is kept
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+@dataclass
+class QueuedJob:
+    """A job as stored in the queue."""
+    id: str
+    kind: str
+    user_id: Optional[str]
+    status: str
+    payload: Dict[str, Any]
+    data: Optional[bytes] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    attempts: int = 0
+    created_at: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Job status for API responses (without the raw upload)."""
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "attempts": self.attempts,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+
+class SQLiteJobQueue:
+    """Job queue in a local SQLite database (WAL mode, one connection per call)."""
+
+    _COLUMNS = "id, kind, user_id, status, payload, data, result, error, attempts, created_at, started_at, finished_at"
+    # Status reads skip the (possibly large) upload
+    _STATUS_COLUMNS = _COLUMNS.replace("data", "NULL")
+
+    def __init__(self, path: str = JOB_QUEUE_PATH, lease_seconds: float = JOB_QUEUE_LEASE,
+                 max_attempts: int = JOB_QUEUE_MAX_ATTEMPTS, result_ttl: float = JOB_QUEUE_RESULT_TTL):
+        """Initialize the queue and create its table if needed.
+
+        Args:
+            path: SQLite database file.
+            lease_seconds: Seconds a claimed job may run before it is handed out again.
+            max_attempts: Claims of a job before it is failed for good.
+            result_ttl: Seconds finished jobs are kept.
+        """
+        self.path = str(path)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.result_ttl = result_ttl
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS analysis_jobs ("
+                " id TEXT PRIMARY KEY, kind TEXT NOT NULL, user_id TEXT, status TEXT NOT NULL,"
+                " payload TEXT NOT NULL, data BLOB, result TEXT, error TEXT,"
+                " attempts INTEGER NOT NULL DEFAULT 0, created_at REAL NOT NULL,"
+                " started_at REAL, finished_at REAL, lease_expires REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_analysis_jobs_status ON analysis_jobs (status, created_at)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # isolation_level=None: statements autocommit, transactions are opened with BEGIN IMMEDIATE
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            conn.execute("PRAGMA busy_timeout=30000")
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _row_to_job(row) -> QueuedJob:
+        return QueuedJob(
+            id=row[0], kind=row[1], user_id=row[2], status=row[3],
+            payload=json.loads(row[4]), data=row[5],
+            result=json.loads(row[6]) if row[6] is not None else None,
+            error=row[7], attempts=row[8], created_at=row[9], started_at=row[10], finished_at=row[11]
+        )
+
+    def enqueue(self, kind: str, payload: Dict[str, Any], user_id: Optional[str] = None,
+                data: Optional[bytes] = None) -> QueuedJob:
+        """Add a job to the queue.
+
+        Args:
+            kind: Job type understood by the worker (e.g. 'file', 'batch').
+            payload: JSON-serializable job options.
+            user_id: User the job belongs to (and is charged to).
+            data: Optional raw bytes, e.g. the uploaded file.
+
+        Returns:
+            The queued job.
+        """
+        job = QueuedJob(id=uuid.uuid4().hex, kind=kind, user_id=user_id, status=QUEUED,
+                        payload=payload, data=data, created_at=time.time())
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO analysis_jobs (id, kind, user_id, status, payload, data, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job.id, kind, user_id, QUEUED, json.dumps(payload),
+                 sqlite3.Binary(data) if data is not None else None, job.created_at)
+            )
+        return job
+
+    def claim(self) -> Optional[QueuedJob]:
+        """Lease the oldest waiting job (or one whose lease expired) to the caller."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Jobs whose worker died too often are not retried again
+                conn.execute(
+                    "UPDATE analysis_jobs SET status = ?, error = ?, finished_at = ?, data = NULL"
+                    " WHERE status = ? AND lease_expires < ? AND attempts >= ?",
+                    (FAILED, "Worker did not finish the job", now, RUNNING, now, self.max_attempts)
+                )
+                row = conn.execute(
+                    "SELECT id FROM analysis_jobs WHERE status = ? OR (status = ? AND lease_expires < ?)"
+                    " ORDER BY created_at LIMIT 1",
+                    (QUEUED, RUNNING, now)
+                ).fetchone()
+                job = None
+                if row is not None:
+                    conn.execute(
+                        "UPDATE analysis_jobs SET status = ?, attempts = attempts + 1, started_at = ?,"
+                        " lease_expires = ? WHERE id = ?",
+                        (RUNNING, now, now + self.lease_seconds, row[0])
+                    )
+                    job = self._row_to_job(conn.execute(
+                        f"SELECT {self._COLUMNS} FROM analysis_jobs WHERE id = ?", (row[0],)
+                    ).fetchone())
+                conn.execute("COMMIT")
+                return job
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def renew(self, job_id: str, attempt: int) -> bool:
+        """Extend the lease of a running job.
+
+        Args:
+            job_id: ID of the job.
+            attempt: ``attempts`` of the claim being renewed.
+
+        Returns:
+            False if that claim no longer holds the job (its lease expired and
+            it was handed out again, or it was failed).
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE analysis_jobs SET lease_expires = ? WHERE id = ? AND attempts = ? AND status = ?",
+                (time.time() + self.lease_seconds, job_id, attempt, RUNNING)
+            )
+            return cursor.rowcount == 1
+
+    def _finish(self, job_id: str, status: str, result: Optional[Dict[str, Any]], error: Optional[str],
+                attempt: Optional[int] = None) -> bool:
+        query = ("UPDATE analysis_jobs SET status = ?, result = ?, error = ?, finished_at = ?,"
+                 " lease_expires = NULL, data = NULL WHERE id = ?")
+        params = [status, json.dumps(result) if result is not None else None, error, time.time(), job_id]
+        if attempt is not None:
+            query += " AND attempts = ? AND status = ?"
+            params += [attempt, RUNNING]
+        with self._connect() as conn:
+            return conn.execute(query, params).rowcount == 1
+
+    def complete(self, job_id: str, result: Dict[str, Any], attempt: Optional[int] = None) -> bool:
+        """Store a job's result; its raw data is dropped.
+
+        Args:
+            job_id: ID of the job.
+            result: JSON-serializable result.
+            attempt: ``attempts`` of the claim that ran the job; the result is
+                only stored while that claim still holds the job.
+
+        Returns:
+            Whether the job was updated.
+        """
+        return self._finish(job_id, COMPLETED, result, None, attempt)
+
+    def fail(self, job_id: str, error: str, attempt: Optional[int] = None) -> bool:
+        """Mark a job failed with an error message; see ``complete`` for ``attempt``."""
+        return self._finish(job_id, FAILED, None, error, attempt)
+
+    def get(self, job_id: str, user_id: Optional[str] = None) -> Optional[QueuedJob]:
+        """Job by ID, or None if it does not exist or belongs to another user."""
+        with self._connect() as conn:
+            row = conn.execute(f"SELECT {self._STATUS_COLUMNS} FROM analysis_jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = self._row_to_job(row)
+        if user_id is not None and job.user_id != user_id:
+            return None
+        return job
+
+    def purge(self) -> int:
+        """Delete finished jobs older than the result TTL; returns how many were removed."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "DELETE FROM analysis_jobs WHERE status IN (?, ?) AND finished_at < ?",
+                (COMPLETED, FAILED, time.time() - self.result_ttl)
+            )
+            return cursor.rowcount
+
+    def stats(self) -> Dict[str, int]:
+        """Number of jobs in each status."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM analysis_jobs GROUP BY status").fetchall()
+        counts = {QUEUED: 0, RUNNING: 0, COMPLETED: 0, FAILED: 0}
+        counts.update(dict(rows))
+        return counts
+
+
+class RedisJobQueue:
+    """Job queue in Redis: a hash per job, a list of waiting IDs and a sorted set of leases."""
+
+    def __init__(self, redis_client, prefix: str = "analysis_jobs:", lease_seconds: float = JOB_QUEUE_LEASE,
+                 max_attempts: int = JOB_QUEUE_MAX_ATTEMPTS, result_ttl: float = JOB_QUEUE_RESULT_TTL):
+        """Initialize the queue.
+
+        Args:
+            redis_client: Synchronous ``redis.Redis`` client.
+            prefix: Key prefix.
+            lease_seconds: Seconds a claimed job may run before it is handed out again.
+            max_attempts: Claims of a job before it is failed for good.
+            result_ttl: Seconds finished jobs are kept.
+        """
+        self.redis = redis_client
+        self.prefix = prefix
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.result_ttl = result_ttl
+        self._waiting = prefix + "waiting"
+        self._leases = prefix + "leases"
+
+    def _key(self, job_id: str) -> str:
+        return f"{self.prefix}job:{job_id}"
+
+    def _data_key(self, job_id: str) -> str:
+        return f"{self.prefix}data:{job_id}"
+
+    def _load(self, job_id: str, with_data: bool = False) -> Optional[QueuedJob]:
+        fields = {k.decode(): v.decode() for k, v in self.redis.hgetall(self._key(job_id)).items()}
+        if not fields:
+            return None
+
+        def number(name):
+            return float(fields[name]) if fields.get(name) else None
+
+        return QueuedJob(
+            id=job_id, kind=fields["kind"], user_id=fields.get("user_id") or None, status=fields["status"],
+            payload=json.loads(fields["payload"]),
+            data=self.redis.get(self._data_key(job_id)) if with_data else None,
+            result=json.loads(fields["result"]) if fields.get("result") else None,
+            error=fields.get("error") or None, attempts=int(fields.get("attempts", 0)),
+            created_at=number("created_at"), started_at=number("started_at"), finished_at=number("finished_at")
+        )
+
+    def enqueue(self, kind: str, payload: Dict[str, Any], user_id: Optional[str] = None,
+                data: Optional[bytes] = None) -> QueuedJob:
+        """Add a job to the queue; see ``SQLiteJobQueue.enqueue``."""
+        job = QueuedJob(id=uuid.uuid4().hex, kind=kind, user_id=user_id, status=QUEUED,
+                        payload=payload, data=data, created_at=time.time())
+        pipe = self.redis.pipeline()
+        pipe.hset(self._key(job.id), mapping={
+            "kind": kind, "user_id": user_id or "", "status": QUEUED, "payload": json.dumps(payload),
+            "attempts": 0, "created_at": job.created_at
+        })
+        if data is not None:
+            pipe.set(self._data_key(job.id), data)
+        pipe.rpush(self._waiting, job.id)
+        pipe.execute()
+        return job
+
+    def _expire_leases(self) -> None:
+        """Return jobs whose lease ran out to the queue, or fail them after too many attempts."""
+        for raw_id in self.redis.zrangebyscore(self._leases, 0, time.time()):
+            job_id = raw_id.decode()
+            if not self.redis.zrem(self._leases, job_id):
+                continue  # Another worker got to it first
+            attempts = int(self.redis.hget(self._key(job_id), "attempts") or 0)
+            if attempts >= self.max_attempts:
+                self.fail(job_id, "Worker did not finish the job")
+            else:
+                self.redis.hset(self._key(job_id), "status", QUEUED)
+                self.redis.lpush(self._waiting, job_id)
+
+    def claim(self) -> Optional[QueuedJob]:
+        """Lease the oldest waiting job to the caller."""
+        self._expire_leases()
+        now = time.time()
+        raw_id = self.redis.eval(self._CLAIM_SCRIPT, 2, self._waiting, self._leases,
+                                 self._key(""), RUNNING, now, now + self.lease_seconds)
+        if raw_id is None:
+            return None
+        return self._load(raw_id.decode(), with_data=True)
+
+    # Pops and leases a job in one step, so a worker dying in between cannot lose it.
+    # The job's hash key is only known once its ID is popped, hence the prefix in ARGV
+    _CLAIM_SCRIPT = """
+    local job_id = redis.call('lpop', KEYS[1])
+    if not job_id then
+        return false
+    end
+    local key = ARGV[1] .. job_id
+    redis.call('hset', key, 'status', ARGV[2], 'started_at', ARGV[3])
+    redis.call('hincrby', key, 'attempts', 1)
+    redis.call('zadd', KEYS[2], ARGV[4], job_id)
+    return job_id
+    """
+
+    # Only the claim whose attempt number is current and that still holds the lease may act on a job
+    _RENEW_SCRIPT = """
+    if redis.call('hget', KEYS[1], 'attempts') == ARGV[1] and redis.call('zscore', KEYS[2], ARGV[2]) then
+        redis.call('zadd', KEYS[2], ARGV[3], ARGV[2])
+        return 1
+    end
+    return 0
+    """
+    _RELEASE_SCRIPT = """
+    if redis.call('hget', KEYS[1], 'attempts') == ARGV[1] then
+        return redis.call('zrem', KEYS[2], ARGV[2])
+    end
+    return 0
+    """
+
+    def renew(self, job_id: str, attempt: int) -> bool:
+        """Extend the lease of a running job; see ``SQLiteJobQueue.renew``."""
+        return bool(self.redis.eval(self._RENEW_SCRIPT, 2, self._key(job_id), self._leases,
+                                    str(attempt), job_id, time.time() + self.lease_seconds))
+
+    def _finish(self, job_id: str, status: str, result: Optional[Dict[str, Any]], error: Optional[str],
+                attempt: Optional[int] = None) -> bool:
+        # Taking the lease out of the set is what makes this claim the one that finishes the job
+        if attempt is not None and not self.redis.eval(self._RELEASE_SCRIPT, 2, self._key(job_id), self._leases,
+                                                        str(attempt), job_id):
+            return False
+        pipe = self.redis.pipeline()
+        pipe.hset(self._key(job_id), mapping={
+            "status": status, "result": json.dumps(result) if result is not None else "",
+            "error": error or "", "finished_at": time.time()
+        })
+        pipe.zrem(self._leases, job_id)
+        pipe.delete(self._data_key(job_id))
+        pipe.expire(self._key(job_id), int(self.result_ttl))
+        pipe.execute()
+        return True
+
+    def complete(self, job_id: str, result: Dict[str, Any], attempt: Optional[int] = None) -> bool:
+        """Store a job's result; see ``SQLiteJobQueue.complete``."""
+        return self._finish(job_id, COMPLETED, result, None, attempt)
+
+    def fail(self, job_id: str, error: str, attempt: Optional[int] = None) -> bool:
+        """Mark a job failed with an error message; see ``SQLiteJobQueue.complete`` for ``attempt``."""
+        return self._finish(job_id, FAILED, None, error, attempt)
+
+    def get(self, job_id: str, user_id: Optional[str] = None) -> Optional[QueuedJob]:
+        """Job by ID, or None if it does not exist or belongs to another user."""
+        job = self._load(job_id)
+        if job is None or (user_id is not None and job.user_id != user_id):
+            return None
+        return job
+
+    def purge(self) -> int:
+        """Finished jobs expire through their key TTL."""
+        return 0
+
+    def stats(self) -> Dict[str, int]:
+        """Waiting and leased job counts."""
+        return {QUEUED: self.redis.llen(self._waiting), RUNNING: self.redis.zcard(self._leases)}
+
+
+def create_job_queue():
+    """Create the job queue from environment configuration.
+
+    Returns:
+        RedisJobQueue when JOB_QUEUE_BACKEND is "redis", otherwise SQLiteJobQueue.
+    """
+    if JOB_QUEUE_BACKEND == "redis":
+        import redis
+        return RedisJobQueue(redis.from_url(JOB_QUEUE_REDIS_URL))
+    return SQLiteJobQueue(JOB_QUEUE_PATH)
@@ -2,16 +2,24 @@
 from typing import Dict, List, Optional, Tuple
 from langdetect import detect, detect_langs, DetectorFactory
 from langdetect.lang_detect_exception import LangDetectException
+import hashlib
 import logging
-from collections import defaultdict
-import re
+import os
+import threading
+from collections import OrderedDict, defaultdict
 import unicodedata
+import numpy as np
+from . import text_patterns as patterns
 
 # Set seed for consistent language detection
 DetectorFactory.seed = 0
 
 logger = logging.getLogger(__name__)
 
+# Language detection fast path
+DETECTION_SAMPLE_CHARS = int(os.environ.get("LANGUAGE_DETECTION_SAMPLE_CHARS", 4000))  # 0 always uses the full text
+DETECTION_CACHE_SIZE = int(os.environ.get("LANGUAGE_DETECTION_CACHE_SIZE", 1024))  # 0 disables memoization
+
 class LanguageDetector:
     """Handles language detection and validation."""
     
@@ -44,16 +52,80 @@ class LanguageDetector:
         }
     }
 
+    # Memoized detection results keyed by text digest (LRU)
+    _detection_cache: "OrderedDict[bytes, Tuple[str, float]]" = OrderedDict()
+    _detection_cache_lock = threading.Lock()
+
     @staticmethod
-    def detect_language(text: str) -> Tuple[str, float]:
+    def detect_language(text: str, characteristics: Optional[Dict] = None) -> Tuple[str, float]:
         """Detect the language of the given text with confidence score.
         
+        Text without any letters is rejected without running langdetect.
+        Long texts are detected on a bounded sample (see ``sample_text``) and
+        results are memoized by text digest.
+        
         Args:
             text: Input text to analyze.
+            characteristics: Output of ``analyze_language_characteristics``
+                for ``text``, if already computed.
             
         Returns:
             Tuple of (language_code, confidence_score).
         """
+        if characteristics is not None and characteristics['ratios']['letter_ratio'] == 0:
+            # langdetect has no n-grams to work with
+            return ('unknown', 0.0)
+
+        key = hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+        cache = LanguageDetector._detection_cache
+        with LanguageDetector._detection_cache_lock:
+            if key in cache:
+                cache.move_to_end(key)
+                return cache[key]
+
+        result = LanguageDetector._detect_langs(LanguageDetector.sample_text(text))
+
+        if DETECTION_CACHE_SIZE > 0:
+            with LanguageDetector._detection_cache_lock:
+                cache[key] = result
+                while len(cache) > DETECTION_CACHE_SIZE:
+                    cache.popitem(last=False)
+        return result
+
+    @staticmethod
+    def sample_text(text: str, max_chars: int = DETECTION_SAMPLE_CHARS, slices: int = 4) -> str:
+        """Bounded sample of a long text for language detection.
+
+        Keeps the first half of the budget as a prefix and spreads the rest
+        over ``slices`` excerpts from the remainder, so a document whose
+        language changes after the introduction is still represented.
+        Excerpts start on a word boundary.
+
+        Args:
+            text: Input text.
+            max_chars: Approximate sample size; 0 returns the text unchanged.
+            slices: Number of excerpts taken after the prefix.
+
+        Returns:
+            The text itself when short enough, otherwise the sample.
+        """
+        if max_chars <= 0 or len(text) <= max_chars:
+            return text
+        prefix = max_chars // 2
+        slice_length = (max_chars - prefix) // slices
+        parts = [text[:prefix]]
+        step = (len(text) - prefix) // slices
+        for i in range(slices):
+            start = prefix + i * step
+            boundary = text.find(' ', start, start + 64)
+            if boundary != -1:
+                start = boundary + 1
+            parts.append(text[start:start + slice_length])
+        return '\n'.join(parts)
+
+    @staticmethod
+    def _detect_langs(text: str) -> Tuple[str, float]:
+        """Run langdetect and return its most probable language."""
         try:
             # Get language probabilities
             langs = detect_langs(text)
@@ -78,19 +150,25 @@ class LanguageDetector:
         Returns:
             Dictionary containing language analysis metrics.
         """
-        # Count character types
+        # Histogram the UTF-32 code points with NumPy and resolve the Unicode
+        # category once per distinct character. np.unique sorts, so the cost
+        # does not depend on how high the code points go (one emoji would
+        # make a bincount allocate ~128K slots). Characters are visited in
+        # order of first occurrence, so the keys come out in the same order
+        # as a per-character loop would insert them.
+        code_points = np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+        total_chars = int(code_points.size)
+        unique, first_seen, frequencies = np.unique(code_points, return_index=True, return_counts=True)
+        order = np.argsort(first_seen, kind='stable')
+        unique, frequencies = unique[order], frequencies[order]
+
         char_counts = defaultdict(int)
-        total_chars = 0
-        
-        for char in text:
-            total_chars += 1
-            # Get character category
-            category = unicodedata.category(char)
-            char_counts[category] += 1
+        for code_point, count in zip(unique.tolist(), frequencies.tolist()):
+            char_counts[unicodedata.category(chr(code_point))] += count
             
             # Count ASCII vs non-ASCII
-            if ord(char) < 128:
-                char_counts['ascii'] += 1
+            if code_point < 128:
+                char_counts['ascii'] += count
         
         # Calculate ratios
         ratios = {
@@ -104,7 +182,7 @@ class LanguageDetector:
             'character_counts': dict(char_counts),
             'ratios': ratios,
             'total_characters': total_chars,
-            'unique_characters': len(set(text))
+            'unique_characters': int(unique.size)
         }
 
     @staticmethod
@@ -136,7 +214,8 @@ class LanguageDetector:
         metrics = {
             'length': len(text),
             'word_count': len(text.split()),
-            'sentence_count': len(re.split(r'[.!?]+', text)),
+            # re.split always returns one more piece than there are separators
+            'sentence_count': len(patterns.SENTENCE_TERMINATORS.findall(text)) + 1,
         }
         
         # Add language-specific metrics
@@ -157,7 +236,7 @@ class LanguageDetector:
         words = text.lower().split()
         return {
             'avg_word_length': sum(len(w) for w in words) / max(len(words), 1),
-            'contraction_count': len(re.findall(r"\w+'(?:s|t|ve|ll|re|d)\b", text)),
+            'contraction_count': len(patterns.ENGLISH_CONTRACTION.findall(text)),
             'common_english_words': len([w for w in words if w in {'the', 'be', 'to', 'of', 'and', 'a', 'in', 'that'}])
         }
 
@@ -165,8 +244,8 @@ class LanguageDetector:
     def _get_french_metrics(text: str) -> Dict:
         """Calculate French-specific metrics."""
         return {
-            'accent_ratio': len(re.findall(r'[éèêëàâäôöûüçîïù]', text)) / max(len(text), 1),
-            'french_articles': len(re.findall(r'\b(le|la|les|un|une|des)\b', text.lower()))
+            'accent_ratio': patterns.count_characters(text, patterns.FRENCH_ACCENTS) / max(len(text), 1),
+            'french_articles': len(patterns.FRENCH_ARTICLE.findall(text.lower()))
         }
 
     @staticmethod
@@ -174,13 +253,13 @@ class LanguageDetector:
         """Calculate German-specific metrics."""
         return {
             'compound_words': len([w for w in text.split() if len(w) > 20]),
-            'umlauts': len(re.findall(r'[äöüß]', text))
+            'umlauts': patterns.count_characters(text, patterns.GERMAN_UMLAUTS)
         }
 
     @staticmethod
     def _get_spanish_metrics(text: str) -> Dict:
         """Calculate Spanish-specific metrics."""
         return {
-            'inverted_punctuation': len(re.findall(r'[¡¿]', text)),
-            'spanish_articles': len(re.findall(r'\b(el|la|los|las|un|una|unos|unas)\b', text.lower()))
+            'inverted_punctuation': patterns.count_characters(text, patterns.SPANISH_INVERTED_PUNCTUATION),
+            'spanish_articles': len(patterns.SPANISH_ARTICLE.findall(text.lower()))
         }
\ No newline at end of file
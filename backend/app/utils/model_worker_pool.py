@@ -0,0 +1,332 @@
+"""Multi-process inference pool sharing one copy of the model weights.
+
+The API process loads the model once and moves its tensors into shared
+memory with ``share_memory()``. Worker processes are spawned with the model
+as an argument; torch's multiprocessing pickler passes shared tensors as
+handles, so every worker maps the same weight pages instead of holding its
+own copy. Quantized tensors cannot be shared this way, so the API loads the
+fp32 model in pool mode unless INFERENCE_PROCESS_QUANTIZE is set; an INT8
+model is serialized instead and each worker loads its own (four times
+smaller) copy, which trades memory for speed past about four workers.
+Batches of (text, options) requests go to the least busy worker over a
+local queue and results come back on a pipe per worker. A worker
+that crashes, or does not answer a batch within the task timeout, is killed
+and replaced; since no other process writes to its pipe, killing it at any
+point cannot leave a lock held that the other workers need.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from multiprocessing.connection import wait
+import atexit
+import io
+import itertools
+import logging
+import os
+import pickle
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Pool configuration
+PROCESS_WORKERS = int(os.environ.get("INFERENCE_PROCESS_WORKERS", 0))  # 0 runs inference in the API process
+PROCESS_TORCH_THREADS = int(os.environ.get("INFERENCE_PROCESS_TORCH_THREADS", 0))  # 0 splits the CPU cores across workers
+PROCESS_TASK_TIMEOUT = float(os.environ.get("INFERENCE_PROCESS_TIMEOUT", 120))  # seconds
+PROCESS_START_TIMEOUT = float(os.environ.get("INFERENCE_PROCESS_START_TIMEOUT", 300))  # seconds
+PROCESS_QUANTIZE = os.environ.get("INFERENCE_PROCESS_QUANTIZE", "false").lower() == "true"  # INT8 copy per worker instead of shared fp32
+
+
+def _portable_exception(error: Exception) -> Exception:
+    """Return ``error`` if it survives pickling, otherwise a RuntimeError with its message."""
+    try:
+        pickle.loads(pickle.dumps(error))
+        return error
+    except Exception:
+        return RuntimeError(f"{type(error).__name__}: {error}")
+
+
+def _worker_main(worker_id: int, model_name: str, model, tokenizer, torch_threads: int,
+                 task_queue, result_conn) -> None:
+    """Entry point of an inference worker process."""
+    import torch
+    from ..models.analyzer import AIContentAnalyzer
+    from .inference_batcher import analyze_requests
+
+    torch.set_num_threads(torch_threads)
+    if isinstance(model, bytes):
+        # Serialized INT8 model (see ModelWorkerPool.start)
+        model = torch.load(io.BytesIO(model), map_location="cpu", weights_only=False).eval()
+    analyzer = AIContentAnalyzer(model_name=model_name)
+    analyzer.model = model
+    analyzer.tokenizer = tokenizer
+    analyzer.model_loaded = True
+    analyzer.warm_up()
+    result_conn.send(("ready", worker_id, None, os.getpid()))
+
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+        task_id, requests = task
+        try:
+            outcomes, timings = analyze_requests(analyzer, requests)
+            outcomes = [(ok, value if ok else _portable_exception(value)) for ok, value in outcomes]
+        except Exception as e:
+            outcomes, timings = [(False, _portable_exception(e))] * len(requests), {}
+        result_conn.send(("result", worker_id, task_id, (outcomes, timings)))
+
+
+class ModelWorkerPool:
+    """Inference worker processes reading one shared copy of the model."""
+
+    def __init__(self, analyzer, num_workers: int = PROCESS_WORKERS,
+                 torch_threads: int = PROCESS_TORCH_THREADS,
+                 task_timeout: float = PROCESS_TASK_TIMEOUT):
+        """Initialize the pool. Workers are started by ``start()``.
+
+        Args:
+            analyzer: AIContentAnalyzer whose loaded model and tokenizer are shared.
+            num_workers: Number of worker processes.
+            torch_threads: Intra-op threads per worker; 0 divides the CPU cores by ``num_workers``.
+            task_timeout: Seconds to wait for a batch result before the worker is restarted.
+        """
+        if num_workers < 1:
+            raise ValueError("num_workers must be at least 1")
+        self.analyzer = analyzer
+        self.num_workers = num_workers
+        self.torch_threads = torch_threads or max(1, (os.cpu_count() or 1) // num_workers)
+        self.task_timeout = task_timeout
+        self.started = False
+        self._ctx = None
+        self._model_payload = None
+        self._result_conns: List[Any] = []
+        self._retired_conns: List[Any] = []
+        self._task_queues: List[Any] = []
+        self._processes: List[Any] = []
+        self._in_flight: Dict[int, set] = {}
+        self._futures: Dict[int, Tuple[int, Future]] = {}
+        self._task_ids = itertools.count()
+        self._lock = threading.Lock()
+        self._listener: Optional[threading.Thread] = None
+        self._ready = threading.Condition(self._lock)
+        self._ready_workers: set = set()
+        self._stopping = False
+        self._tasks_completed = 0
+        self._restarts = 0
+        self._atexit_registered = False
+
+    def start(self) -> None:
+        """Share the analyzer's weights and start the worker processes."""
+        if self.started:
+            return
+        import torch.multiprocessing as torch_mp
+
+        if not self.analyzer.model_loaded or self.analyzer.model is None:
+            raise RuntimeError("Model must be loaded before starting the worker pool")
+
+        if getattr(self.analyzer, 'quantized', False):
+            import torch
+            buffer = io.BytesIO()
+            torch.save(self.analyzer.model, buffer)
+            self._model_payload = buffer.getvalue()
+            logger.info("INT8 weights cannot be placed in shared memory; each worker loads its own copy")
+        else:
+            # Moves parameter storage into shared memory in place; the API process keeps using it
+            self.analyzer.model.share_memory()
+            self._model_payload = self.analyzer.model
+
+        # Spawn: forking a process that already runs threads is unsafe
+        self._ctx = torch_mp.get_context("spawn")
+        self._result_conns = [None] * self.num_workers
+        self._task_queues = [None] * self.num_workers
+        self._processes = [None] * self.num_workers
+        self._stopping = False
+        for worker_id in range(self.num_workers):
+            self._start_worker(worker_id)
+
+        self._listener = threading.Thread(target=self._listen, name="inference-pool-listener", daemon=True)
+        self._listener.start()
+
+        deadline = time.monotonic() + PROCESS_START_TIMEOUT
+        with self._ready:
+            while len(self._ready_workers) < self.num_workers:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.shutdown()
+                    raise RuntimeError("Inference worker processes did not start in time")
+                self._ready.wait(remaining)
+
+        self.started = True
+        if not self._atexit_registered:
+            atexit.register(self.shutdown)
+            self._atexit_registered = True
+        logger.info(f"Started {self.num_workers} inference worker processes sharing {self.analyzer.model_name}")
+
+    def _start_worker(self, worker_id: int) -> None:
+        """Spawn (or respawn) one worker process."""
+        task_queue = self._ctx.Queue()
+        result_conn, worker_conn = self._ctx.Pipe(duplex=False)
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(worker_id, self.analyzer.model_name, self._model_payload, self.analyzer.tokenizer,
+                  self.torch_threads, task_queue, worker_conn),
+            name=f"inference-worker-{worker_id}",
+            daemon=True
+        )
+        process.start()
+        # Only the worker keeps the sending end, so its pipe reports EOF once it is gone
+        worker_conn.close()
+        with self._lock:
+            if self._result_conns[worker_id] is not None:
+                # Drained by the listener until the old worker's end closes
+                self._retired_conns.append(self._result_conns[worker_id])
+            self._result_conns[worker_id] = result_conn
+            self._task_queues[worker_id] = task_queue
+            self._processes[worker_id] = process
+            self._in_flight[worker_id] = set()
+
+    def run_batch(self, requests: List[Tuple[str, Dict[str, Any]]]) -> Tuple[List[Tuple[bool, Any]], Dict[str, float]]:
+        """Score requests on the least busy worker and wait for the result.
+
+        Args:
+            requests: Texts and their ``analyze_text`` options.
+
+        Returns:
+            Same as ``inference_batcher.analyze_requests``.
+        """
+        if not self.started:
+            raise RuntimeError("Worker pool is not started")
+        future: Future = Future()
+        with self._lock:
+            if not self._in_flight:
+                raise RuntimeError("No inference workers available")
+            worker_id = min(self._in_flight, key=lambda w: len(self._in_flight[w]))
+            task_id = next(self._task_ids)
+            self._futures[task_id] = (worker_id, future)
+            self._in_flight[worker_id].add(task_id)
+            self._task_queues[worker_id].put((task_id, requests))
+        try:
+            return future.result(timeout=self.task_timeout)
+        except FutureTimeoutError:
+            with self._lock:
+                self._futures.pop(task_id, None)
+                # Unless the worker was replaced meanwhile, it is still busy with the batch
+                process = self._processes[worker_id] if task_id in self._in_flight.get(worker_id, ()) else None
+            if process is not None:
+                logger.error(f"Inference worker {worker_id} did not answer within {self.task_timeout}s, restarting")
+                self._restart_worker(worker_id, process, f"Inference worker {worker_id} was restarted after a timeout")
+            raise TimeoutError(f"Inference worker {worker_id} did not answer within {self.task_timeout}s")
+
+    def _listen(self) -> None:
+        """Resolve results from the workers and replace workers that died."""
+        while not self._stopping:
+            with self._lock:
+                conns = [conn for conn in self._result_conns if conn is not None] + self._retired_conns
+            for conn in wait(conns, timeout=1.0):
+                try:
+                    message = conn.recv()
+                except (EOFError, OSError):
+                    # The worker is gone; _check_workers replaces it if that has not happened yet
+                    self._drop_conn(conn)
+                    continue
+                self._handle_message(*message)
+            self._check_workers()
+
+        with self._lock:
+            conns = [conn for conn in self._result_conns if conn is not None] + self._retired_conns
+            self._result_conns = [None] * len(self._result_conns)
+            self._retired_conns = []
+        for conn in conns:
+            conn.close()
+
+    def _handle_message(self, kind: str, worker_id: int, task_id: Optional[int], payload: Any) -> None:
+        """Record a worker becoming ready or resolve the future of a finished batch."""
+        with self._lock:
+            if kind == "ready":
+                self._ready_workers.add(worker_id)
+                self._ready.notify_all()
+                return
+            entry = self._futures.pop(task_id, None)
+            self._in_flight.get(worker_id, set()).discard(task_id)
+            self._tasks_completed += 1
+        if entry is not None and not entry[1].done():
+            entry[1].set_result(payload)
+
+    def _drop_conn(self, conn) -> None:
+        """Stop listening on the pipe of a worker that exited."""
+        with self._lock:
+            if conn in self._retired_conns:
+                self._retired_conns.remove(conn)
+            else:
+                self._result_conns = [None if c is conn else c for c in self._result_conns]
+        conn.close()
+
+    def _check_workers(self) -> None:
+        """Replace workers that crashed."""
+        for worker_id, process in enumerate(self._processes):
+            if process is None or process.is_alive() or self._stopping:
+                continue
+            logger.error(f"Inference worker {worker_id} exited with code {process.exitcode}, restarting")
+            self._restart_worker(worker_id, process, f"Inference worker {worker_id} crashed")
+
+    def _restart_worker(self, worker_id: int, process, reason: str) -> None:
+        """Kill ``process`` if it still runs, fail its tasks with ``reason`` and start a replacement.
+
+        Does nothing if the worker was already replaced (e.g. a timeout and a
+        crash noticed at the same time) or the pool is stopping.
+        """
+        with self._lock:
+            if self._stopping or self._processes[worker_id] is not process:
+                return
+            # Out of rotation until the replacement is started
+            self._processes[worker_id] = None
+            lost = self._in_flight.pop(worker_id, set())
+            futures = [self._futures.pop(task_id, (None, None))[1] for task_id in lost]
+            self._ready_workers.discard(worker_id)
+            self._restarts += 1
+        if process.is_alive():
+            process.kill()
+            process.join(5.0)
+        for future in futures:
+            if future is not None and not future.done():
+                future.set_exception(RuntimeError(reason))
+        self._start_worker(worker_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get pool statistics."""
+        with self._lock:
+            return {
+                "workers": self.num_workers,
+                "started": self.started,
+                "torch_threads": self.torch_threads,
+                "alive": sum(1 for p in self._processes if p is not None and p.is_alive()),
+                "pids": [p.pid for p in self._processes if p is not None],
+                "in_flight": sum(len(tasks) for tasks in self._in_flight.values()),
+                "tasks_completed": self._tasks_completed,
+                "restarts": self._restarts
+            }
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Stop the worker processes."""
+        self._stopping = True
+        for task_queue in self._task_queues:
+            if task_queue is not None:
+                try:
+                    task_queue.put(None)
+                except Exception:
+                    pass
+        for process in self._processes:
+            if process is None:
+                continue
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        with self._lock:
+            pending = list(self._futures.values())
+            self._futures.clear()
+            self._in_flight.clear()
+            self._ready_workers.clear()
+        for _, future in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("Worker pool shut down"))
+        self.started = False
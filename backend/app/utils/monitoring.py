@@ -460,7 +460,7 @@ class PerformanceMonitor:
             logger.warning(f"Failed to collect resource metrics: {str(e)}")
 
     def record_inference(self, duration: float, model_name: str, batch_size: int = 1,
-                        text_length: Optional[int] = None):
+                        text_length: Optional[int] = None, stage: Optional[str] = None):
         """Record detailed model inference metrics.
         
         Args:
@@ -468,6 +468,7 @@ class PerformanceMonitor:
             model_name: Name of the model used.
             batch_size: Number of items in the batch.
             text_length: Length of processed text.
+            stage: Pipeline stage being timed (e.g. "preprocess", "inference").
         """
         metrics = {
             'duration_ms': duration * 1000,
@@ -483,6 +484,7 @@ class PerformanceMonitor:
             duration * 1000,  # Convert to milliseconds
             {
                 'model': model_name,
+                **({'stage': stage} if stage else {}),
                 **{f'meta_{k}': str(v) for k, v in metrics.items()}
             }
         )
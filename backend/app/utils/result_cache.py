@@ -0,0 +1,253 @@
+"""Content-addressed cache for analyzer results.
+
+Results are keyed on a hash of the preprocessed text, the model name and the
+analysis options. The first tier is an in-memory LRU bounded by entry count
+and TTL; an optional second tier persists entries on disk or in Redis so they
+survive restarts and are shared between workers.
+"""
+from typing import Any, Dict, Optional
+from collections import OrderedDict
+from pathlib import Path
+import copy
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Cache configuration
+RESULT_CACHE_SIZE = int(os.environ.get("ANALYZER_RESULT_CACHE_SIZE", 1024))  # 0 disables caching
+RESULT_CACHE_TTL = int(os.environ.get("ANALYZER_RESULT_CACHE_TTL", 3600))  # seconds
+RESULT_CACHE_TIER = os.environ.get("ANALYZER_RESULT_CACHE_TIER", "")  # "", "disk" or "redis"
+REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+
+
+class DiskCacheTier:
+    """Second-tier cache storing one JSON file per entry."""
+
+    def __init__(self, directory: Path):
+        """Initialize disk tier.
+
+        Args:
+            directory: Directory holding the cache files.
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get value from disk, dropping it if expired."""
+        path = self._path(key)
+        try:
+            with open(path, 'r') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("expires_at") and entry["expires_at"] < time.time():
+            self.delete(key)
+            return None
+        return entry.get("value")
+
+    def set(self, key: str, value: Any, expire_seconds: int = None) -> None:
+        """Write value to disk atomically."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {
+            "expires_at": time.time() + expire_seconds if expire_seconds else None,
+            "value": value
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except Exception:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def delete(self, key: str) -> None:
+        """Delete value from disk."""
+        try:
+            self._path(key).unlink()
+        except OSError:
+            pass
+
+
+class RedisCacheTier:
+    """Second-tier cache in Redis.
+
+    Uses the same JSON-with-expiry layout as ``RedisCache`` but with a
+    synchronous client, because analysis runs in worker threads.
+    """
+
+    def __init__(self, redis_client, prefix: str = "analysis_result:"):
+        """Initialize Redis tier.
+
+        Args:
+            redis_client: Synchronous ``redis.Redis`` client.
+            prefix: Key prefix for cache entries.
+        """
+        self.redis = redis_client
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get value from Redis."""
+        value = self.redis.get(self.prefix + key)
+        if value:
+            return json.loads(value)
+        return None
+
+    def set(self, key: str, value: Any, expire_seconds: int = None) -> None:
+        """Set value in Redis with optional expiration."""
+        serialized = json.dumps(value)
+        if expire_seconds:
+            self.redis.setex(self.prefix + key, expire_seconds, serialized)
+        else:
+            self.redis.set(self.prefix + key, serialized)
+
+    def delete(self, key: str) -> None:
+        """Delete value from Redis."""
+        self.redis.delete(self.prefix + key)
+
+
+class ResultCache:
+    """Two-tier LRU + TTL cache for analysis results."""
+
+    def __init__(self, max_entries: int = RESULT_CACHE_SIZE, ttl_seconds: int = RESULT_CACHE_TTL,
+                 second_tier: Optional[Any] = None):
+        """Initialize result cache.
+
+        Args:
+            max_entries: Maximum number of entries kept in memory.
+            ttl_seconds: Time to live for each entry in seconds.
+            second_tier: Optional object with get/set/delete (DiskCacheTier, RedisCacheTier).
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.second_tier = second_tier
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.second_tier_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def make_key(processed_text: str, model_name: str, options: Optional[Dict[str, Any]] = None) -> str:
+        """Build the cache key for a text, model and option set."""
+        payload = json.dumps(
+            {"model": model_name, "options": options or {}},
+            sort_keys=True, default=str
+        )
+        digest = hashlib.sha256()
+        digest.update(payload.encode("utf-8"))
+        digest.update(b"\x00")
+        digest.update(processed_text.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Get a copy of a cached result, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return copy.deepcopy(value)
+                del self._entries[key]
+                self.expirations += 1
+
+        if self.second_tier is not None:
+            try:
+                value = self.second_tier.get(key)
+            except Exception as e:
+                logger.warning(f"Result cache second tier read failed: {str(e)}")
+                value = None
+            if value is not None:
+                with self._lock:
+                    self.second_tier_hits += 1
+                    self._store(key, value, now)
+                return copy.deepcopy(value)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, value: Dict) -> None:
+        """Store a copy of a result in every tier."""
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._store(key, value, time.time())
+
+        if self.second_tier is not None:
+            try:
+                self.second_tier.set(key, value, self.ttl_seconds)
+            except Exception as e:
+                logger.warning(f"Result cache second tier write failed: {str(e)}")
+
+    def _store(self, key: str, value: Dict, now: float) -> None:
+        """Insert into the memory tier, evicting least recently used entries. Caller holds the lock."""
+        self._entries[key] = (now + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all in-memory entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache counters."""
+        with self._lock:
+            lookups = self.hits + self.second_tier_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "second_tier": type(self.second_tier).__name__ if self.second_tier is not None else None,
+                "hits": self.hits,
+                "second_tier_hits": self.second_tier_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": ((self.hits + self.second_tier_hits) / lookups) if lookups else 0.0
+            }
+
+
+def create_result_cache(cache_dir: Path) -> Optional[ResultCache]:
+    """Create the result cache from environment configuration.
+
+    Args:
+        cache_dir: Analyzer cache directory, used by the disk tier.
+
+    Returns:
+        ResultCache instance, or None when caching is disabled.
+    """
+    if RESULT_CACHE_SIZE <= 0:
+        return None
+
+    second_tier = None
+    if RESULT_CACHE_TIER == "disk":
+        second_tier = DiskCacheTier(Path(cache_dir) / "results")
+    elif RESULT_CACHE_TIER == "redis":
+        try:
+            import redis
+            second_tier = RedisCacheTier(redis.from_url(REDIS_URL))
+        except Exception as e:
+            logger.warning(f"Redis result cache tier unavailable, using memory only: {str(e)}")
+
+    return ResultCache(RESULT_CACHE_SIZE, RESULT_CACHE_TTL, second_tier)
@@ -2,7 +2,8 @@ from apscheduler.schedulers.background import BackgroundScheduler
 from sqlalchemy.orm import Session
 from app.models.user import User
 from app.utils.database import SessionLocal
-from datetime import datetime, UTC
+from app.utils.user_cache import user_cache
+from datetime import datetime, timedelta, UTC
 import logging
 
 logger = logging.getLogger(__name__)
@@ -23,6 +24,7 @@ def refresh_monthly_balances():
                 user.last_refresh_date = now
                 logger.info(f"Refreshed monthly balance for user {user.email}")
         db.commit()
+        user_cache.clear()
     except Exception as e:
         logger.error(f"Error refreshing monthly balances: {e}")
     finally:
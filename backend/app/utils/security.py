@@ -7,6 +7,7 @@ from datetime import datetime, timedelta, UTC
 import logging
 import secrets
 from .memory_rate_limiter import MemoryRateLimiter
+from .token_blacklist import token_blacklist
 
 logger = logging.getLogger(__name__)
 
@@ -87,27 +88,20 @@ def decode_token(token: str, verify_type: str = "access") -> dict:
         if payload.get("type") != verify_type:
             raise ValueError(f"Invalid token type. Expected {verify_type}")
         
-        # Check if token is blacklisted
-        from ..models.blacklisted_token import BlacklistedToken
-        from ..utils.database import SessionLocal
-        
-        db = SessionLocal()
-        try:
-            if BlacklistedToken.is_blacklisted(db, token):
-                raise ValueError("Token has been invalidated")
-                
-            # Additional security checks
-            if "jti" not in payload:
-                raise ValueError("Token missing required claims")
-            
-            # Verify token is not used before its issued time
-            iat = datetime.fromtimestamp(payload["iat"], UTC)
-            if datetime.now(UTC) < iat:
-                raise ValueError("Token used before issued time")
-                
-            return payload
-        finally:
-            db.close()
+        # Additional security checks
+        if "jti" not in payload:
+            raise ValueError("Token missing required claims")
+
+        # Check if token is blacklisted (in memory; see token_blacklist)
+        if token_blacklist.is_revoked(payload["jti"], token):
+            raise ValueError("Token has been invalidated")
+
+        # Verify token is not used before its issued time
+        iat = datetime.fromtimestamp(payload["iat"], UTC)
+        if datetime.now(UTC) < iat:
+            raise ValueError("Token used before issued time")
+
+        return payload
     except jwt.ExpiredSignatureError:
         raise ValueError("Token has expired")
     except jwt.InvalidTokenError as e:
@@ -0,0 +1,176 @@
+"""Single-pass stylometric feature extraction.
+
+The text is tokenized once into words and sentences, and the per-sentence
+statistics used by the analyzer's indicators are held in NumPy arrays so
+every indicator is computed from the same shared structure.
+"""
+from typing import Dict
+from collections import Counter
+from dataclasses import dataclass
+import numpy as np
+from .text_patterns import scan_marks
+
+
+@dataclass
+class StyleFeatures:
+    """Word and sentence statistics shared by all style indicators."""
+    word_count: int
+    unique_words: int
+    unique_words_lower: int
+    word_frequencies: np.ndarray
+    bigram_frequencies: np.ndarray
+    sentence_lengths: np.ndarray
+    title_counts: np.ndarray
+    punctuation_counts: np.ndarray
+    tone_counts: np.ndarray
+    distinct_starts: int
+    exclamations: int
+    questions: int
+    ellipses: int
+    quotes: int
+
+    @classmethod
+    def from_text(cls, text: str) -> "StyleFeatures":
+        """Tokenize text once and collect all indicator inputs.
+
+        Sentences are the non-empty segments between '.' characters and words
+        are whitespace-separated tokens, matching the original indicators.
+
+        Args:
+            text: Preprocessed text.
+
+        Returns:
+            StyleFeatures for the text.
+        """
+        words = text.split()
+        word_counts = Counter(words)
+
+        # Encode words as integer ids so bigrams can be counted as int64 pairs
+        vocabulary = {word: index for index, word in enumerate(word_counts)}
+        word_ids = np.fromiter(map(vocabulary.__getitem__, words), dtype=np.int64, count=len(words))
+        bigram_ids = word_ids[:-1] * len(vocabulary) + word_ids[1:]
+        _, bigram_frequencies = np.unique(bigram_ids, return_counts=True)
+
+        # Per-sentence and total punctuation come from one scan of the text
+        marks = scan_marks(text)
+        lengths = []
+        titles = []
+        kept = []
+        starts = set()
+        for index, sentence in enumerate(text.split('.')):
+            sentence_words = sentence.split()
+            if not sentence_words:
+                continue
+            kept.append(index)
+            lengths.append(len(sentence_words))
+            titles.append(sum(map(str.istitle, sentence_words)))
+            starts.add(sentence_words[0].lower())
+
+        kept = np.array(kept, dtype=np.int64)
+        exclaim = marks.segments['!'][kept]
+        question = marks.segments['?'][kept]
+        # Sentences are split on '.', so only ',', '!', '?' and ';' can remain
+        punctuation = marks.segments[','][kept] + exclaim + question + marks.segments[';'][kept]
+
+        return cls(
+            word_count=len(words),
+            unique_words=len(word_counts),
+            unique_words_lower=len(set(map(str.lower, word_counts))),
+            word_frequencies=np.fromiter(word_counts.values(), dtype=np.int64, count=len(word_counts)),
+            bigram_frequencies=bigram_frequencies,
+            sentence_lengths=np.array(lengths, dtype=np.int64),
+            title_counts=np.array(titles, dtype=np.int64),
+            punctuation_counts=punctuation,
+            tone_counts=exclaim + question,
+            distinct_starts=len(starts),
+            exclamations=marks.totals['!'],
+            questions=marks.totals['?'],
+            ellipses=text.count('...'),
+            quotes=marks.totals['"'] + marks.totals["'"]
+        )
+
+    @property
+    def sentence_count(self) -> int:
+        return len(self.sentence_lengths)
+
+    def pattern_complexity(self) -> float:
+        """Pattern complexity score (0-1) from sentence length and structure variation."""
+        if not self.sentence_count:
+            return 0.0
+
+        # Calculate sentence length variation
+        length_variation = np.std(self.sentence_lengths) if self.sentence_count > 1 else 0
+
+        # Structure is the (word count, title-case count) pair of each sentence
+        structures = self.sentence_lengths * (int(self.title_counts.max()) + 1) + self.title_counts
+        structure_variation = len(np.unique(structures)) / self.sentence_count
+
+        complexity_score = (length_variation / 10 + structure_variation) / 2
+        return float(min(1.0, complexity_score))
+
+    def language_naturalness(self) -> float:
+        """Language naturalness score (0-1) from vocabulary and word frequency spread."""
+        if not self.word_count:
+            return 0.0
+
+        vocab_diversity = self.unique_words / self.word_count
+        freq_variation = np.std(self.word_frequencies)
+
+        naturalness_score = (vocab_diversity + min(1.0, freq_variation / 5)) / 2
+        return float(min(1.0, naturalness_score))
+
+    def style_consistency(self) -> float:
+        """Style consistency score (0-1) from sentence openings and punctuation."""
+        if not self.sentence_count:
+            return 0.0
+
+        start_diversity = self.distinct_starts / self.sentence_count
+        punct_consistency = 1.0 - (np.std(self.punctuation_counts) / max(int(self.punctuation_counts.max()), 1))
+        return float((start_diversity + punct_consistency) / 2)
+
+    def sentence_variation(self) -> float:
+        """Standard deviation of sentence lengths."""
+        if not self.sentence_count:
+            return 0.0
+        return float(np.std(self.sentence_lengths))
+
+    def repetitive_patterns(self) -> Dict:
+        """Repeated word bigram statistics."""
+        return {
+            "repeatedPhrases": int(np.count_nonzero(self.bigram_frequencies > 1)),
+            "maxRepetition": int(self.bigram_frequencies.max()) if self.bigram_frequencies.size else 0
+        }
+
+    def vocabulary_diversity(self) -> Dict:
+        """Case-insensitive vocabulary diversity metrics."""
+        return {
+            "uniqueWords": self.unique_words_lower,
+            "totalWords": self.word_count,
+            "diversity": round(self.unique_words_lower / max(self.word_count, 1), 3)
+        }
+
+    def sentence_complexity(self) -> Dict:
+        """Average, longest and shortest sentence length in words."""
+        if not self.sentence_count:
+            return {"average": 0, "max": 0, "min": 0}
+        return {
+            "average": float(round(np.mean(self.sentence_lengths), 2)),
+            "max": int(self.sentence_lengths.max()),
+            "min": int(self.sentence_lengths.min())
+        }
+
+    def tone_consistency(self) -> float:
+        """Consistency of '!' and '?' usage per word across sentences."""
+        if not self.sentence_count:
+            return 0.0
+        tone_markers = self.tone_counts / np.maximum(self.sentence_lengths, 1)
+        return float(1.0 - min(1.0, np.std(tone_markers)))
+
+    def style_patterns(self) -> Dict:
+        """Counts of common style markers."""
+        return {
+            "exclamations": self.exclamations,
+            "questions": self.questions,
+            "ellipsis": self.ellipses,
+            "quotations": self.quotes // 2
+        }
@@ -0,0 +1,98 @@
+"""Precompiled text patterns shared by preprocessing, validation and metrics.
+
+Every regular expression used on the per-request path is compiled once
+here instead of being looked up by its source string on each call. Counts of
+single punctuation marks come from ``scan_marks``, which reads the text
+once through a NumPy byte lookup table rather than scanning it per mark.
+"""
+from typing import Dict, Iterable
+from dataclasses import dataclass
+import re
+import numpy as np
+
+# AIContentAnalyzer.preprocess_text
+URL = re.compile(r'http\S+|www.\S+')
+EMAIL = re.compile(r'\S+@\S+')
+SPECIAL_CHARACTERS = re.compile(r'[^\w\s.,!?-]')
+
+# InputValidator
+CONTROL_CHARACTERS = re.compile(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]')
+SCRIPT_INJECTION = re.compile(r'javascript:|data:|vbscript:|onload=|onerror=', re.IGNORECASE)
+LANGUAGE_CODE = re.compile(r'^[a-z]{2}(-[A-Z]{2})?$')
+UNSAFE_FILENAME_CHARACTERS = re.compile(r'[/\\:\x00]')
+
+# LanguageDetector language metrics
+SENTENCE_TERMINATORS = re.compile(r'[.!?]+')
+ENGLISH_CONTRACTION = re.compile(r"\w+'(?:s|t|ve|ll|re|d)\b")
+FRENCH_ARTICLE = re.compile(r'\b(le|la|les|un|une|des)\b')
+SPANISH_ARTICLE = re.compile(r'\b(el|la|los|las|un|una|unos|unas)\b')
+FRENCH_ACCENTS = 'éèêëàâäôöûüçîïù'
+GERMAN_UMLAUTS = 'äöüß'
+SPANISH_INVERTED_PUNCTUATION = '¡¿'
+
+# Style markers and per-sentence punctuation counted by StyleFeatures
+STYLE_MARKS = '!?,;"\''
+
+
+def collapse_whitespace(text: str) -> str:
+    """Strip the text and replace every whitespace run with a single space.
+
+    Equivalent to ``re.sub(r'\\s+', ' ', text.strip())``; ``str.split`` uses
+    the same definition of whitespace and runs without the regex engine.
+    """
+    return ' '.join(text.split())
+
+
+def count_characters(text: str, characters: Iterable[str]) -> int:
+    """Total occurrences of any of ``characters`` in ``text``."""
+    return sum(text.count(character) for character in characters)
+
+
+@dataclass
+class MarkCounts:
+    """Occurrences of single-character marks in a text and in its segments."""
+    totals: Dict[str, int]
+    segments: Dict[str, np.ndarray]
+
+
+def scan_marks(text: str, marks: str = STYLE_MARKS, separator: str = '.') -> MarkCounts:
+    """Count ASCII ``marks`` in one pass over the text.
+
+    The UTF-8 bytes are mapped through a 256-entry lookup table in a single
+    NumPy pass; ASCII bytes never occur inside multi-byte sequences, so every
+    hit is a real mark or separator. Only the hits are then binned by the
+    segment (between ``separator`` characters) they fall in, in the same
+    order as ``text.split(separator)``.
+
+    Args:
+        text: Text to scan.
+        marks: ASCII characters to count.
+        separator: ASCII character delimiting segments.
+
+    Returns:
+        MarkCounts with per-mark totals and per-segment count arrays.
+    """
+    if not (marks + separator).isascii():
+        raise ValueError("scan_marks only counts ASCII characters")
+    table = np.zeros(256, dtype=np.uint8)
+    for code, mark in enumerate(marks, 1):
+        table[ord(mark)] = code
+    separator_code = len(marks) + 1
+    table[ord(separator)] = separator_code
+
+    codes = table[np.frombuffer(text.encode('utf-8', 'surrogatepass'), dtype=np.uint8)]
+    hits = codes[np.flatnonzero(codes)]
+    is_separator = hits == separator_code
+    # Number of separators seen so far is the segment index of each hit
+    segment = np.cumsum(is_separator)
+    segment_count = int(segment[-1]) + 1 if segment.size else 1
+    is_mark = ~is_separator
+    counts = np.bincount(
+        segment[is_mark] * len(marks) + hits[is_mark].astype(np.int64) - 1,
+        minlength=segment_count * len(marks)
+    ).reshape(segment_count, len(marks))
+
+    return MarkCounts(
+        totals={mark: int(total) for mark, total in zip(marks, counts.sum(axis=0))},
+        segments={mark: counts[:, index] for index, mark in enumerate(marks)}
+    )
@@ -0,0 +1,157 @@
+"""In-memory view of the revoked-token table for per-request token checks.
+
+Every authenticated request used to open a session and look its whole JWT up
+in ``blacklisted_tokens``. ``TokenBlacklist`` keeps the ``jti`` of every
+revoked token that has not expired yet in a dict, so the check is a dict
+lookup. The dict is synced incrementally: at most every
+TOKEN_BLACKLIST_REFRESH_SECONDS a request fetches the rows created since the
+last sync (minus a small overlap for transactions that committed late), and
+entries are dropped once their token expires, since an expired token is
+rejected by its signature check anyway. Logouts in this process are added at
+once; revocations from other processes are seen after the next sync. If the
+database cannot be read, tokens are checked against it one by one as before.
+"""
+from typing import Any, Dict, Optional
+from datetime import datetime, timedelta
+import logging
+import os
+import threading
+import time
+
+import jwt
+
+logger = logging.getLogger(__name__)
+
+# Blacklist configuration
+TOKEN_BLACKLIST_REFRESH_SECONDS = float(os.environ.get("TOKEN_BLACKLIST_REFRESH_SECONDS", 5))  # max staleness across processes
+TOKEN_BLACKLIST_SYNC_OVERLAP = timedelta(seconds=30)  # rows are re-read this far back in case they committed late
+
+
+def _token_claims(token: str) -> Dict[str, Any]:
+    """Claims of a stored token; it was verified when it was revoked."""
+    return jwt.decode(token, options={"verify_signature": False})
+
+
+class TokenBlacklist:
+    """Revoked token IDs, synced from ``blacklisted_tokens``."""
+
+    def __init__(self, session_factory=None, refresh_seconds: float = TOKEN_BLACKLIST_REFRESH_SECONDS):
+        """Initialize the blacklist. Nothing is loaded until the first check.
+
+        Args:
+            session_factory: Callable returning a SQLAlchemy session; defaults to SessionLocal.
+            refresh_seconds: Seconds between syncs with the database.
+        """
+        self.session_factory = session_factory
+        self.refresh_seconds = refresh_seconds
+        self._revoked: Dict[str, float] = {}  # jti -> expiry (epoch seconds)
+        self._watermark: Optional[datetime] = None  # newest created_at seen
+        self._synced_at = 0.0
+        self._lock = threading.Lock()
+        self._syncs = 0
+        self._sync_errors = 0
+        self._fallback_checks = 0
+
+    def _session(self):
+        if self.session_factory is None:
+            from .database import SessionLocal
+            self.session_factory = SessionLocal
+        return self.session_factory()
+
+    def add(self, jti: str, expires_at: float) -> None:
+        """Record a token revoked by this process, without waiting for a sync."""
+        with self._lock:
+            self._revoked[jti] = expires_at
+
+    def is_revoked(self, jti: str, token: str) -> bool:
+        """Whether the token with ID ``jti`` has been revoked.
+
+        Args:
+            jti: Token ID claim.
+            token: Encoded token, used for the per-token query when the
+                blacklist could not be synced.
+        """
+        if not self._sync():
+            self._fallback_checks += 1
+            return self._check_database(token)
+        expires_at = self._revoked.get(jti)
+        return expires_at is not None and expires_at > time.time()
+
+    def _sync(self) -> bool:
+        """Bring the blacklist up to date if it is due; False if it never loaded."""
+        if time.monotonic() - self._synced_at < self.refresh_seconds:
+            return True
+        loaded = self._synced_at > 0
+        # One request syncs; the others use the current entries, unless there are none yet
+        if not self._lock.acquire(blocking=not loaded):
+            return True
+        try:
+            if time.monotonic() - self._synced_at < self.refresh_seconds:
+                return True
+            try:
+                self._load()
+            except Exception as e:
+                self._sync_errors += 1
+                logger.error(f"Token blacklist sync failed: {e}")
+                return loaded
+            self._synced_at = time.monotonic()
+            self._syncs += 1
+            return True
+        finally:
+            self._lock.release()
+
+    def _load(self) -> None:
+        """Fetch rows created since the last sync and drop expired entries; holds ``self._lock``."""
+        from ..models.blacklisted_token import BlacklistedToken
+
+        db = self._session()
+        try:
+            query = db.query(BlacklistedToken.token, BlacklistedToken.created_at)
+            if self._watermark is None:
+                query = query.filter(BlacklistedToken.expires_at > datetime.utcnow() - timedelta(days=1))
+            else:
+                query = query.filter(BlacklistedToken.created_at >= self._watermark - TOKEN_BLACKLIST_SYNC_OVERLAP)
+            rows = query.all()
+        finally:
+            db.close()
+
+        for token, created_at in rows:
+            try:
+                claims = _token_claims(token)
+            except jwt.InvalidTokenError:
+                continue
+            if "jti" in claims:
+                self._revoked[claims["jti"]] = float(claims.get("exp", float("inf")))
+            if created_at is not None and (self._watermark is None or created_at > self._watermark):
+                self._watermark = created_at
+        if self._watermark is None:
+            # Empty table: later syncs only need rows created from now on
+            self._watermark = datetime.utcnow()
+
+        now = time.time()
+        for jti in [jti for jti, expires_at in self._revoked.items() if expires_at <= now]:
+            del self._revoked[jti]
+
+    def _check_database(self, token: str) -> bool:
+        """Look a single token up in the database."""
+        from ..models.blacklisted_token import BlacklistedToken
+
+        db = self._session()
+        try:
+            return BlacklistedToken.is_blacklisted(db, token)
+        finally:
+            db.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get blacklist statistics."""
+        return {
+            "revoked": len(self._revoked),
+            "refresh_seconds": self.refresh_seconds,
+            "syncs": self._syncs,
+            "sync_errors": self._sync_errors,
+            "fallback_checks": self._fallback_checks,
+            "watermark": self._watermark.isoformat() if self._watermark else None
+        }
+
+
+token_blacklist = TokenBlacklist()
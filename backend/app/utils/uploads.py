@@ -0,0 +1,146 @@
+"""Upload handling that never holds a whole request body in memory.
+
+``UploadLimitMiddleware`` counts the body bytes of upload requests as they
+arrive and answers 413 as soon as a path goes over its limit (at once when
+Content-Length already says so), before the multipart parser has buffered
+the body. The parser spools every file to a temporary file past
+UPLOAD_SPOOL_MAX_BYTES; ``inspect_upload`` then measures the spooled file and
+reads only its first few KB for MIME sniffing, and ``as_buffer`` exposes it as
+a memoryview (of the in-memory buffer, or an mmap of the temporary file) for
+consumers that need bytes, such as the extraction pool, for the duration of a
+``with`` block.
+"""
+from contextlib import contextmanager
+from typing import BinaryIO, Dict, Iterator, Tuple, Union
+import io
+import json
+import logging
+import mmap
+import os
+
+from starlette.datastructures import UploadFile
+
+logger = logging.getLogger(__name__)
+
+# Upload configuration
+UPLOAD_SPOOL_MAX_BYTES = int(os.environ.get("UPLOAD_SPOOL_MAX_BYTES", 1024 * 1024))  # kept in memory below this
+UPLOAD_SNIFF_BYTES = 4096  # enough for libmagic to tell a DOCX from a plain ZIP
+UPLOAD_MULTIPART_OVERHEAD = 64 * 1024  # form fields and part headers around the file
+BATCH_MAX_BODY_BYTES = int(float(os.environ.get("ANALYZE_BATCH_MAX_BODY_MB", 100)) * 1024 * 1024)  # whole batch request
+
+
+def set_spool_threshold(max_bytes: int = UPLOAD_SPOOL_MAX_BYTES) -> None:
+    """Size at which the multipart parser moves an uploaded file from memory to disk."""
+    UploadFile.spool_max_size = max_bytes
+
+
+class UploadLimitMiddleware:
+    """ASGI middleware rejecting oversized request bodies while they stream in."""
+
+    def __init__(self, app, limits: Dict[str, int]):
+        """Initialize the middleware.
+
+        Args:
+            app: ASGI application.
+            limits: Maximum body size in bytes per request path (POST only).
+        """
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope, receive, send):
+        limit = self.limits.get(scope.get("path")) if scope["type"] == "http" and scope.get("method") == "POST" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        declared = headers.get(b"content-length")
+        if declared is not None and declared.isdigit() and int(declared) > limit:
+            await self._reject(send, limit)
+            return
+
+        received = 0
+        rejected = False
+
+        async def limited_receive():
+            nonlocal received, rejected
+            if rejected:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    rejected = True
+                    await self._reject(send, limit)
+                    # The app sees a client that went away and stops reading
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message):
+            # Whatever the app answers after the 413 has nowhere to go
+            if not rejected:
+                await send(message)
+
+        await self.app(scope, limited_receive, guarded_send)
+
+    @staticmethod
+    async def _reject(send, limit: int) -> None:
+        body = json.dumps({"detail": f"Request body too large (maximum {limit} bytes)"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()),
+                        (b"connection", b"close")]
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+def inspect_upload(upload: UploadFile, sniff_bytes: int = UPLOAD_SNIFF_BYTES) -> Tuple[int, bytes]:
+    """Size of an uploaded file and its first ``sniff_bytes`` bytes, without reading the rest.
+
+    Args:
+        upload: Parsed upload; its file is left positioned at the start.
+
+    Returns:
+        (size in bytes, head of the file).
+    """
+    handle = upload.file
+    handle.seek(0, os.SEEK_END)
+    size = handle.tell()
+    handle.seek(0)
+    head = handle.read(sniff_bytes)
+    handle.seek(0)
+    return size, head
+
+
+@contextmanager
+def as_buffer(content: Union[bytes, bytearray, memoryview, BinaryIO]) -> Iterator[Union[bytes, bytearray, memoryview]]:
+    """Contents of bytes or a (spooled) file as a buffer, without copying where possible.
+
+    An in-memory spool is exposed through ``BytesIO.getbuffer()`` and a file
+    on disk through a read-only mmap; other file objects are read. The view
+    is released and the mmap closed when the ``with`` block exits, so the
+    buffer must not be kept past it (copy what has to outlive it).
+    """
+    if isinstance(content, (bytes, bytearray, memoryview)):
+        yield content
+        return
+    raw = getattr(content, "_file", content)  # SpooledTemporaryFile wraps a BytesIO or a real file
+    mapped = None
+    if isinstance(raw, io.BytesIO):
+        view = raw.getbuffer()
+    else:
+        try:
+            mapped = mmap.mmap(raw.fileno(), 0, access=mmap.ACCESS_READ)
+        except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+            # No file descriptor, or an empty file (which cannot be mapped)
+            content.seek(0)
+            yield content.read()
+            return
+        view = memoryview(mapped)
+    try:
+        yield view
+    finally:
+        view.release()
+        if mapped is not None:
+            mapped.close()
@@ -0,0 +1,142 @@
+"""Short-lived per-process cache of authenticated users.
+
+``get_current_user`` runs on every authenticated request. ``UserCache`` keeps
+a snapshot of each user's columns (balances, type, active flag, ...) for
+USER_CACHE_TTL_SECONDS, and a hit is turned back into a ``User`` attached to
+the request's session without a query, so endpoints can still read, lazy-load
+relationships and update it as before. Code that changes a user in this
+process (transactions, charges, webhooks, the monthly refresh) invalidates
+its entry after committing; changes from other processes are seen once the
+entry expires. Anything that moves a balance must still re-read the row under
+``with_for_update`` rather than trust a cached snapshot.
+"""
+from typing import Any, Dict, Optional, Tuple
+import os
+import threading
+import time
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+# Cache configuration
+USER_CACHE_TTL_SECONDS = float(os.environ.get("USER_CACHE_TTL_SECONDS", 5))  # 0 disables the cache
+USER_CACHE_MAX_ENTRIES = int(os.environ.get("USER_CACHE_MAX_ENTRIES", 10000))
+
+
+class UserCache:
+    """User column snapshots keyed on user ID, each valid for ``ttl`` seconds."""
+
+    def __init__(self, ttl: float = USER_CACHE_TTL_SECONDS, max_entries: int = USER_CACHE_MAX_ENTRIES):
+        """Initialize the cache.
+
+        Args:
+            ttl: Seconds a snapshot is served; 0 disables the cache.
+            max_entries: Snapshots kept; expired ones are dropped first, then the oldest.
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def get(self, user_id: str, db):
+        """Cached user attached to ``db``, or None if there is no fresh snapshot.
+
+        Args:
+            user_id: ID of the user.
+            db: Session the returned user is added to, as if it had been queried there.
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] <= time.monotonic():
+                self._misses += 1
+                return None
+            self._hits += 1
+            snapshot = entry[1]
+        return self.attach(snapshot, db)
+
+    @classmethod
+    def attach(cls, snapshot: Dict[str, Any], db):
+        """Turn a column snapshot into a ``User`` attached to ``db`` without a query.
+
+        Args:
+            snapshot: Column values, as returned by ``snapshot``.
+            db: Session the returned user is added to, as if it had been queried there.
+        """
+        user_class = cls._user_class()
+        existing = db.identity_map.get(db.identity_key(user_class, snapshot["id"]))
+        if existing is not None:
+            return existing
+        user = user_class(**snapshot)
+        # Persistent as if just loaded: no pending changes, later updates are flushed normally
+        make_transient_to_detached(user)
+        db.add(user)
+        return user
+
+    @staticmethod
+    def snapshot(user) -> Dict[str, Any]:
+        """Column values of a loaded user."""
+        return {attr.key: getattr(user, attr.key) for attr in inspect(type(user)).column_attrs}
+
+    def put(self, user) -> None:
+        """Store a snapshot of a freshly loaded user."""
+        if not self.enabled:
+            return
+        snapshot = self.snapshot(user)
+        now = time.monotonic()
+        with self._lock:
+            if len(self._entries) >= self.max_entries and snapshot["id"] not in self._entries:
+                self._evict(now)
+            self._entries[snapshot["id"]] = (now + self.ttl, snapshot)
+
+    def invalidate(self, user_id: Optional[str]) -> None:
+        """Drop a user's snapshot after it has been changed."""
+        if user_id is None:
+            return
+        with self._lock:
+            if self._entries.pop(str(user_id), None) is not None:
+                self._invalidations += 1
+
+    def clear(self) -> None:
+        """Drop every snapshot, e.g. after a bulk update."""
+        with self._lock:
+            self._invalidations += len(self._entries)
+            self._entries.clear()
+
+    def _evict(self, now: float) -> None:
+        """Make room for one entry; the caller holds ``self._lock``."""
+        expired = [user_id for user_id, (expires, _) in self._entries.items() if expires <= now]
+        for user_id in expired:
+            del self._entries[user_id]
+        if len(self._entries) >= self.max_entries:
+            # Dicts keep insertion order, so the first entry is the oldest
+            del self._entries[next(iter(self._entries))]
+
+    @staticmethod
+    def _user_class():
+        from ..models.user import User
+        return User
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "ttl": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "invalidations": self._invalidations
+            }
+
+
+user_cache = UserCache()
@@ -1,10 +1,10 @@
 """Input validation and sanitization utilities."""
 from typing import Dict, Any, Optional, Union, Literal
-import re
 import os
 import magic
 import html
 from .exceptions import TextValidationError, ValidationError, FileValidationError
+from . import text_patterns as patterns
 
 class InputValidator:
     """Handles input validation and sanitization."""
@@ -52,14 +52,14 @@ class InputValidator:
             raise TextValidationError("Text cannot be empty", 0)
 
         # Remove null bytes and other control characters
-        text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', text)
+        text = patterns.CONTROL_CHARACTERS.sub('', text)
         # NOTE: do not strip trailing spaces to preserve exact text for paid tier tests
 
         # Basic XSS prevention
         text = html.escape(text)
         
         # Remove potentially malicious patterns
-        text = re.sub(r'javascript:|data:|vbscript:|onload=|onerror=', '', text, flags=re.IGNORECASE)
+        text = patterns.SCRIPT_INJECTION.sub('', text)
         
         # Check length constraints
         text_length = len(text)
@@ -196,10 +196,20 @@ class InputValidator:
                 )
             valid_options['return_raw_scores'] = options['return_raw_scores']
         
+        # Validate sliding_window
+        if 'sliding_window' in options:
+            if not isinstance(options['sliding_window'], bool):
+                raise ValidationError(
+                    "sliding_window must be a boolean",
+                    "sliding_window",
+                    options['sliding_window']
+                )
+            valid_options['sliding_window'] = options['sliding_window']
+        
         # Validate language code
         if 'lang_code' in options:
             lang_code = options['lang_code']
-            if not isinstance(lang_code, str) or not re.match(r'^[a-z]{2}(-[A-Z]{2})?$', lang_code):
+            if not isinstance(lang_code, str) or not patterns.LANGUAGE_CODE.match(lang_code):
                 raise ValidationError(
                     "Invalid language code format",
                     "lang_code",
@@ -220,6 +230,6 @@ class InputValidator:
             Sanitized filename.
         """
         # Remove path separators and null bytes
-        filename = re.sub(r'[/\\:\x00]', '', filename)
+        filename = patterns.UNSAFE_FILENAME_CHARACTERS.sub('', filename)
         # Limit length
         return filename[:255]
\ No newline at end of file
@@ -0,0 +1,133 @@
+"""Latency under concurrency of the async session path against the sync one.
+
+Sends concurrent ``/api/auth/me``, ``/api/shobeis/balance`` and
+``/api/analytics/user/{id}`` requests through the ASGI app and reports p50,
+p99 and throughput twice: with ``get_async_db`` as configured (an
+``AsyncSession`` on aiosqlite/asyncpg when installed, otherwise a
+``ThreadedSession``), and with the endpoints' database work run inline on
+the event loop, as it was with the plain ``get_db`` session. The user cache
+is disabled so every request loads its user.
+
+``--db-latency-ms`` adds a sleep to each statement on the sync engine to
+stand in for the round trip to a database server. It does not apply to an
+async driver; point DATABASE_URL at a PostgreSQL server to measure that.
+The sync path keeps a connection for the whole request and waits for the
+pool on the event loop, so keep ``--concurrency`` below DB_POOL_SIZE +
+DB_MAX_OVERFLOW or it stalls for DB_POOL_TIMEOUT.
+
+Usage:
+    python benchmarks/bench_async_db.py [--requests 400] [--concurrency 12] [--db-latency-ms 2]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+
+import httpx
+from fastapi import Depends
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.main import app
+from app.models.user import User
+from app.utils import database
+from app.utils.database import SessionLocal, get_async_db, get_db, init_db
+from app.utils.security import create_access_token
+from app.utils.user_cache import user_cache
+
+
+class InlineSession:
+    """The sync path: ``run_sync`` runs on the event loop thread."""
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return fn(self.sync_session, *args, **kwargs)
+
+
+def inline_db(db: Session = Depends(get_db)):
+    yield InlineSession(db)
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+async def run_load(user_id: str, requests: int, concurrency: int) -> Dict[str, float]:
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': user_id})}"}
+    paths = ["/api/auth/me", "/api/shobeis/balance", f"/api/analytics/user/{user_id}"]
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def one(i: int) -> None:
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(paths[i % len(paths)], headers=headers)
+                latencies.append((time.perf_counter() - start) * 1000)
+                response.raise_for_status()
+
+        # Warm up connections and lazy imports before timing
+        await asyncio.gather(*(one(i) for i in range(len(paths))))
+        latencies.clear()
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "p50": percentile(latencies, 0.50),
+        "p99": percentile(latencies, 0.99),
+        "rps": requests / elapsed
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=400, help="Timed requests, spread over the three paths")
+    parser.add_argument("--concurrency", type=int, default=12, help="Requests in flight at once")
+    parser.add_argument("--db-latency-ms", type=float, default=2.0,
+                        help="Simulated round trip added to each statement on the sync engine")
+    args = parser.parse_args()
+
+    init_db()
+    db = SessionLocal()
+    user = User(email=f"bench-{time.time_ns()}@example.com", password_hash="x", shobeis_balance=1000)
+    db.add(user)
+    db.commit()
+    user_id = user.id
+    db.close()
+    user_cache.ttl = 0
+
+    if args.db_latency_ms > 0:
+        delay = args.db_latency_ms / 1000
+
+        @event.listens_for(database.engine, "before_cursor_execute")
+        def simulate_round_trip(conn, cursor, statement, parameters, context, executemany):
+            time.sleep(delay)
+
+    async_path = "AsyncSession" if database.get_async_sessionmaker() is not None else "ThreadedSession"
+    print(f"database: {database.engine.url.get_backend_name()}, async path: {async_path}, "
+          f"{args.requests} requests, concurrency {args.concurrency}, db latency {args.db_latency_ms} ms")
+
+    app.dependency_overrides[get_async_db] = inline_db
+    sync = asyncio.run(run_load(user_id, args.requests, args.concurrency))
+    app.dependency_overrides.pop(get_async_db)
+    concurrent = asyncio.run(run_load(user_id, args.requests, args.concurrency))
+
+    print(f"{'':6} {'p50 ms':>8} {'p99 ms':>8} {'req/s':>8}")
+    for name, run in (("sync", sync), ("async", concurrent)):
+        print(f"{name:6} {run['p50']:>8.2f} {run['p99']:>8.2f} {run['rps']:>8.1f}")
+    print(f"p99 speedup: {sync['p99'] / concurrent['p99']:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""Accuracy and latency of the language-detection fast path.
+
+Builds documents of increasing length in every language of the
+multilingual sample set by shuffling that language's sentences, then
+compares ``LanguageDetector.detect_language`` (sampled, memoized) with a
+full-text ``detect_langs`` call on the same documents. Reports accuracy
+against the labels, agreement between the two paths and mean latency,
+including a memoized repeat call.
+
+Usage:
+    python benchmarks/bench_language_detection.py [--sizes 2000,50000,200000]
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.language_detector import LanguageDetector
+
+SAMPLES_PATH = Path(__file__).parent / "data" / "multilingual_samples.jsonl"
+
+
+def load_corpus(path: Path) -> Dict[str, List[str]]:
+    """Group the sample sentences by language label."""
+    corpus: Dict[str, List[str]] = {}
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                sentences = [s for s in re.split(r"(?<=[.!?。．])\s*", record["text"]) if s]
+                corpus.setdefault(record["lang"], []).extend(sentences)
+    return corpus
+
+
+def build_document(sentences: List[str], size: int, rng: random.Random) -> str:
+    """Concatenate shuffled sentences until the document reaches ``size`` characters."""
+    parts = []
+    length = 0
+    while length < size:
+        sentence = rng.choice(sentences)
+        parts.append(sentence)
+        length += len(sentence) + 1
+    return " ".join(parts)[:size]
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", type=Path, default=SAMPLES_PATH, help="Multilingual JSON lines sample set")
+    parser.add_argument("--sizes", default="2000,50000,200000", help="Comma-separated document sizes in characters")
+    parser.add_argument("--docs", type=int, default=3, help="Documents per language and size")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.samples)
+    rng = random.Random(0)
+    # langdetect loads its language profiles on first use; keep that out of the timings
+    LanguageDetector._detect_langs(next(iter(corpus.values()))[0])
+    print(f"languages: {', '.join(sorted(corpus))}")
+    print(f"{'chars':>8} {'docs':>5} {'full acc':>9} {'fast acc':>9} {'agree':>6} "
+          f"{'full ms':>9} {'fast ms':>9} {'memo ms':>8} {'speedup':>8}")
+
+    for size in (int(s) for s in args.sizes.split(",")):
+        documents = [(lang, build_document(sentences, size, rng))
+                     for lang, sentences in sorted(corpus.items()) for _ in range(args.docs)]
+        full_correct = fast_correct = agree = 0
+        full_ms = fast_ms = memo_ms = 0.0
+        for lang, text in documents:
+            LanguageDetector._detection_cache.clear()
+            (full_lang, _), full_time = timed(LanguageDetector._detect_langs, text)
+            characteristics = LanguageDetector.analyze_language_characteristics(text)
+            (fast_lang, _), fast_time = timed(LanguageDetector.detect_language, text, characteristics)
+            _, memo_time = timed(LanguageDetector.detect_language, text, characteristics)
+            full_correct += full_lang == lang
+            fast_correct += fast_lang == lang
+            agree += full_lang == fast_lang
+            full_ms += full_time
+            fast_ms += fast_time
+            memo_ms += memo_time
+
+        n = len(documents)
+        print(f"{size:>8} {n:>5} {full_correct / n:>9.3f} {fast_correct / n:>9.3f} {agree / n:>6.3f} "
+              f"{full_ms / n:>9.2f} {fast_ms / n:>9.2f} {memo_ms / n:>8.3f} {full_ms / fast_ms:>7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""Accuracy-regression check and latency benchmark for INT8 quantization.
+
+Loads the detector twice, once in fp32 and once with dynamic INT8
+quantization, scores the labelled sample set with both and reports accuracy,
+label agreement, the largest change in AI probability and per-text latency.
+Exits with status 1 when INT8 accuracy drops more than ``--max-accuracy-drop``
+below fp32, so it can gate a rollout.
+
+Usage:
+    python benchmarks/bench_quantization.py [--model NAME] [--repeat N]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.analyzer import AIContentAnalyzer
+
+SAMPLES_PATH = Path(__file__).parent / "data" / "labelled_samples.jsonl"
+
+
+def load_samples(path: Path) -> List[Dict]:
+    """Read {"text", "label"} records from a JSON lines file."""
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def load_analyzer(model_name: str, quantize: bool) -> AIContentAnalyzer:
+    """Load an eager analyzer with result caching disabled."""
+    analyzer = AIContentAnalyzer(model_name=model_name, quantize=quantize, backend="pytorch")
+    analyzer.result_cache = None
+    analyzer._load_model()
+    return analyzer
+
+
+def evaluate(analyzer: AIContentAnalyzer, samples: List[Dict], repeat: int) -> Dict:
+    """Score every sample ``repeat`` times and collect predictions and timings."""
+    predictions = []
+    probabilities = []
+    latencies = []
+    for sample in samples:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = analyzer.analyze_text(sample["text"])
+            latencies.append((time.perf_counter() - start) * 1000)
+        predictions.append(result["prediction"])
+        probabilities.append(result["analysisDetails"]["aiProbability"])
+    correct = sum(p == s["label"] for p, s in zip(predictions, samples))
+    latencies.sort()
+    return {
+        "predictions": predictions,
+        "probabilities": probabilities,
+        "accuracy": correct / len(samples),
+        "latency_ms_p50": latencies[len(latencies) // 2],
+        "latency_ms_mean": sum(latencies) / len(latencies)
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default="roberta-large-openai-detector", help="Model name or local path")
+    parser.add_argument("--samples", type=Path, default=SAMPLES_PATH, help="Labelled JSON lines sample set")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per sample")
+    parser.add_argument("--max-accuracy-drop", type=float, default=0.02,
+                        help="Largest tolerated fp32 - int8 accuracy difference")
+    args = parser.parse_args()
+
+    samples = load_samples(args.samples)
+    fp32 = evaluate(load_analyzer(args.model, quantize=False), samples, args.repeat)
+    int8 = evaluate(load_analyzer(args.model, quantize=True), samples, args.repeat)
+
+    agreement = sum(a == b for a, b in zip(fp32["predictions"], int8["predictions"])) / len(samples)
+    max_delta = max(abs(a - b) for a, b in zip(fp32["probabilities"], int8["probabilities"]))
+
+    print(f"samples: {len(samples)}")
+    print(f"{'':6} {'accuracy':>9} {'p50 ms':>8} {'mean ms':>8}")
+    for name, run in (("fp32", fp32), ("int8", int8)):
+        print(f"{name:6} {run['accuracy']:>9.3f} {run['latency_ms_p50']:>8.2f} {run['latency_ms_mean']:>8.2f}")
+    print(f"speedup (mean): {fp32['latency_ms_mean'] / int8['latency_ms_mean']:.2f}x")
+    print(f"label agreement: {agreement:.3f}, max aiProbability change: {max_delta:.2f} points")
+
+    if fp32["accuracy"] - int8["accuracy"] > args.max_accuracy_drop:
+        print("FAIL: INT8 accuracy regression exceeds the allowed drop")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
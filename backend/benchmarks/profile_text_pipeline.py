@@ -0,0 +1,184 @@
+"""Per-request profile of the regex-heavy text steps on large inputs.
+
+Times each text step a request goes through, using both the precompiled
+patterns from ``app.utils.text_patterns`` and the inline string patterns
+they replaced (kept below for reference). Checks that both produce the same
+output and reports the time saved per request. ``--cprofile`` also prints
+the hottest functions of the current pipeline.
+
+Usage:
+    python benchmarks/profile_text_pipeline.py [--chars 50000] [--repeat N] [--cprofile]
+"""
+import argparse
+import cProfile
+import html
+import os
+import pstats
+import random
+import re
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.analyzer import AIContentAnalyzer
+from app.utils.language_detector import LanguageDetector
+from app.utils.text_patterns import scan_marks
+from app.utils.validation import InputValidator
+
+WORDS = (
+    "the a of and to in is that it was for on are as with they at be this from have or by "
+    "don't it's we'll they're le la les une des el los unas café déjà über straße niño "
+    "Model Detector Research English Paris Monday Report"
+).split()
+EXTRAS = [".", ".", ",", ",", "!", "?", ";", "...", "\"", "'", " ¿", " https://example.com/page",
+          " someone@example.com", " <b>", " javascript:"]
+
+
+def legacy_validate(text: str) -> str:
+    text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', text)
+    text = html.escape(text)
+    text = re.sub(r'javascript:|data:|vbscript:|onload=|onerror=', '', text, flags=re.IGNORECASE)
+    len(text.split())
+    return text
+
+
+def current_validate(text: str) -> str:
+    return InputValidator.validate_text(text, "paid")
+
+
+def legacy_preprocess(text: str) -> str:
+    text = re.sub(r'\s+', ' ', text.strip())
+    text = re.sub(r'http\S+|www.\S+', '', text)
+    text = re.sub(r'\S+@\S+', '', text)
+    text = re.sub(r'[^\w\s.,!?-]', '', text)
+    return text
+
+
+def legacy_language_metrics(text: str) -> List[Dict]:
+    results = []
+    for lang in ("en", "fr", "de", "es"):
+        metrics = {
+            'length': len(text),
+            'word_count': len(text.split()),
+            'sentence_count': len(re.split(r'[.!?]+', text)),
+        }
+        if lang == 'en':
+            words = text.lower().split()
+            metrics.update({
+                'avg_word_length': sum(len(w) for w in words) / max(len(words), 1),
+                'contraction_count': len(re.findall(r"\w+'(?:s|t|ve|ll|re|d)\b", text)),
+                'common_english_words': len([w for w in words if w in {'the', 'be', 'to', 'of', 'and', 'a', 'in', 'that'}])
+            })
+        elif lang == 'fr':
+            metrics.update({
+                'accent_ratio': len(re.findall(r'[éèêëàâäôöûüçîïù]', text)) / max(len(text), 1),
+                'french_articles': len(re.findall(r'\b(le|la|les|un|une|des)\b', text.lower()))
+            })
+        elif lang == 'de':
+            metrics.update({
+                'compound_words': len([w for w in text.split() if len(w) > 20]),
+                'umlauts': len(re.findall(r'[äöüß]', text))
+            })
+        else:
+            metrics.update({
+                'inverted_punctuation': len(re.findall(r'[¡¿]', text)),
+                'spanish_articles': len(re.findall(r'\b(el|la|los|las|un|una|unos|unas)\b', text.lower()))
+            })
+        results.append(metrics)
+    return results
+
+
+def current_language_metrics(text: str) -> List[Dict]:
+    return [LanguageDetector.get_language_specific_metrics(text, lang) for lang in ("en", "fr", "de", "es")]
+
+
+def legacy_style_marks(text: str) -> Tuple:
+    punctuation = []
+    tone = []
+    for sentence in text.split('.'):
+        if not sentence.split():
+            continue
+        exclaim = sentence.count('!')
+        question = sentence.count('?')
+        punctuation.append(sentence.count(',') + exclaim + question + sentence.count(';'))
+        tone.append(exclaim + question)
+    totals = (text.count('!'), text.count('?'), text.count('"') + text.count("'"))
+    return punctuation, tone, totals
+
+
+def current_style_marks(text: str) -> Tuple:
+    marks = scan_marks(text)
+    kept = [i for i, sentence in enumerate(text.split('.')) if sentence.split()]
+    exclaim = marks.segments['!'][kept]
+    question = marks.segments['?'][kept]
+    punctuation = marks.segments[','][kept] + exclaim + question + marks.segments[';'][kept]
+    totals = (marks.totals['!'], marks.totals['?'], marks.totals['"'] + marks.totals["'"])
+    return punctuation.tolist(), (exclaim + question).tolist(), totals
+
+
+def build_text(chars: int, rng: random.Random) -> str:
+    parts = []
+    length = 0
+    while length < chars:
+        part = rng.choice(WORDS) + (rng.choice(EXTRAS) if rng.random() < 0.2 else "")
+        parts.append(part)
+        length += len(part) + 1
+    return " ".join(parts)[:chars]
+
+
+def best_of(func: Callable, text: str, repeat: int) -> float:
+    """Fastest of ``repeat`` runs in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chars", type=int, default=50_000, help="Input size in characters")
+    parser.add_argument("--repeat", type=int, default=10, help="Timed runs per step")
+    parser.add_argument("--cprofile", action="store_true", help="Print the hottest functions of the current pipeline")
+    args = parser.parse_args()
+
+    text = build_text(args.chars, random.Random(0))
+    analyzer = AIContentAnalyzer(model_name="unused")
+    validated = current_validate(text)
+    processed = analyzer.preprocess_text(validated)
+    steps = [
+        ("validate_text", legacy_validate, current_validate, text),
+        ("preprocess_text", legacy_preprocess, analyzer.preprocess_text, validated),
+        ("language metrics", legacy_language_metrics, current_language_metrics, processed),
+        ("style marks", legacy_style_marks, current_style_marks, processed),
+    ]
+
+    print(f"input: {len(text)} characters")
+    print(f"{'step':<18} {'inline ms':>10} {'registry ms':>12} {'saved ms':>9} {'identical':>10}")
+    total_legacy = total_current = 0.0
+    identical_all = True
+    for name, legacy, current, step_input in steps:
+        identical = legacy(step_input) == current(step_input)
+        identical_all &= identical
+        legacy_ms = best_of(legacy, step_input, args.repeat)
+        current_ms = best_of(current, step_input, args.repeat)
+        total_legacy += legacy_ms
+        total_current += current_ms
+        print(f"{name:<18} {legacy_ms:>10.2f} {current_ms:>12.2f} {legacy_ms - current_ms:>9.2f} {str(identical):>10}")
+    print(f"{'per request':<18} {total_legacy:>10.2f} {total_current:>12.2f} {total_legacy - total_current:>9.2f}")
+
+    if args.cprofile:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        for _, _, current, step_input in steps:
+            current(step_input)
+        profiler.disable()
+        pstats.Stats(profiler).sort_stats("tottime").print_stats(15)
+    return 0 if identical_all else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
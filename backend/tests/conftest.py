@@ -64,3 +64,22 @@ def token(client: TestClient) -> str:
 def auth_headers(token: str) -> dict:
     """Get headers with auth token."""
     return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture(scope="session")
+def tiny_model_dir(tmp_path_factory) -> str:
+    """Directory holding a tiny offline RoBERTa classifier."""
+    from tests.tiny_model import build_tiny_model
+    return build_tiny_model(tmp_path_factory.mktemp("tiny_model"))
+
+
+@pytest.fixture(scope="session")
+def tiny_analyzer(tiny_model_dir: str):
+    """AIContentAnalyzer with the tiny offline model loaded."""
+    from app.models.analyzer import AIContentAnalyzer
+    # fp32 reference model; quantization has its own tests
+    analyzer = AIContentAnalyzer(model_name=tiny_model_dir, quantize=False)
+    analyzer._load_model()
+    # Tests that exercise caching attach their own cache
+    analyzer.result_cache = None
+    return analyzer
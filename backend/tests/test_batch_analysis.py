@@ -0,0 +1,237 @@
+"""Tests for batch analysis jobs and the /analyze/batch API."""
+import asyncio
+import io
+import json
+import docx
+import pytest
+from fastapi.testclient import TestClient
+from app.models.user import User, UserType
+from app.services.batch_analysis_service import BatchItem, BatchJob, JobStatus, format_event, run_job
+
+TEXTS = [
+    "The quick brown fox jumps over the lazy dog. It happened twice today.",
+    "We measured the results twice and reported the average value for each run.",
+    "Short note.",
+]
+
+
+def make_job(delays):
+    return BatchJob("user-1", [BatchItem(index=i, name=f"item-{i}", text=t) for i, t in enumerate(delays)])
+
+
+def test_scoring_overlaps_extraction_and_charges_once():
+    """Fast items are scored while a slow one is still extracting; results wait for the charge."""
+    job = make_job(["slow words here", "fast one", "fast two"])
+    log = []
+
+    async def extract(item):
+        await asyncio.sleep(0.2 if item.text.startswith("slow") else 0)
+        return item.text
+
+    async def score(texts):
+        log.append(("score", list(texts)))
+        return [{"prediction": "HUMAN_WRITTEN", "words": len(t.split())} for t in texts]
+
+    async def charge(words):
+        log.append(("charge", words))
+
+    asyncio.run(run_job(job, extract, score, charge, score_size=2))
+
+    assert log[0] == ("score", ["fast one", "fast two"])
+    assert [entry for entry in log if entry[0] == "charge"] == [("charge", 7)]
+    events = [e["event"] for e in job.events]
+    # Nothing is published before the job is paid for
+    assert events.index("charged") < events.index("result")
+    assert events.count("result") == 3 and events[-1] == "done"
+    assert job.status == JobStatus.COMPLETED
+    assert job.to_dict()["counts"]["completed"] == 3
+
+
+def test_failed_charge_publishes_nothing():
+    job = make_job(TEXTS)
+
+    async def extract(item):
+        return item.text
+
+    async def score(texts):
+        return [{"prediction": "AI_GENERATED"} for _ in texts]
+
+    async def charge(words):
+        raise RuntimeError("Insufficient balance")
+
+    asyncio.run(run_job(job, extract, score, charge))
+
+    assert job.status == JobStatus.FAILED
+    assert "Insufficient balance" in job.error
+    assert not any(e["event"] == "result" for e in job.events)
+    assert all(item.result is None for item in job.items)
+
+
+def test_item_failures_do_not_fail_the_job():
+    job = make_job(["good text", ""])
+    charged = []
+
+    async def extract(item):
+        if not item.text:
+            raise ValueError("No text extracted")
+        return item.text
+
+    async def score(texts):
+        return [{"prediction": "HUMAN_WRITTEN"} for _ in texts]
+
+    async def charge(words):
+        charged.append(words)
+
+    asyncio.run(run_job(job, extract, score, charge))
+
+    assert job.status == JobStatus.COMPLETED
+    assert charged == [2]
+    assert [item.status for item in job.items] == ["completed", "failed"]
+
+
+def test_followers_replay_and_receive_events():
+    job = make_job(TEXTS[:1])
+
+    async def run():
+        async def extract(item):
+            await asyncio.sleep(0.05)
+            return item.text
+
+        async def score(texts):
+            return [{"prediction": "HUMAN_WRITTEN"} for _ in texts]
+
+        async def charge(words):
+            pass
+
+        follower = asyncio.ensure_future(_collect(job))
+        await run_job(job, extract, score, charge)
+        late = await _collect(job)
+        return await follower, late
+
+    live, late = asyncio.run(run())
+    assert live == late == job.events
+    assert format_event(live[-1], "sse").startswith("event: done\ndata: ")
+    assert json.loads(format_event(live[-1], "ndjson")) == live[-1]
+
+
+async def _collect(job):
+    return [event async for event in job.follow()]
+
+
+@pytest.fixture
+def batch_client(client: TestClient, tiny_analyzer, monkeypatch):
+    """Client whose requests come from a PRO user, scored by the tiny model and billed by a fake."""
+    from app.api import analyze
+    from app.api.auth import get_current_user
+
+    user = User(id="batch-user", email="batch@example.com", user_type=UserType.PRO.value)
+    charges = []
+
+    class FakeShobeisService:
+        def __init__(self, db):
+            pass
+
+        def check_balance(self, user, action_type, quantity=1):
+            return quantity
+
+        def process_charge(self, user, action_type, quantity=1, **kwargs):
+            charges.append((user.id, action_type, quantity))
+            return True
+
+    monkeypatch.setattr(analyze, "analyzer", tiny_analyzer)
+    monkeypatch.setattr(analyze, "ShobeisService", FakeShobeisService)
+    client.app.dependency_overrides[get_current_user] = lambda: user
+    yield client, user, charges
+    client.app.dependency_overrides.pop(get_current_user, None)
+
+
+def test_batch_endpoint_streams_ndjson(batch_client):
+    client, _, charges = batch_client
+    doc = docx.Document()
+    doc.add_paragraph("This uploaded document is analyzed as part of the batch job.")
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    files = [("files", ("report.docx", buffer.getvalue(),
+                        "application/vnd.openxmlformats-officedocument.wordprocessingml.document"))]
+
+    resp = client.post("/api/analyze/batch?stream=ndjson", data={"texts": json.dumps(TEXTS[:2])}, files=files)
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    events = [json.loads(line) for line in resp.text.splitlines()]
+    results = {e["name"]: e["result"] for e in events if e["event"] == "result"}
+    assert set(results) == {"text-0", "text-1", "report.docx"}
+    assert all(r["prediction"] in ("AI_GENERATED", "HUMAN_WRITTEN") for r in results.values())
+    assert events[-1]["status"] == "completed"
+    # One charge for every word of the job
+    assert len(charges) == 1
+    assert charges[0][2] == sum(e["words"] for e in events if e["event"] == "extracted")
+
+
+def test_batch_job_can_be_polled(batch_client):
+    client, _, charges = batch_client
+
+    resp = client.post("/api/analyze/batch", json={"texts": TEXTS})
+    assert resp.status_code == 202
+    job_id = resp.json()["job_id"]
+
+    events = client.get(f"/api/analyze/batch/{job_id}/events?format=sse")
+    assert events.headers["content-type"].startswith("text/event-stream")
+    assert "event: done" in events.text
+
+    status = client.get(f"/api/analyze/batch/{job_id}").json()
+    assert status["status"] == "completed"
+    # The last text is below the validator's minimum word count
+    assert status["counts"] == {"queued": 0, "extracted": 0, "completed": 2, "failed": 1}
+    assert "minimum" in status["items"][2]["error"]
+    assert [item["index"] for item in status["items"]] == [0, 1, 2]
+    assert len(charges) == 1
+    assert client.get("/api/analyze/batch/unknown").status_code == 404
+
+
+def test_batch_size_limit_is_enforced(batch_client):
+    client, user, charges = batch_client
+    # Stored users hold the plan as its string value
+    user.user_type = UserType.BASIC.value
+
+    resp = client.post("/api/analyze/batch", json={"texts": ["Some text to analyze."] * 11})
+    assert resp.status_code == 403
+    assert not charges
+
+    resp = client.post("/api/analyze/batch", json={"texts": ["Some text to analyze."] * 10})
+    assert resp.status_code == 202
+
+
+def test_unknown_stream_format_is_rejected_before_the_job_starts(batch_client, monkeypatch):
+    from app.api import analyze
+    from app.utils.exceptions import ValidationError
+    client, _, charges = batch_client
+    created = []
+    monkeypatch.setattr(analyze.batch_jobs, "create", lambda *args: created.append(args))
+
+    with pytest.raises(ValidationError):
+        client.post("/api/analyze/batch?stream=xml", json={"texts": TEXTS[:2]})
+
+    assert not created and not charges
+
+
+def test_inline_batch_checks_the_balance_before_starting(batch_client, monkeypatch):
+    from app.api import analyze
+    from app.services.shobeis_service import InsufficientShobeisError
+    client, _, charges = batch_client
+    created = []
+
+    class BrokeShobeisService:
+        def __init__(self, db):
+            pass
+
+        def check_balance(self, user, action_type, quantity=1):
+            raise InsufficientShobeisError("Insufficient balance")
+
+    monkeypatch.setattr(analyze, "ShobeisService", BrokeShobeisService)
+    monkeypatch.setattr(analyze.batch_jobs, "create", lambda *args: created.append(args))
+
+    resp = client.post("/api/analyze/batch", json={"texts": TEXTS[:2]})
+
+    assert resp.status_code == 402
+    assert not created and not charges
@@ -0,0 +1,57 @@
+"""Tests for length-bucketed, token-budgeted analyze_batch."""
+import pytest
+
+SHORT = "Short note."
+LONG = " ".join(["The committee reviewed every proposal in detail before the vote."] * 20)
+
+
+@pytest.fixture
+def texts():
+    return [SHORT, LONG, "A slightly longer sentence about nothing much.", SHORT + " Again.", LONG[:300]]
+
+
+def test_results_keep_input_order(tiny_analyzer, texts):
+    batched = tiny_analyzer.analyze_batch(texts, max_tokens=600)
+    single = [tiny_analyzer.analyze_batch([text])[0] for text in texts]
+    assert len(batched) == len(texts)
+    for a, b in zip(batched, single):
+        assert a["prediction"] == b["prediction"]
+        assert a["analysisDetails"]["aiProbability"] == pytest.approx(b["analysisDetails"]["aiProbability"], abs=0.01)
+        assert a["analysisDetails"]["textLength"] == b["analysisDetails"]["textLength"]
+
+
+def test_batches_respect_token_budget(tiny_analyzer, texts, monkeypatch):
+    shapes = []
+    original = tiny_analyzer._predict
+
+    def record(sequences, *args, **kwargs):
+        shapes.append((len(sequences), max(len(seq) for seq in sequences)))
+        return original(sequences, *args, **kwargs)
+
+    monkeypatch.setattr(tiny_analyzer, "_predict", record)
+    tiny_analyzer.analyze_batch(texts, max_tokens=256)
+
+    assert sum(rows for rows, _ in shapes) == len(texts)
+    for rows, width in shapes:
+        assert rows == 1 or rows * width <= 256
+    # Longest first, so the padded width only shrinks
+    widths = [width for _, width in shapes]
+    assert widths == sorted(widths, reverse=True)
+
+
+def test_bucketing_reduces_padding_waste(tiny_analyzer, texts):
+    tiny_analyzer.analyze_batch(texts, max_tokens=512)
+    stats = tiny_analyzer.last_batch_stats
+    assert stats["texts"] == len(texts)
+    assert stats["real_tokens"] <= stats["padded_tokens"]
+
+    # Arrival-order batches of the same size pad every row to the long text
+    lengths = [len(tiny_analyzer._encode_windows(tiny_analyzer.tokenizer, t, False)[0]["input_ids"]) for t in texts]
+    arrival_waste = 1 - sum(lengths) / (len(lengths) * max(lengths))
+    assert stats["padding_waste"] < arrival_waste
+
+
+def test_empty_texts_are_reported_in_place(tiny_analyzer):
+    results = tiny_analyzer.analyze_batch([SHORT, "   ", LONG])
+    assert results[1] == {"error": "Empty text after preprocessing"}
+    assert "prediction" in results[0] and "prediction" in results[2]
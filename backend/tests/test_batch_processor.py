@@ -0,0 +1,94 @@
+"""Tests for sliding-window batch document processing."""
+import asyncio
+import time
+import pytest
+from app.utils.batch_processor import BatchDocumentProcessor, ProcessingStatus
+
+
+def make_processor(tmp_path, delays, max_concurrent=2):
+    """Batch processor whose documents take the given number of seconds each."""
+    processor = BatchDocumentProcessor(max_concurrent=max_concurrent)
+    for name in delays:
+        path = tmp_path / f"{name}.txt"
+        path.write_text(name)
+        processor.add_document(path)
+
+    async def fake_process(file_path):
+        await asyncio.sleep(delays[file_path.stem])
+        return {"text": file_path.stem, "metadata": {"format": "txt"}}
+
+    processor._process_single_document = fake_process
+    return processor
+
+
+def recount(processor):
+    """get_batch_status computed by scanning every result."""
+    counts = {status.value: 0 for status in ProcessingStatus}
+    for result in processor.results.values():
+        counts[result.status.value] += 1
+    return counts
+
+
+def test_slow_document_does_not_stall_other_slots(tmp_path):
+    delays = {"slow": 0.6, **{f"fast{i}": 0.05 for i in range(6)}}
+    processor = make_processor(tmp_path, delays, max_concurrent=2)
+    finished = []
+    processor.add_progress_callback(
+        lambda r: finished.append(r.file_path.stem) if r.status == ProcessingStatus.COMPLETED else None
+    )
+
+    start = time.perf_counter()
+    results = asyncio.run(processor.process_batch())
+    elapsed = time.perf_counter() - start
+
+    assert all(r.status == ProcessingStatus.COMPLETED for r in results.values())
+    # The fast documents all go through the second slot while the slow one runs
+    assert finished[-1] == "slow"
+    assert elapsed < 0.6 + 0.3
+
+
+def test_results_stream_to_callbacks(tmp_path):
+    processor = make_processor(tmp_path, {"a": 0.01, "b": 0.2, "c": 0.01})
+    seen = []
+    processor.add_progress_callback(lambda r: seen.append((r.file_path.stem, r.status)))
+
+    asyncio.run(processor.process_batch())
+
+    for name in ("a", "b", "c"):
+        assert seen.index((name, ProcessingStatus.PROCESSING)) < seen.index((name, ProcessingStatus.COMPLETED))
+    assert seen.index(("c", ProcessingStatus.COMPLETED)) < seen.index(("b", ProcessingStatus.COMPLETED))
+
+
+def test_cancel_marks_remaining_documents(tmp_path):
+    delays = {"first": 0.01, "second": 0.01, **{f"doc{i}": 0.5 for i in range(4)}}
+    processor = make_processor(tmp_path, delays, max_concurrent=2)
+
+    async def run():
+        batch = asyncio.create_task(processor.process_batch())
+        await asyncio.sleep(0.2)
+        processor.cancel()
+        return await batch
+
+    results = asyncio.run(run())
+    statuses = {name: results[str(tmp_path / f"{name}.txt")].status for name in delays}
+
+    assert statuses["first"] == statuses["second"] == ProcessingStatus.COMPLETED
+    assert all(statuses[f"doc{i}"] == ProcessingStatus.CANCELLED for i in range(4)), statuses
+    assert not processor.processing_queue
+    assert processor.get_batch_status()["status_counts"] == recount(processor)
+
+
+def test_batch_status_is_kept_incrementally(tmp_path):
+    processor = make_processor(tmp_path, {"a": 0.01, "b": 0.02, "c": 0.03})
+    snapshots = []
+    processor.add_progress_callback(
+        lambda r: snapshots.append((processor.get_batch_status()["status_counts"], recount(processor)))
+    )
+
+    asyncio.run(processor.process_batch())
+    status = processor.get_batch_status()
+
+    assert all(kept == scanned for kept, scanned in snapshots)
+    assert status["status_counts"]["completed"] == 3
+    assert status["completed_percentage"] == 100
+    assert status["average_processing_time"] == pytest.approx(0.02, abs=0.02)
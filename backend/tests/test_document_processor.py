@@ -179,4 +179,50 @@ def test_process_document_pdf(processor, sample_pdf_file):
         assert "tables" in page
         assert "images" in page
         assert "words" in page
-        assert "characters" in page
\ No newline at end of file
+        assert "characters" in page
+
+@pytest.fixture
+def multi_page_pdf():
+    """Three-page PDF as bytes."""
+    try:
+        from reportlab.pdfgen import canvas
+    except ImportError:
+        pytest.skip("reportlab not installed")
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer)
+    for number in range(1, 4):
+        pdf.drawString(72, 720, f"Page {number} says hello to the streaming reader.")
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+def test_iter_pdf_pages_streams_pages(multi_page_pdf):
+    """Pages are produced lazily, one dict per page, without tables or images by default."""
+    info = {}
+    pages = DocumentProcessor.iter_pdf_pages(multi_page_pdf, document_info=info)
+    first = next(pages)
+    assert info["pages"] == 3
+    assert first["page_number"] == 1
+    assert "Page 1" in first["text"]
+    assert first["tables"] is None and first["images"] is None
+    assert [page["page_number"] for page in pages] == [2, 3]
+
+
+def test_pdf_table_extraction_is_opt_in(sample_pdf_file):
+    content = sample_pdf_file.read_bytes()
+    default = DocumentProcessor.extract_text_from_pdf(content)
+    assert default["metadata"]["statistics"]["tables"] is None
+
+    with_tables = DocumentProcessor.extract_text_from_pdf(content, include_tables=True, include_images=True)
+    assert with_tables["metadata"]["statistics"]["tables"] >= 1
+    assert with_tables["metadata"]["statistics"]["images"] == 0
+    assert with_tables["text"] == default["text"]
+
+
+def test_pdf_without_page_details(processor, multi_page_pdf):
+    full = DocumentProcessor.extract_text_from_pdf(multi_page_pdf)
+    lean = processor.process_document_bytes(multi_page_pdf, "application/pdf", include_pages=False)
+    assert "pages" not in lean
+    assert lean["text"] == full["text"]
+    assert lean["metadata"] == full["metadata"]
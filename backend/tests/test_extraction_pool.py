@@ -0,0 +1,119 @@
+"""Tests for the document extraction process pool."""
+import asyncio
+import io
+import os
+import signal
+import docx
+import pytest
+from app.utils.batch_processor import BatchDocumentProcessor, ProcessingStatus
+from app.utils.document_processor import DocumentProcessor
+from app.utils.extraction_pool import ExtractionPool, ExtractionTimeoutError
+
+DOCX_MIME = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+
+
+@pytest.fixture(scope="module")
+def docx_bytes():
+    doc = docx.Document()
+    doc.add_heading('Pool Document', 0)
+    doc.add_paragraph('This paragraph is parsed in a worker process.')
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+@pytest.fixture(scope="module")
+def extraction_pool():
+    pool = ExtractionPool(num_workers=2, timeout=60, max_tasks_per_worker=0)
+    pool.start()
+    yield pool
+    pool.shutdown()
+
+
+def test_pool_matches_in_process_extraction(extraction_pool, docx_bytes):
+    """A document parsed in a worker gives the same result as in the API process."""
+    result = extraction_pool.extract('docx', docx_bytes)
+    expected = DocumentProcessor.extract_text_from_docx(docx_bytes)
+
+    assert result["text"] == expected["text"]
+    assert result["metadata"] == expected["metadata"]
+    assert os.getpid() not in extraction_pool.stats()["pids"]
+
+
+def test_process_document_bytes_uses_pool(extraction_pool, docx_bytes):
+    completed = extraction_pool.stats()["tasks_completed"]
+    result = DocumentProcessor().process_document_bytes(docx_bytes, DOCX_MIME, pool=extraction_pool)
+
+    assert "worker process" in result["text"]
+    assert extraction_pool.stats()["tasks_completed"] == completed + 1
+
+
+def test_extraction_errors_are_reported(extraction_pool):
+    with pytest.raises(ValueError, match="Failed to process DOCX"):
+        extraction_pool.extract('docx', b'not a docx file')
+    # The worker survives a failed document
+    assert extraction_pool.stats()["alive"] == 2
+
+
+def test_runaway_parse_is_killed(docx_bytes):
+    """A document that exceeds the timeout kills its worker and a new one takes over."""
+    pool = ExtractionPool(num_workers=1, timeout=60)
+    try:
+        pool.start()
+        old_pid = pool.stats()["pids"][0]
+        # A just-spawned worker cannot answer within a millisecond
+        with pytest.raises(ExtractionTimeoutError):
+            pool.extract('docx', docx_bytes, timeout=0.001)
+
+        stats = pool.stats()
+        assert stats["timeouts"] == 1
+        assert stats["pids"] != [old_pid]
+        assert "worker process" in pool.extract('docx', docx_bytes)["text"]
+    finally:
+        pool.shutdown()
+
+
+def test_workers_are_recycled(docx_bytes):
+    pool = ExtractionPool(num_workers=1, timeout=60, max_tasks_per_worker=2)
+    try:
+        pool.start()
+        first_pid = pool.stats()["pids"][0]
+        pool.extract('docx', docx_bytes)
+        pool.extract('docx', docx_bytes)
+
+        stats = pool.stats()
+        assert stats["recycled"] == 1
+        assert stats["pids"] != [first_pid]
+        assert pool.extract('docx', docx_bytes)["text"]
+    finally:
+        pool.shutdown()
+
+
+def test_crashed_worker_is_replaced(docx_bytes):
+    pool = ExtractionPool(num_workers=1, timeout=60)
+    try:
+        pool.start()
+        pool.extract('docx', docx_bytes)
+        os.kill(pool.stats()["pids"][0], signal.SIGKILL)
+        with pytest.raises(ValueError, match="crashed"):
+            pool.extract('docx', docx_bytes)
+
+        assert pool.stats()["restarts"] == 1
+        assert pool.extract('docx', docx_bytes)["text"]
+    finally:
+        pool.shutdown()
+
+
+def test_batch_processor_extracts_in_pool(extraction_pool, docx_bytes, tmp_path):
+    paths = []
+    for index in range(3):
+        path = tmp_path / f"doc{index}.docx"
+        path.write_bytes(docx_bytes)
+        paths.append(path)
+    completed = extraction_pool.stats()["tasks_completed"]
+
+    processor = BatchDocumentProcessor(extraction_pool=extraction_pool)
+    results = asyncio.run(processor.process_multiple(paths))
+
+    assert all(r.status == ProcessingStatus.COMPLETED for r in results.values())
+    assert extraction_pool.stats()["tasks_completed"] == completed + 3
@@ -0,0 +1,52 @@
+"""Parity tests for the exported ONNX Runtime and TorchScript backends."""
+import pytest
+import torch
+from app.models.analyzer import AIContentAnalyzer
+
+SEQUENCES = [
+    [0, 262, 80, 80, 83, 277, 310, 80, 72, 2],
+    [0, 100, 2],
+    [0] + list(range(10, 60)) + [2],
+]
+
+
+def _load(tiny_model_dir, cache_dir, backend):
+    analyzer = AIContentAnalyzer(model_name=tiny_model_dir, backend=backend)
+    analyzer.cache_dir = cache_dir
+    analyzer.result_cache = None
+    analyzer._load_model()
+    return analyzer
+
+
+@pytest.mark.parametrize("backend", ["onnx", "torchscript"])
+def test_logits_match_eager_model(tiny_model_dir, tmp_path, backend):
+    """Exported backends reproduce the eager logits on padded, variable-length batches."""
+    if backend == "onnx":
+        pytest.importorskip("onnxruntime")
+    analyzer = _load(tiny_model_dir, tmp_path, backend)
+    assert analyzer.runtime is not None
+
+    _, runtime_logits, _ = analyzer._predict(SEQUENCES)
+    runtime = analyzer.runtime
+    analyzer.runtime = None
+    _, eager_logits, _ = analyzer._predict(SEQUENCES)
+    analyzer.runtime = runtime
+
+    assert torch.allclose(runtime_logits, eager_logits, atol=1e-4)
+
+
+def test_artifact_is_exported_once(tiny_model_dir, tmp_path):
+    """A second load reuses the cached artifact instead of exporting again."""
+    first = _load(tiny_model_dir, tmp_path, "torchscript")
+    path = first.runtime.path
+    mtime = path.stat().st_mtime_ns
+    assert path.is_relative_to(tmp_path / "models")
+
+    second = _load(tiny_model_dir, tmp_path, "torchscript")
+    assert second.runtime.path == path
+    assert path.stat().st_mtime_ns == mtime
+
+
+def test_unknown_backend_rejected():
+    with pytest.raises(ValueError):
+        AIContentAnalyzer(backend="tensorrt")
@@ -0,0 +1,87 @@
+"""Tests for the dynamic micro-batching inference scheduler."""
+import asyncio
+import pytest
+from app.utils.inference_batcher import InferenceBatcher
+
+TEXTS = [
+    "The quick brown fox jumps over the lazy dog. It happened twice today.",
+    "We measured the results twice and reported the average value for each run.",
+    "Artificial intelligence can write text that reads like a person wrote it!",
+]
+
+
+def test_batched_results_match_single_analysis(tiny_analyzer):
+    """Scoring requests together returns the same results as one at a time."""
+    batcher = InferenceBatcher(tiny_analyzer, max_batch_size=8, max_wait_ms=50)
+
+    async def run():
+        return await asyncio.gather(*(batcher.submit(text) for text in TEXTS))
+
+    batched = asyncio.run(run())
+    for text, result in zip(TEXTS, batched):
+        single = tiny_analyzer.analyze_text(text)
+        assert result["prediction"] == single["prediction"]
+        assert result["analysisDetails"]["indicators"] == single["analysisDetails"]["indicators"]
+        assert result["analysisDetails"]["aiProbability"] == pytest.approx(
+            single["analysisDetails"]["aiProbability"], abs=0.05
+        )
+
+
+def test_concurrent_requests_share_a_batch(tiny_analyzer):
+    """Requests arriving inside the wait window are scored in one pass."""
+    batcher = InferenceBatcher(tiny_analyzer, max_batch_size=8, max_wait_ms=200)
+
+    async def run():
+        return await asyncio.gather(*(batcher.submit(text) for text in TEXTS))
+
+    asyncio.run(run())
+    stats = batcher.stats()
+    assert stats["requests_processed"] == len(TEXTS)
+    assert stats["batches_processed"] == 1
+    assert stats["last_batch_size"] == len(TEXTS)
+
+
+def test_batch_size_limit(tiny_analyzer):
+    """Batches never exceed the configured maximum size."""
+    batcher = InferenceBatcher(tiny_analyzer, max_batch_size=2, max_wait_ms=200)
+
+    async def run():
+        return await asyncio.gather(*(batcher.submit(text) for text in TEXTS))
+
+    asyncio.run(run())
+    stats = batcher.stats()
+    assert stats["batches_processed"] == 2
+    assert stats["requests_processed"] == len(TEXTS)
+
+
+def test_failed_request_does_not_fail_batch(tiny_analyzer):
+    """A request that fails preprocessing only fails its own caller."""
+    batcher = InferenceBatcher(tiny_analyzer, max_batch_size=8, max_wait_ms=50)
+
+    async def run():
+        return await asyncio.gather(
+            batcher.submit(TEXTS[0]),
+            batcher.submit("@@@@@@"),
+            return_exceptions=True
+        )
+
+    good, bad = asyncio.run(run())
+    assert good["prediction"] in ("AI_GENERATED", "HUMAN_WRITTEN")
+    assert isinstance(bad, ValueError)
+
+
+def test_shutdown_stops_the_worker_of_a_finished_loop(tiny_analyzer):
+    """shutdown() stops a worker left on a loop that is no longer running."""
+    batcher = InferenceBatcher(tiny_analyzer, max_batch_size=8, max_wait_ms=50)
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(batcher.submit(TEXTS[0]))
+        worker = batcher._worker_task
+        assert not worker.done()
+
+        batcher.shutdown()
+
+        assert worker.cancelled()
+        batcher.shutdown()  # Nothing left to stop
+    finally:
+        loop.close()
@@ -0,0 +1,161 @@
+"""Tests for the dedicated inference executor and queue backpressure."""
+import asyncio
+import threading
+import pytest
+from app.utils.exceptions import InferenceQueueFullError
+from app.utils.inference_batcher import InferenceBatcher
+from app.utils.inference_executor import InferenceExecutor
+from app.utils.monitoring import MetricsCollector, PerformanceMonitor
+
+
+def test_runs_on_dedicated_threads_with_torch_threads():
+    """Work runs on named inference threads with the configured torch threads."""
+    import torch
+    executor = InferenceExecutor(max_workers=1, max_queue_size=0, torch_threads=1)
+    try:
+        name, threads = executor.submit(
+            lambda: (threading.current_thread().name, torch.get_num_threads())
+        ).result()
+    finally:
+        executor.shutdown()
+    assert name.startswith("inference")
+    assert threads == 1
+
+
+def test_rejects_when_queue_is_full():
+    """Once workers and backlog are busy new work is rejected with a retry hint."""
+    executor = InferenceExecutor(max_workers=1, max_queue_size=1, torch_threads=1)
+    release = threading.Event()
+    try:
+        running = executor.submit(release.wait)
+        queued = executor.submit(lambda: None)
+        with pytest.raises(InferenceQueueFullError) as excinfo:
+            executor.submit(lambda: None)
+        assert excinfo.value.retry_after >= 1
+        assert executor.stats()["rejected"] == 1
+    finally:
+        release.set()
+        running.result()
+        queued.result()
+        executor.shutdown()
+    # Capacity frees up once the backlog drains
+    assert executor.stats()["queued"] == 0
+
+
+def test_batcher_backpressure(tiny_analyzer):
+    """A full batching queue rejects new requests instead of growing."""
+    executor = InferenceExecutor(max_workers=1, max_queue_size=1, torch_threads=1)
+    batcher = InferenceBatcher(tiny_analyzer, max_batch_size=1, max_wait_ms=0,
+                               executor=executor, max_queue_size=1)
+    release = threading.Event()
+
+    async def run():
+        # Occupy the only worker; the first batch then waits in the executor
+        # and the second request fills the one-request batching queue
+        blocker = asyncio.ensure_future(executor.run(release.wait))
+        first = asyncio.ensure_future(batcher.submit("We measured the results twice."))
+        await asyncio.sleep(0.05)
+        second = asyncio.ensure_future(batcher.submit("The quick brown fox jumps over the lazy dog."))
+        await asyncio.sleep(0.05)
+        with pytest.raises(InferenceQueueFullError):
+            batcher.check_capacity()
+        with pytest.raises(InferenceQueueFullError):
+            await batcher.submit("Artificial intelligence can write text.")
+        release.set()
+        await blocker
+        return await asyncio.gather(first, second)
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        release.set()
+        executor.shutdown()
+    assert all(r["prediction"] in ("AI_GENERATED", "HUMAN_WRITTEN") for r in results)
+
+
+def test_stage_timings_recorded(tiny_analyzer):
+    """Each batch records its executor wait, preprocessing and inference time."""
+    collector = MetricsCollector()
+    executor = InferenceExecutor(max_workers=1, torch_threads=1)
+    batcher = InferenceBatcher(tiny_analyzer, executor=executor,
+                               performance_monitor=PerformanceMonitor(collector))
+    before = len(collector.metrics['model_inference_time']['queue'])
+    try:
+        asyncio.run(batcher.submit("We measured the results twice and reported the average value."))
+    finally:
+        executor.shutdown()
+    points = list(collector.metrics['model_inference_time']['queue'])[before:]
+    assert {p.labels.get('stage') for p in points} >= {"executor_wait", "preprocess", "inference"}
+
+
+def test_reserved_place_is_kept_while_charging(tiny_analyzer):
+    """A request that reserved its place is queued even if others filled the queue meanwhile."""
+    executor = InferenceExecutor(max_workers=1, max_queue_size=1, torch_threads=1)
+    batcher = InferenceBatcher(tiny_analyzer, max_batch_size=1, max_wait_ms=0,
+                               executor=executor, max_queue_size=1)
+    release = threading.Event()
+
+    async def run():
+        blocker = asyncio.ensure_future(executor.run(release.wait))
+        first = asyncio.ensure_future(batcher.submit("We measured the results twice."))
+        await asyncio.sleep(0.05)
+        with batcher.reserve() as slot:
+            # The only place is held: neither new reservations nor plain submits get in
+            with pytest.raises(InferenceQueueFullError):
+                batcher.reserve()
+            with pytest.raises(InferenceQueueFullError):
+                await batcher.submit("Artificial intelligence can write text.")
+            second = asyncio.ensure_future(batcher.submit("The quick brown fox jumps over the lazy dog.", slot=slot))
+            await asyncio.sleep(0)
+        assert batcher.stats()["reserved"] == 0
+        release.set()
+        await blocker
+        return await asyncio.gather(first, second)
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        release.set()
+        executor.shutdown()
+    assert all(r["prediction"] in ("AI_GENERATED", "HUMAN_WRITTEN") for r in results)
+
+
+def test_unused_reservation_is_released(tiny_analyzer):
+    executor = InferenceExecutor(max_workers=1, torch_threads=1)
+    batcher = InferenceBatcher(tiny_analyzer, executor=executor, max_queue_size=1)
+
+    async def run():
+        with batcher.reserve():
+            assert batcher.stats()["reserved"] == 1
+        batcher.check_capacity()
+        return await batcher.submit("We measured the results twice and reported the average value.")
+
+    try:
+        result = asyncio.run(run())
+    finally:
+        executor.shutdown()
+    assert batcher.stats()["reserved"] == 0
+    assert result["prediction"] in ("AI_GENERATED", "HUMAN_WRITTEN")
+
+
+def test_queued_request_waits_for_a_full_executor(tiny_analyzer):
+    """Work from other callers filling the shared executor delays a queued request instead of failing it."""
+    executor = InferenceExecutor(max_workers=1, max_queue_size=0, torch_threads=1)
+    batcher = InferenceBatcher(tiny_analyzer, max_batch_size=1, max_wait_ms=0, executor=executor)
+    release = threading.Event()
+
+    async def run():
+        blocker = asyncio.ensure_future(executor.run(release.wait))
+        request = asyncio.ensure_future(batcher.submit("We measured the results twice."))
+        await asyncio.sleep(0.2)
+        assert not request.done()
+        release.set()
+        await blocker
+        return await request
+
+    try:
+        result = asyncio.run(run())
+    finally:
+        release.set()
+        executor.shutdown()
+    assert result["prediction"] in ("AI_GENERATED", "HUMAN_WRITTEN")
@@ -0,0 +1,214 @@
+"""Tests for the durable job queue and the job worker."""
+import io
+import json
+import threading
+import time
+import docx
+import pytest
+from fastapi.testclient import TestClient
+from app.models.user import User, UserType
+from app.services.job_worker import JobWorker
+from app.utils.job_queue import SQLiteJobQueue
+
+DOCX_MIME = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+TEXT = "The quick brown fox jumps over the lazy dog. It happened twice today."
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return SQLiteJobQueue(str(tmp_path / "jobs.sqlite3"))
+
+
+@pytest.fixture(scope="module")
+def docx_bytes():
+    doc = docx.Document()
+    doc.add_paragraph("This queued document is analyzed by the worker process after the request returns.")
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def test_jobs_are_claimed_in_order_and_persisted(queue):
+    first = queue.enqueue("file", {"n": 1}, user_id="u1", data=b"\x00\x01payload")
+    second = queue.enqueue("file", {"n": 2}, user_id="u2")
+
+    claimed = queue.claim()
+    assert claimed.id == first.id
+    assert claimed.status == "running" and claimed.attempts == 1
+    assert claimed.data == b"\x00\x01payload"
+    queue.complete(claimed.id, {"success": True})
+
+    # A second handle on the same file sees the stored result
+    reopened = SQLiteJobQueue(queue.path)
+    job = reopened.get(first.id, user_id="u1")
+    assert job.status == "completed" and job.result == {"success": True}
+    assert job.data is None
+    assert reopened.get(first.id, user_id="u2") is None
+    assert reopened.claim().id == second.id
+    assert reopened.claim() is None
+    assert reopened.stats() == {"queued": 0, "running": 1, "completed": 1, "failed": 0}
+
+
+def test_expired_lease_is_retried_then_failed(tmp_path):
+    queue = SQLiteJobQueue(str(tmp_path / "jobs.sqlite3"), lease_seconds=0.05, max_attempts=2)
+    job = queue.enqueue("file", {})
+
+    assert queue.claim().attempts == 1
+    time.sleep(0.1)
+    # The first worker died; the job is handed out again
+    assert queue.claim().attempts == 2
+    time.sleep(0.1)
+    assert queue.claim() is None
+    failed = queue.get(job.id)
+    assert failed.status == "failed" and "did not finish" in failed.error
+
+
+def test_only_the_current_attempt_renews_and_finishes(tmp_path):
+    queue = SQLiteJobQueue(str(tmp_path / "jobs.sqlite3"), lease_seconds=0.05)
+    job = queue.enqueue("file", {})
+
+    first = queue.claim()
+    time.sleep(0.1)
+    second = queue.claim()
+    assert second.attempts == 2
+
+    # The first worker overran its lease: it can neither renew nor store its outcome
+    assert not queue.renew(job.id, first.attempts)
+    assert not queue.complete(job.id, {"by": "first"}, attempt=first.attempts)
+    assert queue.renew(job.id, second.attempts)
+    assert queue.complete(job.id, {"by": "second"}, attempt=second.attempts)
+    assert not queue.fail(job.id, "late", attempt=second.attempts)
+    assert queue.get(job.id).result == {"by": "second"}
+
+
+def test_worker_renews_the_lease_of_a_long_job(tmp_path, tiny_analyzer):
+    queue = SQLiteJobQueue(str(tmp_path / "jobs.sqlite3"), lease_seconds=0.15)
+    job = queue.enqueue("slow", {})
+    worker = JobWorker(queue, tiny_analyzer, charge=lambda user_id, words, key: None)
+    worker._handlers["slow"] = lambda job: time.sleep(0.5) or {"done": True}
+    claims = []
+
+    def compete():
+        # A second worker polling while the first one runs never gets the job
+        deadline = time.time() + 0.4
+        while time.time() < deadline:
+            claims.append(queue.claim())
+            time.sleep(0.02)
+
+    competitor = threading.Thread(target=compete)
+    competitor.start()
+    worker.run_once()
+    competitor.join()
+
+    assert not any(claims)
+    stored = queue.get(job.id)
+    assert stored.status == "completed" and stored.attempts == 1
+
+
+def test_concurrent_claims_never_share_a_job(queue):
+    ids = {queue.enqueue("file", {"n": n}).id for n in range(40)}
+    claimed = []
+
+    def claim_all():
+        while True:
+            job = queue.claim()
+            if job is None:
+                return
+            claimed.append(job.id)
+
+    threads = [threading.Thread(target=claim_all) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(claimed) == sorted(ids)
+
+
+def test_worker_runs_file_and_batch_jobs(queue, tiny_analyzer, docx_bytes):
+    charges = []
+    worker = JobWorker(queue, tiny_analyzer, charge=lambda user_id, words, key: charges.append((user_id, key)))
+    file_job = queue.enqueue("file", {"filename": "report.docx", "content_type": DOCX_MIME, "options": {}},
+                             user_id="u1", data=docx_bytes)
+    batch_job = queue.enqueue("batch", {
+        "texts": [TEXT],
+        "files": [{"name": "report.docx", "content_type": DOCX_MIME, "size": len(docx_bytes)},
+                  {"name": "notes.txt", "content_type": "text/plain", "size": 5}]
+    }, user_id="u2", data=docx_bytes + b"short")
+    unknown = queue.enqueue("export", {}, user_id="u3")
+
+    assert worker.drain() == 3
+
+    file_result = queue.get(file_job.id).result
+    assert file_result["data"]["prediction"] in ("AI_GENERATED", "HUMAN_WRITTEN")
+    assert file_result["data"]["documentInfo"]["fileName"] == "report.docx"
+
+    batch_result = queue.get(batch_job.id).result
+    assert batch_result["counts"] == {"queued": 0, "extracted": 0, "completed": 2, "failed": 1}
+    assert [item["name"] for item in batch_result["items"]] == ["text-0", "report.docx", "notes.txt"]
+
+    assert queue.get(unknown.id).status == "failed"
+    assert charges == [("u1", f"job:{file_job.id}"), ("u2", f"job:{batch_job.id}")]
+
+
+def test_failed_charge_fails_the_job(queue, tiny_analyzer, docx_bytes):
+    def refuse(user_id, words, key):
+        raise RuntimeError("Insufficient balance")
+
+    worker = JobWorker(queue, tiny_analyzer, charge=refuse)
+    job = queue.enqueue("file", {"filename": "report.docx", "content_type": DOCX_MIME}, data=docx_bytes)
+    worker.drain()
+
+    stored = queue.get(job.id)
+    assert stored.status == "failed" and stored.result is None
+    assert "Insufficient balance" in stored.error
+
+
+def test_file_endpoint_enqueues_in_queue_mode(client: TestClient, queue, tiny_analyzer, docx_bytes, monkeypatch):
+    from app.api import analyze
+    from app.api.auth import get_current_user
+
+    user = User(id="queue-user", email="queue@example.com", user_type=UserType.PRO.value,
+                monthly_balance=0, bonus_balance=0, shobeis_balance=1000)
+    monkeypatch.setattr(analyze, "job_queue", queue)
+    # Enqueueing must not need the model
+    monkeypatch.setattr(analyze, "_ensure_model_ready", None)
+    client.app.dependency_overrides[get_current_user] = lambda: user
+    try:
+        resp = client.post("/api/analyze/file", files={"file": ("report.docx", docx_bytes, DOCX_MIME)},
+                           data={"options": json.dumps({"sliding_window": False})})
+        assert resp.status_code == 202
+        job_id = resp.json()["job_id"]
+        assert client.get(resp.json()["status_url"]).json()["status"] == "queued"
+
+        charges = []
+        JobWorker(queue, tiny_analyzer, charge=lambda user_id, words, key: charges.append(user_id)).drain()
+
+        status = client.get(f"/api/analyze/jobs/{job_id}").json()
+        assert status["status"] == "completed"
+        assert status["result"]["data"]["documentInfo"]["fileName"] == "report.docx"
+        assert charges == ["queue-user"]
+
+        resp = client.post("/api/analyze/batch", json={"texts": [TEXT, TEXT]})
+        assert resp.status_code == 202
+        assert queue.get(resp.json()["job_id"]).kind == "batch"
+    finally:
+        client.app.dependency_overrides.pop(get_current_user, None)
+
+
+def test_queue_mode_refuses_users_who_cannot_pay(client: TestClient, queue, docx_bytes, monkeypatch):
+    from app.api import analyze
+    from app.api.auth import get_current_user
+
+    user = User(id="broke-user", email="broke@example.com", user_type=UserType.FREE.value,
+                monthly_balance=0, bonus_balance=0, shobeis_balance=0)
+    monkeypatch.setattr(analyze, "job_queue", queue)
+    client.app.dependency_overrides[get_current_user] = lambda: user
+    try:
+        resp = client.post("/api/analyze/file", files={"file": ("report.docx", docx_bytes, DOCX_MIME)})
+        assert resp.status_code == 402
+        resp = client.post("/api/analyze/batch", json={"texts": [TEXT]})
+        assert resp.status_code == 402
+        assert queue.stats()["queued"] == 0
+    finally:
+        client.app.dependency_overrides.pop(get_current_user, None)
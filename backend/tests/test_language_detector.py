@@ -0,0 +1,87 @@
+"""Tests for the language-detection fast path and memoization."""
+import pytest
+from app.utils import language_detector
+from app.utils.language_detector import LanguageDetector
+
+ENGLISH = "The city council met on Tuesday evening to discuss the new budget and the housing plan. "
+GERMAN = "Der Stadtrat traf sich am Dienstagabend, um den neuen Haushalt zu besprechen. "
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    LanguageDetector._detection_cache.clear()
+    yield
+    LanguageDetector._detection_cache.clear()
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Record the texts passed to langdetect."""
+    seen = []
+    original = language_detector.detect_langs
+
+    def record(text):
+        seen.append(text)
+        return original(text)
+
+    monkeypatch.setattr(language_detector, "detect_langs", record)
+    return seen
+
+
+def test_long_text_is_sampled(calls):
+    text = ENGLISH * 2000
+    assert LanguageDetector.detect_language(text)[0] == "en"
+    assert len(calls) == 1
+    assert len(calls[0]) <= language_detector.DETECTION_SAMPLE_CHARS + 8
+
+
+def test_sample_covers_the_whole_document():
+    text = ENGLISH * 200 + GERMAN * 200
+    sample = LanguageDetector.sample_text(text, max_chars=2000)
+    assert len(sample) < 2100
+    assert "Stadtrat" in sample and "council" in sample
+
+
+def test_short_text_is_used_as_is():
+    assert LanguageDetector.sample_text(ENGLISH, max_chars=2000) == ENGLISH
+
+
+def test_results_are_memoized(calls):
+    first = LanguageDetector.detect_language(GERMAN * 10)
+    second = LanguageDetector.detect_language(GERMAN * 10)
+    assert first == second
+    assert first[0] == "de"
+    assert len(calls) == 1
+
+
+def test_text_without_letters_skips_langdetect(calls):
+    text = "12345 67890 !!! ---"
+    characteristics = LanguageDetector.analyze_language_characteristics(text)
+    assert LanguageDetector.detect_language(text, characteristics) == ("unknown", 0.0)
+    assert calls == []
+
+
+def test_characteristics_match_per_character_loop():
+    import unicodedata
+    from collections import defaultdict
+
+    text = "Hello, мир! 你好 — ¿qué tal? 42 ünïcödé 😀 end." * 3
+    expected_counts = defaultdict(int)
+    for char in text:
+        expected_counts[unicodedata.category(char)] += 1
+        if ord(char) < 128:
+            expected_counts['ascii'] += 1
+
+    result = LanguageDetector.analyze_language_characteristics(text)
+    counts = result['character_counts']
+    assert [key for key in counts if counts[key]] == list(expected_counts)
+    assert {key: value for key, value in counts.items() if value} == dict(expected_counts)
+    assert result['total_characters'] == len(text)
+    assert result['unique_characters'] == len(set(text))
+
+
+def test_characteristics_of_empty_text():
+    result = LanguageDetector.analyze_language_characteristics("")
+    assert result['total_characters'] == 0
+    assert result['unique_characters'] == 0
+    assert result['ratios']['ascii_ratio'] == 0
@@ -0,0 +1,76 @@
+"""Tests for the single-pass model load path and its startup metrics."""
+import pytest
+from fastapi.testclient import TestClient
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+from app.models.analyzer import AIContentAnalyzer
+
+
+def _count_calls(monkeypatch, cls):
+    """Wrap ``cls.from_pretrained`` and return the list its calls are recorded in."""
+    calls = []
+    original = cls.from_pretrained.__func__
+
+    def wrapper(klass, *args, **kwargs):
+        calls.append(kwargs.get("local_files_only"))
+        return original(klass, *args, **kwargs)
+
+    monkeypatch.setattr(cls, "from_pretrained", classmethod(wrapper))
+    return calls
+
+
+def test_tokenizer_and_weights_load_once(tiny_model_dir, tmp_path, monkeypatch):
+    """A successful load reads each component once, from local files only."""
+    tokenizer_calls = _count_calls(monkeypatch, AutoTokenizer)
+    model_calls = _count_calls(monkeypatch, AutoModelForSequenceClassification)
+
+    analyzer = AIContentAnalyzer(model_name=tiny_model_dir, quantize=False)
+    analyzer.cache_dir = tmp_path
+    analyzer._load_model()
+
+    assert analyzer.model_loaded
+    assert tokenizer_calls == [True]
+    assert model_calls == [True]
+
+
+def test_startup_metrics_report_each_phase(tiny_analyzer):
+    metrics = tiny_analyzer.startup_metrics
+    assert metrics["attempts"] == 1
+    assert metrics["local_files_only"] == {"tokenizer": True, "model": True}
+    assert set(metrics["phases_ms"]) == {"tokenizer", "weights", "device_move", "quantize", "runtime", "warmup"}
+    assert all(ms >= 0 for ms in metrics["phases_ms"].values())
+    assert metrics["total_ms"] >= sum(metrics["phases_ms"].values()) - 1
+
+
+def test_retries_only_after_a_failure(tiny_model_dir, tmp_path, monkeypatch):
+    """A failed attempt is retried; the retry loads everything once more."""
+    model_calls = _count_calls(monkeypatch, AutoModelForSequenceClassification)
+    monkeypatch.setattr("app.models.analyzer.time.sleep", lambda seconds: None)
+    analyzer = AIContentAnalyzer(model_name=tiny_model_dir, quantize=False)
+    analyzer.cache_dir = tmp_path
+
+    original = analyzer._warm_up
+    failures = []
+
+    def flaky_warm_up():
+        if not failures:
+            failures.append(True)
+            raise RuntimeError("transient failure")
+        original()
+
+    monkeypatch.setattr(analyzer, "_warm_up", flaky_warm_up)
+    analyzer._load_model()
+
+    assert analyzer.startup_metrics["attempts"] == 2
+    assert len(model_calls) == 2
+
+
+def test_startup_metrics_endpoint(client: TestClient, tiny_analyzer, monkeypatch):
+    from app.api import analyze
+
+    monkeypatch.setattr(analyze, "analyzer", AIContentAnalyzer(model_name="unused"))
+    assert client.get("/api/analyze/startup-metrics").status_code == 404
+
+    monkeypatch.setattr(analyze, "analyzer", tiny_analyzer)
+    resp = client.get("/api/analyze/startup-metrics")
+    assert resp.status_code == 200
+    assert resp.json()["phases_ms"] == pytest.approx(tiny_analyzer.startup_metrics["phases_ms"])
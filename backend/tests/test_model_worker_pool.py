@@ -0,0 +1,103 @@
+"""Tests for the multi-process inference pool."""
+import asyncio
+import os
+import signal
+import time
+import pytest
+from app.utils.inference_batcher import InferenceBatcher, analyze_requests
+from app.utils.inference_executor import InferenceExecutor
+from app.utils.model_worker_pool import ModelWorkerPool
+
+TEXTS = [
+    "The quick brown fox jumps over the lazy dog. It happened twice today.",
+    "We measured the results twice and reported the average value for each run.",
+]
+
+
+@pytest.fixture(scope="module")
+def worker_pool(tiny_analyzer):
+    pool = ModelWorkerPool(tiny_analyzer, num_workers=2, torch_threads=1, task_timeout=60)
+    pool.start()
+    yield pool
+    pool.shutdown()
+
+
+def test_weights_are_shared(worker_pool, tiny_analyzer):
+    """Workers run in their own processes over shared parameter storage."""
+    stats = worker_pool.stats()
+    assert stats["alive"] == 2
+    assert os.getpid() not in stats["pids"]
+    assert all(p.is_shared() for p in tiny_analyzer.model.parameters())
+
+
+def test_pool_results_match_in_process(worker_pool, tiny_analyzer):
+    """Scoring in a worker process gives the same result as in the API process."""
+    requests = [(text, {}) for text in TEXTS] + [("@@@@@@", {})]
+    outcomes, timings = worker_pool.run_batch(requests)
+    expected, _ = analyze_requests(tiny_analyzer, requests)
+
+    assert set(timings) == {"preprocess", "inference"}
+    for (ok, value), (expected_ok, expected_value) in zip(outcomes, expected):
+        assert ok == expected_ok
+        if ok:
+            assert value["prediction"] == expected_value["prediction"]
+            assert value["analysisDetails"]["aiProbability"] == pytest.approx(
+                expected_value["analysisDetails"]["aiProbability"], abs=1e-4
+            )
+        else:
+            assert isinstance(value, ValueError)
+
+
+def test_batcher_uses_pool(worker_pool, tiny_analyzer):
+    """The batcher hands whole batches to the worker processes."""
+    executor = InferenceExecutor(max_workers=2, torch_threads=1)
+    batcher = InferenceBatcher(tiny_analyzer, max_wait_ms=50, executor=executor, worker_pool=worker_pool)
+    completed = worker_pool.stats()["tasks_completed"]
+
+    async def run():
+        return await asyncio.gather(*(batcher.submit(text) for text in TEXTS))
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        executor.shutdown()
+    assert all(r["prediction"] in ("AI_GENERATED", "HUMAN_WRITTEN") for r in results)
+    assert worker_pool.stats()["tasks_completed"] > completed
+
+
+def test_crashed_worker_is_replaced(worker_pool):
+    """A worker that dies is restarted and the pool keeps serving."""
+    os.kill(worker_pool.stats()["pids"][0], signal.SIGKILL)
+
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        stats = worker_pool.stats()
+        if stats["restarts"] == 1 and stats["alive"] == 2:
+            break
+        time.sleep(0.2)
+    assert worker_pool.stats()["restarts"] == 1
+
+    outcomes, _ = worker_pool.run_batch([(TEXTS[0], {})])
+    assert outcomes[0][0]
+
+
+def test_hung_worker_is_replaced(tiny_analyzer):
+    """A worker that does not answer in time is killed and respawned, not left in rotation."""
+    pool = ModelWorkerPool(tiny_analyzer, num_workers=1, torch_threads=1, task_timeout=2)
+    pool.start()
+    try:
+        hung_pid = pool.stats()["pids"][0]
+        os.kill(hung_pid, signal.SIGSTOP)
+
+        with pytest.raises(TimeoutError):
+            pool.run_batch([(TEXTS[0], {})])
+
+        stats = pool.stats()
+        assert stats["restarts"] == 1
+        assert stats["pids"] != [hung_pid] and stats["in_flight"] == 0
+        # The next batch waits for the replacement instead of the stopped process
+        pool.task_timeout = 60
+        outcomes, _ = pool.run_batch([(TEXTS[0], {})])
+        assert outcomes[0][0]
+    finally:
+        pool.shutdown()
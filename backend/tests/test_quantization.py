@@ -0,0 +1,63 @@
+"""Tests for dynamic INT8 quantization on CPU."""
+import json
+from pathlib import Path
+import pytest
+import torch
+from torch import nn
+from app.models.analyzer import AIContentAnalyzer
+
+SAMPLES_PATH = Path(__file__).resolve().parents[1] / "benchmarks" / "data" / "labelled_samples.jsonl"
+
+
+def _load(tiny_model_dir, cache_dir, quantize):
+    analyzer = AIContentAnalyzer(model_name=tiny_model_dir, quantize=quantize, backend="pytorch")
+    analyzer.cache_dir = cache_dir
+    analyzer.result_cache = None
+    analyzer._load_model()
+    return analyzer
+
+
+def _samples():
+    with open(SAMPLES_PATH) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def test_linear_layers_are_quantized(tiny_model_dir, tmp_path):
+    """Quantizing on CPU leaves no fp32 Linear layers behind."""
+    analyzer = _load(tiny_model_dir, tmp_path, quantize=True)
+    assert analyzer.quantized
+    assert not any(type(m) is nn.Linear for m in analyzer.model.modules())
+    assert list((tmp_path / "models").rglob("int8/model-*.pt"))
+
+
+def test_no_accuracy_regression_on_labelled_samples(tiny_model_dir, tmp_path):
+    """INT8 predictions match fp32 on the labelled sample set."""
+    samples = _samples()
+    fp32 = _load(tiny_model_dir, tmp_path, quantize=False)
+    int8 = _load(tiny_model_dir, tmp_path, quantize=True)
+
+    fp32_results = [fp32.analyze_text(s["text"]) for s in samples]
+    int8_results = [int8.analyze_text(s["text"]) for s in samples]
+
+    def accuracy(results):
+        return sum(r["prediction"] == s["label"] for r, s in zip(results, samples)) / len(samples)
+
+    assert accuracy(int8_results) >= accuracy(fp32_results) - 0.02
+    for a, b in zip(fp32_results, int8_results):
+        assert a["prediction"] == b["prediction"]
+        assert a["analysisDetails"]["aiProbability"] == pytest.approx(b["analysisDetails"]["aiProbability"], abs=2.0)
+
+
+def test_restart_reuses_cached_state_dict(tiny_model_dir, tmp_path, monkeypatch):
+    """A second load restores the cached INT8 weights without re-quantizing."""
+    first = _load(tiny_model_dir, tmp_path, quantize=True)
+    sequences = [[0, 262, 80, 80, 83, 2], [0, 100, 2]]
+    _, expected, _ = first._predict(sequences)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("quantize_dynamic should not run when the cache is warm")
+
+    monkeypatch.setattr("torch.ao.quantization.quantize_dynamic", fail)
+    second = _load(tiny_model_dir, tmp_path, quantize=True)
+    _, logits, _ = second._predict(sequences)
+    assert torch.equal(logits, expected)
@@ -0,0 +1,67 @@
+"""Tests for model warm-up and the readiness probe."""
+import asyncio
+from fastapi.testclient import TestClient
+from app.models.analyzer import AIContentAnalyzer
+
+
+def test_warm_up_runs_each_length(tiny_model_dir, tmp_path, monkeypatch):
+    analyzer = AIContentAnalyzer(model_name=tiny_model_dir, quantize=False)
+    analyzer.cache_dir = tmp_path
+    analyzer._load_model()
+    assert not analyzer.warmed_up
+
+    lengths = []
+    original = analyzer._predict
+
+    def record(sequences, *args, **kwargs):
+        lengths.append(len(sequences[0]))
+        return original(sequences, *args, **kwargs)
+
+    monkeypatch.setattr(analyzer, "_predict", record)
+    timings = analyzer.warm_up([16, 128, 4096])
+
+    assert lengths == [16, 128, analyzer.MAX_SEQUENCE_LENGTH]
+    assert set(timings) == {"16", "128", str(analyzer.MAX_SEQUENCE_LENGTH)}
+    assert analyzer.warmed_up
+    assert analyzer.startup_metrics["warmup_lengths_ms"] == timings
+
+
+def test_ready_returns_503_until_warm(client: TestClient, tiny_model_dir, tmp_path, monkeypatch):
+    from app.api import analyze
+
+    cold = AIContentAnalyzer(model_name=tiny_model_dir, quantize=False)
+    cold.cache_dir = tmp_path
+    monkeypatch.setattr(analyze, "analyzer", cold)
+    monkeypatch.setitem(analyze._preload, "state", "cold")
+
+    resp = client.get("/api/analyze/ready")
+    assert resp.status_code == 503
+    assert resp.json()["state"] == "cold"
+    assert "retry-after" in resp.headers
+
+    asyncio.run(analyze.preload_model())
+
+    resp = client.get("/api/analyze/ready")
+    assert resp.status_code == 200
+    assert resp.json()["ready"] is True
+    assert cold.warmed_up
+
+
+def test_failed_preload_is_reported(client: TestClient, monkeypatch):
+    from app.api import analyze
+
+    def fail(model_name=None):
+        raise RuntimeError("weights not found")
+
+    cold = AIContentAnalyzer(model_name="unused")
+    monkeypatch.setattr(cold, "_load_model", fail)
+    monkeypatch.setattr(analyze, "analyzer", cold)
+    monkeypatch.setitem(analyze._preload, "state", "cold")
+    monkeypatch.setitem(analyze._preload, "error", None)
+
+    asyncio.run(analyze.preload_model())
+
+    resp = client.get("/api/analyze/ready")
+    assert resp.status_code == 503
+    assert resp.json()["state"] == "failed"
+    assert "weights not found" in resp.json()["error"]
@@ -0,0 +1,84 @@
+"""Tests for the analyzer result cache."""
+from app.utils.result_cache import ResultCache, DiskCacheTier
+
+
+def test_lru_eviction_and_counters():
+    """Least recently used entries are evicted once the cache is full."""
+    cache = ResultCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", {"value": 1})
+    cache.set("b", {"value": 2})
+    assert cache.get("a") == {"value": 1}  # "a" is now most recently used
+    cache.set("c", {"value": 3})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"value": 1}
+    assert cache.get("c") == {"value": 3}
+
+    stats = cache.stats()
+    assert stats["size"] == 2
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 3
+    assert stats["misses"] == 1
+
+
+def test_ttl_expiration():
+    """Expired entries are treated as misses."""
+    cache = ResultCache(max_entries=10, ttl_seconds=0)
+    cache.set("a", {"value": 1})
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_returned_values_are_copies():
+    """Callers mutating a result cannot corrupt the cached entry."""
+    cache = ResultCache(max_entries=10, ttl_seconds=60)
+    cache.set("a", {"data": {"score": 1}})
+    first = cache.get("a")
+    first["data"]["score"] = 99
+    assert cache.get("a") == {"data": {"score": 1}}
+
+
+def test_key_depends_on_text_model_and_options():
+    """Keys differ whenever text, model or options differ."""
+    base = ResultCache.make_key("some text", "model-a", {"lang_code": None})
+    assert base == ResultCache.make_key("some text", "model-a", {"lang_code": None})
+    assert base != ResultCache.make_key("other text", "model-a", {"lang_code": None})
+    assert base != ResultCache.make_key("some text", "model-b", {"lang_code": None})
+    assert base != ResultCache.make_key("some text", "model-a", {"lang_code": "en"})
+
+
+def test_disk_tier_survives_memory_eviction(tmp_path):
+    """Entries evicted from memory are served from the disk tier."""
+    cache = ResultCache(max_entries=1, ttl_seconds=60, second_tier=DiskCacheTier(tmp_path))
+    cache.set("a", {"value": 1})
+    cache.set("b", {"value": 2})
+
+    assert cache.get("a") == {"value": 1}
+    assert cache.stats()["second_tier_hits"] == 1
+
+    # A fresh cache (e.g. after restart) reads the same disk tier
+    restarted = ResultCache(max_entries=1, ttl_seconds=60, second_tier=DiskCacheTier(tmp_path))
+    assert restarted.get("b") == {"value": 2}
+
+
+def test_analyzer_skips_inference_on_hit(tiny_analyzer, monkeypatch):
+    """A repeated text is served from the cache without a forward pass."""
+    monkeypatch.setattr(tiny_analyzer, "result_cache", ResultCache(max_entries=10, ttl_seconds=60))
+    calls = []
+    original_model = tiny_analyzer.model
+
+    def counting_model(**inputs):
+        calls.append(inputs["input_ids"].shape[0])
+        return original_model(**inputs)
+
+    monkeypatch.setattr(tiny_analyzer, "model", counting_model)
+    text = "We measured the results twice and reported the average value."
+
+    first = tiny_analyzer.analyze_text(text)
+    second = tiny_analyzer.analyze_text(text + "  ")  # same text after preprocessing
+    assert len(calls) == 1
+    assert first == second
+
+    tiny_analyzer.analyze_text(text, sliding_window=True)
+    assert len(calls) == 2
+    assert tiny_analyzer.result_cache.stats()["hits"] == 1
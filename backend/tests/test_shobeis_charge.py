@@ -0,0 +1,196 @@
+"""Tests for the single-statement charge in ShobeisService.process_charge."""
+import threading
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+from app.models.pricing import PricingTable
+from app.models.shobeis_transaction import ShobeisTransaction, TransactionType
+from app.models.user import User
+from app.services import shobeis_service
+from app.services.shobeis_service import InsufficientShobeisError, ShobeisService
+from app.utils.database import Base, create_db_engine
+from app.utils.user_cache import user_cache
+
+
+@pytest.fixture
+def sessions(tmp_path):
+    """Session factory on a SQLite file (WAL, busy timeout) where word_analysis costs 1 per word, 10 minimum."""
+    db_engine = create_db_engine(f"sqlite:///{tmp_path / 'charges.db'}")
+    Base.metadata.create_all(bind=db_engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=db_engine)
+    db = factory()
+    db.add(PricingTable(action_type='word_analysis', unit='WORD', base_shobeis=1, min_charge=10))
+    db.commit()
+    db.close()
+    shobeis_service.clear_pricing_cache()
+    factory.engine = db_engine
+    yield factory
+    shobeis_service.clear_pricing_cache()
+    db_engine.dispose()
+
+
+def add_user(sessions, monthly, bonus, main):
+    db = sessions()
+    try:
+        user = User(email=f"charge-{monthly}-{bonus}-{main}@example.com", password_hash="x", user_type="FREE",
+                    monthly_balance=monthly, bonus_balance=bonus, shobeis_balance=main)
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        db.expunge(user)
+        return user
+    finally:
+        db.close()
+
+
+def balances(sessions, user_id):
+    db = sessions()
+    try:
+        user = db.get(User, user_id)
+        ledger = db.query(ShobeisTransaction).filter_by(user_id=user_id).all()
+        return (user.monthly_balance, user.bonus_balance, user.shobeis_balance), ledger
+    finally:
+        db.close()
+
+
+def test_waterfall_draws_monthly_then_bonus_then_main(sessions):
+    user = add_user(sessions, monthly=30, bonus=20, main=100)
+    db = sessions()
+    try:
+        rows = ShobeisService(db).process_charge(user=user, action_type='word_analysis', quantity=70)
+    finally:
+        db.close()
+
+    assert [(row["transaction_type"], row["amount"]) for row in rows] == [
+        (TransactionType.MONTHLY_USAGE, -30), (TransactionType.BONUS_USAGE, -20), (TransactionType.USAGE, -20)]
+    # Only the main-balance row moves the main balance
+    assert [(row["balance_before"], row["balance_after"]) for row in rows] == [(100, 100), (100, 100), (100, 80)]
+    stored, ledger = balances(sessions, user.id)
+    assert stored == (0, 0, 80)
+    assert sorted(tx.amount for tx in ledger) == [-30, -20, -20]
+
+
+def test_fresh_snapshot_is_charged_with_one_update_and_one_insert(sessions):
+    user = add_user(sessions, monthly=50, bonus=0, main=100)
+    db = sessions()
+    ShobeisService(db).get_pricing('word_analysis')
+    db.close()
+    statements = []
+    event.listen(sessions.engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement.split()[0]))
+
+    db = sessions()
+    try:
+        ShobeisService(db).process_charge(user=user, action_type='word_analysis', quantity=20)
+    finally:
+        db.close()
+
+    assert statements == ["UPDATE", "INSERT"]
+    assert balances(sessions, user.id)[0] == (30, 0, 100)
+
+
+def test_stale_snapshot_is_charged_under_the_lock(sessions):
+    user = add_user(sessions, monthly=0, bonus=0, main=100)
+    db = sessions()
+    try:
+        db.get(User, user.id).shobeis_balance = 60
+        db.commit()
+        user_cache.put(db.get(User, user.id))
+    finally:
+        db.close()
+
+    db = sessions()
+    try:
+        # ``user`` still says 100; the row holding 60 is what gets charged
+        rows = ShobeisService(db).process_charge(user=user, action_type='word_analysis', quantity=15)
+    finally:
+        db.close()
+
+    assert rows[0]["balance_before"] == 60
+    assert balances(sessions, user.id)[0] == (0, 0, 45)
+    assert user_cache.get(user.id, sessions()) is None
+
+
+def test_insufficient_balance_changes_nothing(sessions):
+    user = add_user(sessions, monthly=5, bonus=5, main=5)
+    db = sessions()
+    try:
+        with pytest.raises(InsufficientShobeisError):
+            ShobeisService(db).process_charge(user=user, action_type='word_analysis', quantity=20)
+    finally:
+        db.close()
+
+    stored, ledger = balances(sessions, user.id)
+    assert stored == (5, 5, 5)
+    assert ledger == []
+
+
+def test_idempotency_key_charges_once(sessions):
+    user = add_user(sessions, monthly=30, bonus=0, main=100)
+    results = []
+    for _ in range(2):
+        db = sessions()
+        try:
+            results.append(ShobeisService(db).process_charge(
+                user=user, action_type='word_analysis', quantity=50, idempotency_key="job:1"))
+        finally:
+            db.close()
+
+    assert [row["id"] for row in results[0]] == [row["id"] for row in results[1]]
+    assert [row["idempotency_key"] for row in results[1]] == ["job:1", "job:1:1"]
+    stored, ledger = balances(sessions, user.id)
+    assert stored == (0, 0, 80)
+    assert len(ledger) == 2
+
+
+def test_pricing_is_cached(sessions):
+    db = sessions()
+    try:
+        service = ShobeisService(db)
+        assert service.get_pricing('word_analysis')['min_charge'] == 10
+        db.query(PricingTable).filter_by(action_type='word_analysis').update({"min_charge": 25})
+        db.commit()
+        assert service.get_pricing('word_analysis')['min_charge'] == 10
+        shobeis_service.clear_pricing_cache()
+        assert service.get_pricing('word_analysis')['min_charge'] == 25
+    finally:
+        db.close()
+
+
+def test_concurrent_charges_for_one_user(sessions):
+    # 8 threads x 10 charges of 10 against 500 in total: exactly 50 charges fit
+    user = add_user(sessions, monthly=120, bonus=80, main=300)
+    outcomes = []
+    lock = threading.Lock()
+    start = threading.Barrier(8)
+
+    def worker():
+        start.wait()
+        for _ in range(10):
+            db = sessions()
+            try:
+                # Every thread starts from the same, soon stale, snapshot
+                ShobeisService(db).process_charge(user=user, action_type='word_analysis', quantity=10)
+                outcome = "charged"
+            except InsufficientShobeisError:
+                outcome = "insufficient"
+            finally:
+                db.close()
+            with lock:
+                outcomes.append(outcome)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stored, ledger = balances(sessions, user.id)
+    assert outcomes.count("charged") == 50
+    assert outcomes.count("insufficient") == 30
+    assert stored == (0, 0, 0)
+    assert sum(tx.amount for tx in ledger) == -500
+    by_type = {t: -sum(tx.amount for tx in ledger if tx.transaction_type == t) for t in TransactionType}
+    assert by_type[TransactionType.MONTHLY_USAGE] == 120
+    assert by_type[TransactionType.BONUS_USAGE] == 80
+    assert by_type[TransactionType.USAGE] == 300
@@ -0,0 +1,62 @@
+"""Tests for sliding-window long-document scoring."""
+import pytest
+
+LONG_TEXT = "The quick brown fox jumps over the lazy dog. We measured the results twice. " * 120
+
+
+def test_windows_cover_whole_document(tiny_analyzer):
+    """Overlapping windows span every token and respect the model length."""
+    tokenizer = tiny_analyzer.tokenizer
+    total_tokens = len(tokenizer(LONG_TEXT, add_special_tokens=False)["input_ids"])
+    windows = tiny_analyzer._encode_windows(tokenizer, LONG_TEXT, sliding_window=True)
+
+    assert len(windows) > 1
+    assert windows[0]["start"] == 0
+    assert windows[-1]["end"] == total_tokens
+    for previous, current in zip(windows, windows[1:]):
+        # Consecutive windows overlap
+        assert current["start"] < previous["end"]
+    assert all(len(w["input_ids"]) <= tiny_analyzer.MAX_SEQUENCE_LENGTH for w in windows)
+
+
+def test_truncated_encoding_matches_tokenizer(tiny_analyzer):
+    """Without sliding windows the text is truncated like the tokenizer does."""
+    tokenizer = tiny_analyzer.tokenizer
+    windows = tiny_analyzer._encode_windows(tokenizer, LONG_TEXT, sliding_window=False)
+    expected = tokenizer(LONG_TEXT, truncation=True, max_length=512)["input_ids"]
+    assert len(windows) == 1
+    assert windows[0]["input_ids"] == expected
+
+
+def test_sliding_window_result(tiny_analyzer, monkeypatch):
+    """Long documents report per-window scores, scored in bounded chunks."""
+    monkeypatch.setattr(tiny_analyzer, "window_batch_size", 2)
+    chunk_sizes = []
+    original_model = tiny_analyzer.model
+
+    def counting_model(**inputs):
+        chunk_sizes.append(inputs["input_ids"].shape[0])
+        return original_model(**inputs)
+
+    monkeypatch.setattr(tiny_analyzer, "model", counting_model)
+    result = tiny_analyzer.analyze_text(LONG_TEXT, sliding_window=True)
+
+    scoring = result["analysisDetails"]["scoring"]
+    assert scoring["mode"] == "sliding_window"
+    assert scoring["windowCount"] == len(scoring["windows"]) > 1
+    assert max(chunk_sizes) <= 2
+    assert sum(chunk_sizes) == scoring["windowCount"]
+    window_probs = [w["aiProbability"] for w in scoring["windows"]]
+    assert min(window_probs) - 0.01 <= result["analysisDetails"]["aiProbability"] <= max(window_probs) + 0.01
+
+
+def test_short_text_sliding_window_matches_truncated(tiny_analyzer):
+    """A text that fits in one window scores the same in either mode."""
+    text = "We measured the results twice and reported the average value."
+    windowed = tiny_analyzer.analyze_text(text, sliding_window=True)
+    truncated = tiny_analyzer.analyze_text(text)
+    assert windowed["analysisDetails"]["scoring"]["windowCount"] == 1
+    assert windowed["analysisDetails"]["aiProbability"] == pytest.approx(
+        truncated["analysisDetails"]["aiProbability"]
+    )
+    assert "scoring" not in truncated["analysisDetails"]
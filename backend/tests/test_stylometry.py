@@ -0,0 +1,70 @@
+"""Tests for single-pass stylometric indicators."""
+import json
+import pytest
+from app.models.analyzer import AIContentAnalyzer
+from app.utils.stylometry import StyleFeatures
+
+TEXT = "The quick brown fox jumps over the lazy dog. The quick brown fox ran! Did it stop? It did, mostly; yes..."
+
+# Output of the previous multi-pass implementation for TEXT
+EXPECTED_INDICATORS = [
+    {
+        "type": "Pattern Complexity",
+        "description": "Analysis of writing patterns and structure",
+        "confidence": 57.5,
+        "details": {
+            "sentenceVariation": 1.5,
+            "repetitivePatterns": {"repeatedPhrases": 3, "maxRepetition": 2}
+        }
+    },
+    {
+        "type": "Language Naturalness",
+        "description": "Evaluation of natural language flow",
+        "confidence": 44.72,
+        "details": {
+            "vocabularyDiversity": {"uniqueWords": 15, "totalWords": 21, "diversity": 0.714},
+            "sentenceComplexity": {"average": 10.5, "max": 12, "min": 9}
+        }
+    },
+    {
+        "type": "Style Consistency",
+        "description": "Measurement of writing style consistency",
+        "confidence": 50.0,
+        "details": {
+            "toneConsistency": 0.9166666666666666,
+            "stylePatterns": {"exclamations": 1, "questions": 1, "ellipsis": 1, "quotations": 0}
+        }
+    }
+]
+
+
+@pytest.fixture
+def analyzer():
+    # Indicators do not need the model, so skip initialization
+    return AIContentAnalyzer.__new__(AIContentAnalyzer)
+
+
+def test_indicators_match_previous_output(analyzer):
+    """The single-pass indicators produce the same JSON as before."""
+    indicators = analyzer._calculate_indicators(TEXT, 0.5)
+    assert json.dumps(indicators) == json.dumps(EXPECTED_INDICATORS)
+
+
+def test_features_are_collected_in_one_pass():
+    """Sentence statistics line up with the '.'-delimited sentences."""
+    features = StyleFeatures.from_text('He said "Hello World" to me. Then he left.')
+    assert features.sentence_lengths.tolist() == [6, 3]
+    assert features.title_counts.tolist() == [3, 1]
+    assert features.word_count == 9
+    assert features.style_patterns()["quotations"] == 1
+
+
+@pytest.mark.parametrize("text", ["", "   ", "...", "word"])
+def test_degenerate_text(analyzer, text):
+    """Empty and sentence-less text fall back to the default values."""
+    indicators = analyzer._calculate_indicators(text, 0.5)
+    json.dumps(indicators)
+    features = StyleFeatures.from_text(text)
+    if not features.sentence_count:
+        assert indicators[0]["confidence"] == 0.0
+        assert indicators[1]["details"]["sentenceComplexity"] == {"average": 0, "max": 0, "min": 0}
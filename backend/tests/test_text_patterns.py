@@ -0,0 +1,39 @@
+"""Tests for the shared precompiled text patterns."""
+import re
+import pytest
+from app.utils.text_patterns import collapse_whitespace, count_characters, scan_marks
+
+TEXT = 'He said "stop!" Then?? she left; later, "why?" ... Naïve café, 你好! End.. it\'s done'
+
+
+@pytest.mark.parametrize("text", [
+    "  a\tb\n\nc  ",
+    "x y z　",
+    "\x1c\x1d\x1e\x1f word \x85 next ",
+    "",
+])
+def test_collapse_whitespace_matches_regex(text):
+    assert collapse_whitespace(text) == re.sub(r'\s+', ' ', text.strip())
+
+
+def test_scan_marks_matches_per_segment_counts():
+    marks = scan_marks(TEXT)
+    segments = TEXT.split('.')
+    for mark in '!?,;"\'':
+        assert marks.totals[mark] == TEXT.count(mark)
+        assert marks.segments[mark].tolist() == [segment.count(mark) for segment in segments]
+
+
+def test_scan_marks_on_text_without_marks():
+    marks = scan_marks("plain words only")
+    assert all(total == 0 for total in marks.totals.values())
+    assert marks.segments['!'].tolist() == [0]
+
+
+def test_scan_marks_rejects_non_ascii_marks():
+    with pytest.raises(ValueError):
+        scan_marks(TEXT, marks="¿")
+
+
+def test_count_characters():
+    assert count_characters("¿Qué? ¡Sí!", "¡¿") == 2
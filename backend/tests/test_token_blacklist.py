@@ -0,0 +1,110 @@
+"""Tests for the in-memory token blacklist."""
+import time
+from datetime import datetime, timedelta
+import jwt
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.models.blacklisted_token import BlacklistedToken
+from app.utils import security
+from app.utils.token_blacklist import TokenBlacklist
+
+
+@pytest.fixture
+def sessions(tmp_path):
+    """Session factory on a fresh database, counting the sessions opened."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'blacklist.db'}")
+    BlacklistedToken.__table__.create(bind=engine)
+    factory = sessionmaker(bind=engine)
+    opened = []
+
+    def session():
+        opened.append(1)
+        return factory()
+
+    session.opened = opened
+    session.revoke = lambda token, **kw: _revoke(factory, token, **kw)
+    return session
+
+
+def _revoke(factory, token, created_at=None):
+    claims = jwt.decode(token, options={"verify_signature": False})
+    db = factory()
+    db.add(BlacklistedToken(token=token, user_id="user-1", expires_at=datetime.fromtimestamp(claims["exp"]),
+                            created_at=created_at or datetime.utcnow()))
+    db.commit()
+    db.close()
+    return claims["jti"]
+
+
+def make_token(minutes=30):
+    return security.create_access_token({"sub": "user-1"}, expires_delta=timedelta(minutes=minutes))
+
+
+def test_checks_between_syncs_do_not_query(sessions):
+    revoked, valid = make_token(), make_token()
+    revoked_jti = sessions.revoke(revoked)
+    blacklist = TokenBlacklist(session_factory=sessions, refresh_seconds=60)
+
+    assert blacklist.is_revoked(revoked_jti, revoked)
+    for _ in range(100):
+        assert not blacklist.is_revoked("other-jti", valid)
+    assert len(sessions.opened) == 1
+    assert blacklist.stats()["revoked"] == 1
+
+
+def test_new_revocations_are_synced_incrementally(sessions):
+    blacklist = TokenBlacklist(session_factory=sessions, refresh_seconds=0.05)
+    early = make_token()
+    sessions.revoke(early)
+    assert not blacklist.is_revoked("unknown", early)
+
+    # Revoked by another process, committed a little after a later row
+    late, later = make_token(), make_token()
+    late_jti = sessions.revoke(late, created_at=datetime.utcnow() - timedelta(seconds=5))
+    later_jti = sessions.revoke(later)
+    time.sleep(0.1)
+
+    assert blacklist.is_revoked(late_jti, late)
+    assert blacklist.is_revoked(later_jti, later)
+    assert blacklist.stats()["syncs"] == 2
+
+
+def test_expired_entries_are_evicted(sessions):
+    blacklist = TokenBlacklist(session_factory=sessions, refresh_seconds=0)
+    blacklist.add("expired", time.time() - 1)
+    blacklist.add("current", time.time() + 600)
+
+    assert not blacklist.is_revoked("expired", "token")
+    assert blacklist.is_revoked("current", "token")
+    assert blacklist.stats()["revoked"] == 1
+
+
+def test_falls_back_to_the_database_when_sync_fails(sessions):
+    token = make_token()
+    sessions.revoke(token)
+    calls = []
+
+    def flaky_session():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("database unavailable")
+        return sessions()
+
+    blacklist = TokenBlacklist(session_factory=flaky_session, refresh_seconds=60)
+    assert blacklist.is_revoked("ignored", token)
+    assert blacklist.stats()["fallback_checks"] == 1
+    assert blacklist.stats()["sync_errors"] == 1
+
+
+def test_decode_token_rejects_revoked_tokens(monkeypatch, sessions):
+    blacklist = TokenBlacklist(session_factory=sessions, refresh_seconds=60)
+    monkeypatch.setattr(security, "token_blacklist", blacklist)
+    token = make_token()
+    payload = security.decode_token(token)
+    assert payload["sub"] == "user-1"
+
+    # Logout adds the token without waiting for the next sync
+    blacklist.add(payload["jti"], payload["exp"])
+    with pytest.raises(ValueError):
+        security.decode_token(token)
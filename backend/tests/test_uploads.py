@@ -0,0 +1,200 @@
+"""Tests for upload size limits, spooling and content sniffing."""
+import io
+import tempfile
+import tracemalloc
+import docx
+import pytest
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+from app.models.user import User, UserType
+from app.utils.document_processor import DocumentProcessor, FileTypeError
+from app.utils.uploads import UploadLimitMiddleware, as_buffer, inspect_upload
+
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+MB = 1024 * 1024
+
+
+def make_docx(text: str) -> bytes:
+    doc = docx.Document()
+    doc.add_paragraph(text)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def limited_client():
+    """App whose upload endpoint accepts at most 1MB, recording the requests that reach it."""
+    app = FastAPI()
+    reached = []
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        size, _ = inspect_upload(file)
+        reached.append(size)
+        return {"size": size}
+
+    app.add_middleware(UploadLimitMiddleware, limits={"/upload": MB})
+    return TestClient(app), reached
+
+
+def test_declared_oversize_body_is_rejected(limited_client):
+    client, reached = limited_client
+    resp = client.post("/upload", files={"file": ("big.txt", b"x" * (2 * MB), "text/plain")})
+
+    assert resp.status_code == 413
+    assert "too large" in resp.json()["detail"]
+    assert not reached
+
+
+def test_streamed_oversize_body_is_rejected_without_buffering(limited_client):
+    client, reached = limited_client
+    sent = []
+
+    def chunks():
+        # No Content-Length: the limit is enforced while the body arrives
+        yield b'--boundary\r\nContent-Disposition: form-data; name="file"; filename="big.txt"\r\n\r\n'
+        for _ in range(64):
+            sent.append(MB // 4)
+            yield b"x" * (MB // 4)
+        yield b"\r\n--boundary--\r\n"
+
+    resp = client.post("/upload", data=chunks(),
+                       headers={"content-type": "multipart/form-data; boundary=boundary"})
+
+    assert resp.status_code == 413
+    assert not reached
+    # Reading stopped right after the limit was crossed
+    assert sum(sent) <= MB + MB // 2
+
+
+def test_small_upload_passes_the_limit(limited_client):
+    client, reached = limited_client
+    resp = client.post("/upload", files={"file": ("small.txt", b"hello " * 100, "text/plain")})
+
+    assert resp.status_code == 200
+    assert resp.json() == {"size": 600}
+    # Other paths are not limited
+    assert client.post("/elsewhere", data=b"x" * (2 * MB)).status_code == 404
+
+
+def test_spooled_upload_is_inspected_without_reading_it():
+    spooled = tempfile.SpooledTemporaryFile(max_size=MB)
+    spooled.write(b"%PDF-1.4\n" + b"0" * (16 * MB))
+    upload = UploadFile("big.pdf", spooled, "application/pdf")
+
+    tracemalloc.start()
+    try:
+        size, head = inspect_upload(upload)
+        with as_buffer(upload.file) as buffer:
+            _, peak = tracemalloc.get_traced_memory()
+            mapping = buffer.obj
+            assert len(buffer) == size and bytes(buffer[:4]) == b"%PDF"
+    finally:
+        tracemalloc.stop()
+
+    assert size == 9 + 16 * MB
+    assert head.startswith(b"%PDF") and len(head) == 4096
+    # Neither the size check nor the buffer copies the 16MB file
+    assert peak < 256 * 1024
+    assert upload.file.tell() == 0
+    # The mapping is gone with the block; the file can be closed
+    assert mapping.closed
+    spooled.close()
+
+
+def test_in_memory_upload_is_exposed_without_copying():
+    spooled = tempfile.SpooledTemporaryFile(max_size=MB)
+    spooled.write(b"short text upload")
+    with as_buffer(spooled) as buffer:
+        assert isinstance(buffer, memoryview)
+        assert bytes(buffer) == b"short text upload"
+    # Released, so the spool can be closed (it cannot while its buffer is exported)
+    spooled.close()
+    with as_buffer(b"raw") as buffer:
+        assert buffer == b"raw"
+
+
+def test_content_type_is_sniffed():
+    content = make_docx("A document with enough words to be analyzed.")
+
+    assert DocumentProcessor.detect_content_type(content[:4096], DOCX_MIME) == DOCX_MIME
+    assert DocumentProcessor.detect_content_type(b"Plain words in a file.", "text/plain") == "text/plain"
+    # The declared type does not override the content
+    assert DocumentProcessor.detect_content_type(b"%PDF-1.4\n%...", "text/plain") == "application/pdf"
+    with pytest.raises(FileTypeError):
+        DocumentProcessor.detect_content_type(b"\x89PNG\r\n\x1a\n" + b"\0" * 64, "application/pdf")
+
+
+def test_documents_are_extracted_from_file_handles():
+    content = make_docx("Extracted straight from the spooled file.")
+    spooled = tempfile.SpooledTemporaryFile(max_size=16)
+    spooled.write(content)
+    spooled.seek(0)
+
+    doc = DocumentProcessor().process_document_bytes(spooled, DOCX_MIME, include_pages=False)
+    assert doc["text"] == "Extracted straight from the spooled file."
+
+    text_file = io.BytesIO("Plain text, read in place.".encode("utf-8"))
+    assert DocumentProcessor().process_document_bytes(text_file, "text/plain")["text"] == "Plain text, read in place."
+    assert not text_file.closed
+
+
+@pytest.fixture
+def file_client(client: TestClient, tiny_analyzer, monkeypatch):
+    """Client whose uploads come from a PRO user, scored by the tiny model and billed by a fake."""
+    from app.api import analyze
+    from app.api.auth import get_current_user
+    from app.utils.inference_batcher import InferenceBatcher
+
+    user = User(id="upload-user", email="upload@example.com", user_type=UserType.PRO.value)
+    charges = []
+
+    class FakeShobeisService:
+        def __init__(self, db):
+            pass
+
+        def process_charge(self, user, action_type, quantity=1, **kwargs):
+            charges.append((user.id, action_type, quantity))
+            return True
+
+    monkeypatch.setattr(analyze, "analyzer", tiny_analyzer)
+    batcher = InferenceBatcher(tiny_analyzer)
+    monkeypatch.setattr(analyze, "batcher", batcher)
+    monkeypatch.setattr(analyze, "ShobeisService", FakeShobeisService)
+    monkeypatch.setattr(analyze, "job_queue", None)
+    client.app.dependency_overrides[get_current_user] = lambda: user
+    yield client, charges
+    client.app.dependency_overrides.pop(get_current_user, None)
+    # The client's event loop outlives the test; stop the worker it runs
+    batcher.shutdown()
+
+
+def test_file_endpoint_reads_the_spooled_upload(file_client):
+    client, charges = file_client
+    content = make_docx("This uploaded document is analyzed from its spooled file.")
+
+    resp = client.post("/api/analyze/file", files={"file": ("report.docx", content, DOCX_MIME)})
+
+    assert resp.status_code == 200, resp.text
+    data = resp.json()["data"]
+    assert data["documentInfo"]["fileType"] == DOCX_MIME
+    assert charges == [("upload-user", "word_analysis", 9)]
+
+
+def test_file_endpoint_rejects_mismatched_content(file_client):
+    client, charges = file_client
+
+    with pytest.raises(Exception, match="does not match"):
+        client.post("/api/analyze/file",
+                    files={"file": ("image.pdf", b"\x89PNG\r\n\x1a\n" + b"\0" * 64, "application/pdf")})
+    assert not charges
+
+
+def test_file_endpoint_rejects_oversize_uploads(file_client):
+    client, charges = file_client
+
+    resp = client.post("/api/analyze/file", files={"file": ("big.txt", b"word " * (3 * MB), "text/plain")})
+
+    assert resp.status_code == 413
+    assert not charges
@@ -0,0 +1,159 @@
+"""Tests for the authenticated-user cache."""
+import time
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from app.models.pricing import PricingTable
+from app.models.user import User
+from app.services.shobeis_service import ShobeisService
+from app.utils.database import Base, get_db
+from app.utils.monitoring import MetricsCollector
+from app.utils.security import create_access_token
+from app.utils.user_cache import UserCache, user_cache
+
+
+@pytest.fixture
+def sessions(tmp_path):
+    """Session factory on a database of its own, with word_analysis priced."""
+    db_engine = create_engine(f"sqlite:///{tmp_path / 'users.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=db_engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=db_engine)
+    db = factory()
+    db.add(PricingTable(action_type='word_analysis', unit='WORD', base_shobeis=1, min_charge=10))
+    db.commit()
+    db.close()
+    factory.engine = db_engine
+    yield factory
+    db_engine.dispose()
+
+
+@pytest.fixture
+def statements(sessions):
+    """SQL statements run on the test database while the test runs."""
+    seen = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        seen.append(statement)
+
+    event.listen(sessions.engine, "before_cursor_execute", record)
+    yield seen
+    event.remove(sessions.engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def member(sessions):
+    """ID of a PRO user with 500 shobeis."""
+    db = sessions()
+    try:
+        user = User(email="cache@example.com", password_hash="x", user_type="PRO",
+                    shobeis_balance=500, monthly_balance=0, bonus_balance=0)
+        db.add(user)
+        db.commit()
+        yield user.id
+        user_cache.invalidate(user.id)
+    finally:
+        db.close()
+
+
+def load_user(db, user_id):
+    return db.query(User).filter(User.id == user_id).first()
+
+
+def test_hit_returns_an_attached_user_without_a_query(sessions, member, statements):
+    cache = UserCache(ttl=60)
+    db = sessions()
+    try:
+        cache.put(load_user(db, member))
+    finally:
+        db.close()
+
+    db = sessions()
+    try:
+        statements.clear()
+        user = cache.get(member, db)
+        assert user.shobeis_balance == 500
+        assert not statements
+        assert cache.stats()["hits"] == 1
+
+        # Updates made through the cached instance are flushed as usual
+        user.requests_count = (user.requests_count or 0) + 1
+        db.commit()
+        expected = user.requests_count
+    finally:
+        db.close()
+
+    db = sessions()
+    try:
+        assert load_user(db, member).requests_count == expected
+    finally:
+        db.close()
+
+
+def test_entries_expire_and_can_be_invalidated(sessions, member):
+    cache = UserCache(ttl=0.05)
+    db = sessions()
+    try:
+        user = load_user(db, member)
+        cache.put(user)
+        assert cache.get(user.id, db) is user
+        time.sleep(0.1)
+        assert cache.get(user.id, db) is None
+
+        cache.ttl = 60
+        cache.put(user)
+        cache.invalidate(user.id)
+        assert cache.get(user.id, db) is None
+        assert cache.stats()["invalidations"] == 1
+    finally:
+        db.close()
+
+
+def test_entries_are_bounded():
+    cache = UserCache(ttl=60, max_entries=2)
+    for user_id in ("a", "b", "c"):
+        cache.put(User(id=user_id, email=f"{user_id}@example.com"))
+
+    assert cache.stats()["entries"] == 2
+    assert "a" not in cache._entries
+
+
+def test_charge_rereads_the_balance_and_invalidates(sessions, member):
+    db = sessions()
+    try:
+        user = load_user(db, member)
+        user_cache.put(user)
+        stale = User(id=user.id, email=user.email, user_type=user.user_type, shobeis_balance=0,
+                     monthly_balance=0, bonus_balance=0)
+        balance = user.shobeis_balance + user.monthly_balance + user.bonus_balance
+    finally:
+        db.close()
+
+    db = sessions()
+    try:
+        # The stale snapshot shows no balance; the locked row is what gets charged
+        assert ShobeisService(db).process_charge(user=stale, action_type='word_analysis', quantity=20)
+        assert user_cache.get(stale.id, db) is None
+        charged = load_user(db, member)
+        assert charged.shobeis_balance + charged.monthly_balance + charged.bonus_balance < balance
+    finally:
+        db.close()
+
+
+def test_current_user_is_loaded_from_the_cache(client, sessions, member, monkeypatch):
+    def session_dependency():
+        db = sessions()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setitem(client.app.dependency_overrides, get_db, session_dependency)
+    auth_headers = {"Authorization": f"Bearer {create_access_token({'sub': member})}"}
+    metric = MetricsCollector().metrics.get('auth_user_load_ms')
+    before = len(metric['queue']) if metric else 0
+
+    assert client.get("/api/auth/me", headers=auth_headers).status_code == 200
+    assert client.get("/api/auth/me", headers=auth_headers).status_code == 200
+
+    points = list(MetricsCollector().metrics['auth_user_load_ms']['queue'])[before:]
+    assert [p.labels["source"] for p in points] == ["db", "cache"]
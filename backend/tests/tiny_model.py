@@ -0,0 +1,63 @@
+"""Build a tiny RoBERTa classifier on disk for offline analyzer tests.
+
+The production detector is downloaded from the Hugging Face hub. Tests that
+exercise the inference path use this randomly initialised two-layer model
+instead so they run without network access.
+"""
+from pathlib import Path
+from typing import Union
+
+TRAINING_TEXT = [
+    "The quick brown fox jumps over the lazy dog.",
+    "Artificial intelligence can write text that reads like a person wrote it.",
+    "We measured the results twice and reported the average value.",
+]
+
+
+def build_tiny_model(path: Union[str, Path]) -> str:
+    """Save a tiny tokenizer and sequence classification model to ``path``.
+
+    Returns:
+        The directory as a string, usable as ``model_name`` for the analyzer.
+    """
+    import torch
+    from tokenizers import Tokenizer, models, trainers, pre_tokenizers, processors, decoders
+    from transformers import PreTrainedTokenizerFast, RobertaConfig, RobertaForSequenceClassification
+
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+
+    tokenizer = Tokenizer(models.BPE(unk_token="<unk>"))
+    tokenizer.pre_tokenizer = pre_tokenizers.ByteLevel(add_prefix_space=False)
+    tokenizer.decoder = decoders.ByteLevel()
+    trainer = trainers.BpeTrainer(
+        vocab_size=400,
+        special_tokens=["<s>", "<pad>", "</s>", "<unk>", "<mask>"],
+        initial_alphabet=pre_tokenizers.ByteLevel.alphabet()
+    )
+    tokenizer.train_from_iterator(TRAINING_TEXT * 10, trainer)
+    tokenizer.post_processor = processors.RobertaProcessing(("</s>", 2), ("<s>", 0))
+
+    fast_tokenizer = PreTrainedTokenizerFast(
+        tokenizer_object=tokenizer,
+        bos_token="<s>", eos_token="</s>", unk_token="<unk>", pad_token="<pad>",
+        cls_token="<s>", sep_token="</s>", mask_token="<mask>",
+        model_max_length=512
+    )
+    fast_tokenizer.save_pretrained(str(path))
+
+    config = RobertaConfig(
+        vocab_size=len(fast_tokenizer),
+        hidden_size=32,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=64,
+        max_position_embeddings=514,
+        num_labels=2,
+        pad_token_id=1,
+        bos_token_id=0,
+        eos_token_id=2
+    )
+    torch.manual_seed(0)
+    RobertaForSequenceClassification(config).save_pretrained(str(path))
+    return str(path)